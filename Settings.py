@@ -1,6 +1,83 @@
 import os
 
 JSON_PATH = os.path.join(os.path.dirname(__file__), "data", "models_config.json")
+DEFAULT_MODEL = "gpt-4o-mini"  # Preselected in new scenes
+FALLBACK_MODELS = [  # Listed while g4f is not loaded and no model passed a test
+    "gpt-4o-mini",
+    "gpt-4o",
+    "gpt-4.1-mini",
+    "deepseek-v3",
+    "qwen-2.5-coder-32b",
+]
+
+LOG_PATH = os.path.join(os.path.dirname(__file__), "data", "g4f_callbacks.log")
+LOG_LEVEL = "INFO"
+LOG_MAX_BYTES = 2 * 1024 * 1024  # Rotate the log at this size, backups are gzipped
+LOG_BACKUPS = 5
+
+CACHE_DIR = os.path.join(os.path.dirname(__file__), "data", "response_cache")
+CACHE_MAX_MEMORY_ENTRIES = 64
+CACHE_MAX_DISK_BYTES = 50 * 1024 * 1024
+
+BYTECODE_CACHE_DIR = os.path.join(os.path.dirname(__file__), "data", "bytecode_cache")
+BYTECODE_CACHE_ENTRIES = 128
+BYTECODE_CACHE_MAX_FILES = 256
+
+HISTORY_BLOB_TEXT = ".g4f_history_blobs"  # Text datablock of older files, migrated on load
+HISTORY_PREVIEW_LENGTH = 80
+HISTORY_BODY_CACHE = 256
+HISTORY_PAGE_SIZE = 10  # Prompt/answer pairs shown per page of the history panel
+
+CONTEXT_TOKEN_BUDGET = 6000  # Default request size in estimated tokens
+CONTEXT_TOKEN_BUDGETS = {
+    "gpt-4o": 12000,
+    "gpt-4o-mini": 12000,
+}
+
+RACE_STATS_PATH = os.path.join(os.path.dirname(__file__), "data", "race_stats.json")
+
+ATTEMPT_STATS_PATH = os.path.join(os.path.dirname(__file__), "data", "request_stats.json")
+REQUEST_RETRIES = 2  # Attempts per model before failing over
+REQUEST_FAILOVER_MODELS = 2
+REQUEST_ATTEMPT_TIMEOUT = 120.0  # Total deadline of one attempt
+REQUEST_CONNECT_TIMEOUT = 20.0  # Until a streaming provider sends its first chunk
+REQUEST_FIRST_BYTE_TIMEOUT = 60.0  # Until the first non-empty text
+REQUEST_BACKOFF_BASE = 1.0  # Upper bound of the first retry delay, doubled per retry
+REQUEST_BACKOFF_MAX = 10.0
+REQUEST_LATENCY_SMOOTHING = 0.3  # Weight of the newest latency in the moving average
+
+STREAM_STATS_PATH = os.path.join(os.path.dirname(__file__), "data", "stream_stats.json")
+STREAM_STATS_WINDOW = 20  # Requests kept per model
+STREAM_STATS_DEFAULTS = {  # Used until a model has history
+    "ttfb": 3.0,
+    "duration": 25.0,
+    "chars": 1500,
+    "chars_per_sec": 80.0,
+}
+
+METRICS_PATH = os.path.join(os.path.dirname(__file__), "data", "metrics", "requests.jsonl")
+METRICS_MAX_BYTES = 5 * 1024 * 1024  # Rotate the JSONL file at this size
+METRICS_BACKUPS = 3
+METRICS_SUMMARY_WINDOW = 500  # Recent requests per model used for p50/p95
+METRICS_PROMETHEUS_FILE = "free_gpt.prom"
+
+TRANSCRIPT_DIR = os.path.join(os.path.dirname(__file__), "data", "transcripts")
+
+IMPORT_WARMUP_DELAY = 2.0  # Seconds after start-up before g4f is imported in the background
+
+QUEUE_PREFETCH = 1  # Queued prompts generated ahead of the answer being applied
+
+BATCH_POLL_INTERVAL = 0.02  # Seconds between pipeline checks of a headless job
+
+PROBE_CONCURRENCY = 8
+PROBE_TIMEOUT = 20.0
+PROBE_MESSAGES = [{"role": "user", "content": "Hi"}]
+
+MODEL_CHECK_TTL = 6 * 3600  # Re-check working models after this many seconds
+MODEL_RETRY_BASE = 10 * 60  # First retry delay for a failed model, doubled per failure
+MODEL_RETRY_MAX = 24 * 3600
+MODEL_REFRESH_INTERVAL = 30 * 60  # Background refresher period
+MODEL_REFRESH_CONCURRENCY = 2
 
 IMAGE_SYSTEM_PROMPT = "Provide a detailed description for an image generation task"
 
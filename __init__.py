@@ -14,29 +14,189 @@ bl_info = {
 
 if "bpy" in locals():
     import importlib
+    import sys
     importlib.reload(bpy)
-    importlib.reload(utils)
-    importlib.reload(dependencies)
-    importlib.reload(ui_op)
-    importlib.reload(interface)
-    importlib.reload(prompt_op)
-
-from .utils import create_models
-from .dependencies import Module_Updater
-from .ui_op import G4F_OT_ClearChat, G4F_OT_ShowCode ,G4T_Del_Message 
-from .interface import Chat_PT_history,G4f_PT_main 
-from .prompt_op import G4F_OT_Callback , G4F_TEST_OT_TestModels
+    # Dependencies before the modules importing them. Looked up in sys.modules
+    # because names like ``runtime`` are rebound to the objects imported below.
+    for name in (
+        "Settings",
+        "get_models",
+        "lazy",
+        "model_registry",
+        "logging_setup",
+        "bytecode_cache",
+        "code_compress",
+        "code_fence",
+        "console_render",
+        "context_builder",
+        "runtime",
+        "utils",
+        "dependencies",
+        "exec_context",
+        "failover",
+        "history_store",
+        "metrics",
+        "model_probe",
+        "race",
+        "response_cache",
+        "stream_stats",
+        "transcript",
+        "prompt_op",
+        "batch",
+        "ui_op",
+        "interface",
+    ):
+        module = sys.modules.get(f"{__name__}.{name}")
+        if module is not None:  # batch is only loaded by run_batch.py
+            importlib.reload(module)
+
+from .utils import cancel_warm_up, create_models, schedule_warm_up
+from .dependencies import Module_Updater, check_for_update
+from .ui_op import (
+    G4F_OT_ClearChat,
+    G4F_OT_ShowCode,
+    G4T_Del_Message,
+    G4F_OT_ClearResponseCache,
+    G4F_OT_RerunCode,
+    G4F_OT_ClearBytecodeCache,
+    G4F_OT_HistoryPage,
+    G4F_OT_MetricsSummary,
+    G4F_OT_QueuePrompt,
+    G4F_OT_RemoveQueued,
+)
+from .response_cache import response_cache
+from .bytecode_cache import bytecode_cache
+from .interface import Chat_PT_history,G4f_PT_main, G4F_PT_execution
+from .prompt_op import G4F_OT_Callback , G4F_OT_RunQueue, G4F_TEST_OT_TestModels
+from .exec_context import EXEC_SCOPES
+from .history_store import migrate_history, reset_index
+from .runtime import runtime
+from .model_probe import start_background_refresh, stop_background_refresh
+from .logging_setup import configure_logging, set_log_level, stop_logging
+from .Settings import (
+    LOG_LEVEL,
+    REQUEST_ATTEMPT_TIMEOUT,
+    REQUEST_CONNECT_TIMEOUT,
+    REQUEST_FAILOVER_MODELS,
+    REQUEST_FIRST_BYTE_TIMEOUT,
+    REQUEST_RETRIES,
+)
+from .lazy import missing_dependencies
 import bpy
 
-no_dep = False
-try:
-    import g4f
-except ModuleNotFoundError:
-    no_dep = True
+no_dep = missing_dependencies()
+
+def update_logging(self, context):
+    set_log_level(self.log_level, self.log_stream_chunks)
+
 
 class G4FPreferences(bpy.types.AddonPreferences):
     bl_idname = __name__
 
+    use_response_cache: bpy.props.BoolProperty(
+        name="Cache Responses",
+        description="Reuse the previous answer when the same model gets the same prompt and history",
+        default=True,
+    )
+    race_models: bpy.props.StringProperty(
+        name="Race Models",
+        description="Comma-separated models raced against the selected one. Leave empty to use the active models with the most wins",
+        default="",
+    )
+    context_token_budget: bpy.props.IntProperty(
+        name="Context Token Budget",
+        description="Maximum estimated tokens per request. 0 uses the per-model default",
+        default=0,
+        min=0,
+        soft_max=32000,
+    )
+    use_bytecode_disk_cache: bpy.props.BoolProperty(
+        name="Store Bytecode on Disk",
+        description="Keep compiled scripts on disk so re-runs skip compiling across sessions",
+        default=False,
+    )
+    auto_refresh_models: bpy.props.BoolProperty(
+        name="Refresh Models in Background",
+        description="Periodically re-check stale or failed models at low priority",
+        default=False,
+    )
+    request_retries: bpy.props.IntProperty(
+        name="Attempts per Model",
+        description="Attempts made with a model, with a growing random delay in between, before failing over",
+        default=REQUEST_RETRIES,
+        min=1,
+        max=5,
+    )
+    request_timeout: bpy.props.FloatProperty(
+        name="Total Deadline",
+        description="Seconds an attempt may take in total before its request is aborted",
+        default=REQUEST_ATTEMPT_TIMEOUT,
+        min=5.0,
+        soft_max=600.0,
+    )
+    connect_timeout: bpy.props.FloatProperty(
+        name="Connect Deadline",
+        description="Seconds a streaming provider has to start answering. 0 disables it",
+        default=REQUEST_CONNECT_TIMEOUT,
+        min=0.0,
+        soft_max=120.0,
+    )
+    first_byte_timeout: bpy.props.FloatProperty(
+        name="First Text Deadline",
+        description="Seconds until a streaming provider has to send the first text. 0 disables it",
+        default=REQUEST_FIRST_BYTE_TIMEOUT,
+        min=0.0,
+        soft_max=300.0,
+    )
+    failover_models: bpy.props.IntProperty(
+        name="Failover Models",
+        description="Number of active models tried, fastest and most reliable first, when the selected model keeps failing. 0 disables failover",
+        default=REQUEST_FAILOVER_MODELS,
+        min=0,
+        max=8,
+    )
+    collect_metrics: bpy.props.BoolProperty(
+        name="Record Metrics",
+        description="Write timings of every generation to data/metrics/requests.jsonl",
+        default=True,
+    )
+    prometheus_dir: bpy.props.StringProperty(
+        name="Prometheus Textfile Directory",
+        description="Directory of a node exporter textfile collector to export metrics to. Leave empty to disable",
+        default="",
+        subtype="DIR_PATH",
+    )
+    record_transcripts: bpy.props.BoolProperty(
+        name="Record Streams",
+        description="Save every provider stream with chunk timings to data/transcripts for replay",
+        default=False,
+    )
+    log_level: bpy.props.EnumProperty(
+        name="Log Level",
+        description="Minimum level written to data/g4f_callbacks.log",
+        items=[
+            ("DEBUG", "Debug", ""),
+            ("INFO", "Info", ""),
+            ("WARNING", "Warning", ""),
+            ("ERROR", "Error", ""),
+        ],
+        default=LOG_LEVEL,
+        update=update_logging,
+    )
+    log_stream_chunks: bpy.props.BoolProperty(
+        name="Log Every Chunk",
+        description="At Debug level, also log every streamed chunk. Slows down streaming",
+        default=False,
+        update=update_logging,
+    )
+    race_size: bpy.props.IntProperty(
+        name="Race Size",
+        description="Number of models sent the same prompt in race mode",
+        default=3,
+        min=2,
+        max=8,
+    )
+
     def draw(self, context):
         layout = self.layout
         col = layout.column()
@@ -45,13 +205,61 @@ class G4FPreferences(bpy.types.AddonPreferences):
             col.label(text="Install dependencies to use this add-on")
             col.operator(Module_Updater.bl_idname, text="Install Dependencies")
             return
+
+        box = col.box()
+        row = box.row()
+        row.prop(self, "use_response_cache")
+        row.operator(G4F_OT_ClearResponseCache.bl_idname, text="", icon="TRASH")
+        stats = response_cache.stats()
+        box.label(
+            text=f"Hits: {stats['hits']}  Misses: {stats['misses']}  "
+            f"Stored: {stats['disk_entries']} ({stats['disk_bytes'] / 1024:.0f} KiB)"
+        )
+
+        box = col.box()
+        row = box.row()
+        row.prop(self, "use_bytecode_disk_cache")
+        row.operator(G4F_OT_ClearBytecodeCache.bl_idname, text="", icon="TRASH")
+        stats = bytecode_cache.stats()
+        box.label(
+            text=f"Bytecode hits: {stats['hits']}  Misses: {stats['misses']}  "
+            f"Cached: {stats['memory_entries']} in memory, {stats['disk_entries']} on disk"
+        )
+
+        col.prop(self, "context_token_budget")
+        col.prop(self, "auto_refresh_models")
+
+        box = col.box()
+        box.label(text="Retries and Deadlines")
+        box.prop(self, "request_retries")
+        box.prop(self, "request_timeout")
+        box.prop(self, "connect_timeout")
+        box.prop(self, "first_byte_timeout")
+        box.prop(self, "failover_models")
+
+        box = col.box()
+        row = box.row()
+        row.prop(self, "collect_metrics")
+        row.operator(G4F_OT_MetricsSummary.bl_idname, text="", icon="TEXT")
+        box.prop(self, "prometheus_dir")
+        box.prop(self, "record_transcripts")
+
+        row = col.row()
+        row.prop(self, "log_level")
+        sub = row.row()
+        sub.active = self.log_level == "DEBUG"
+        sub.prop(self, "log_stream_chunks")
+
+        box = col.box()
+        box.label(text="Race Mode")
+        box.prop(self, "race_size")
+        box.prop(self, "race_models")
         
         if bpy.app.online_access:
-            try:
-                is_update = g4f.version.utils.current_version != g4f.version.utils.latest_version
-            except:
-                is_update = False
-            if is_update:
+            is_update = check_for_update()
+            if is_update is None:
+                col.label(text="Checking for updates...")
+            elif is_update:
                 row = col.row()
                 row.label(text="New version available")
                 text = "Update Dependencies" if not Module_Updater.is_working else "Updating..."
@@ -66,10 +274,19 @@ classes = [
     G4FPreferences,
     Chat_PT_history,
     G4f_PT_main,
+    G4F_PT_execution,
     G4F_OT_ClearChat,
     G4F_OT_Callback,
     G4T_Del_Message,
     G4F_OT_ShowCode,
+    G4F_OT_ClearResponseCache,
+    G4F_OT_RerunCode,
+    G4F_OT_ClearBytecodeCache,
+    G4F_OT_HistoryPage,
+    G4F_OT_MetricsSummary,
+    G4F_OT_QueuePrompt,
+    G4F_OT_RemoveQueued,
+    G4F_OT_RunQueue,
     Module_Updater,
     G4F_TEST_OT_TestModels
 ]
@@ -77,7 +294,13 @@ classes = [
 def register():
     for cls in classes:
         bpy.utils.register_class(cls)
+    configure_logging()
+    addon = bpy.context.preferences.addons.get(__name__)
+    if addon is not None:
+        set_log_level(addon.preferences.log_level, addon.preferences.log_stream_chunks)
     bpy.types.Scene.g4f_chat_history = bpy.props.CollectionProperty(type=bpy.types.PropertyGroup)
+    bpy.types.Scene.g4f_history_blobs = bpy.props.CollectionProperty(type=bpy.types.PropertyGroup)
+    bpy.types.Scene.g4f_prompt_queue = bpy.props.CollectionProperty(type=bpy.types.PropertyGroup)
     create_models()
     bpy.types.Scene.g4f_chat_input = bpy.props.StringProperty(
         name="Message",
@@ -92,19 +315,76 @@ def register():
         max=1.0,
         subtype='PERCENTAGE'
     )
+    bpy.types.Scene.g4f_eta = bpy.props.FloatProperty(
+        name="Remaining Time",
+        description="Estimated seconds until the response is complete, negative if unknown",
+        default=-1.0,
+    )
     bpy.types.PropertyGroup.type = bpy.props.StringProperty()
     bpy.types.PropertyGroup.content = bpy.props.StringProperty()
+    bpy.types.PropertyGroup.hash = bpy.props.StringProperty()
+    bpy.types.PropertyGroup.length = bpy.props.IntProperty()
+    bpy.types.PropertyGroup.preview = bpy.props.StringProperty()
     bpy.types.Scene.g4f_button_pressed = bpy.props.BoolProperty()
-    
+    bpy.types.Scene.g4f_history_page = bpy.props.IntProperty(min=0)
+    bpy.types.Scene.g4f_race_mode = bpy.props.BoolProperty(
+        name="Race Models",
+        description="Send the prompt to several models at once and keep the first answer with working code",
+        default=False,
+    )
+    bpy.types.Scene.g4f_pipeline_exec = bpy.props.BoolProperty(
+        name="Run While Streaming",
+        description="Execute each code block as soon as it has fully arrived instead of waiting for the whole answer",
+        default=False,
+    )
+    bpy.types.Scene.g4f_compress_history = bpy.props.BoolProperty(
+        name="Outline Old Scripts",
+        description="Send earlier scripts as outlines (imports, signatures, created names and last error) "
+        "and only the latest script in full",
+        default=True,
+    )
+    bpy.types.Scene.g4f_exec_scope = bpy.props.EnumProperty(
+        name="Selection Scope",
+        description="Objects generated code sees as selected",
+        items=EXEC_SCOPES,
+        default="SCENE",
+    )
+    bpy.types.Scene.g4f_exec_collection = bpy.props.PointerProperty(
+        name="Collection",
+        description="Collection exposed to generated code",
+        type=bpy.types.Collection,
+    )
+    start_background_refresh()
+    if not no_dep:
+        schedule_warm_up()
+    bpy.app.handlers.load_post.append(migrate_history)
+    bpy.app.handlers.undo_post.append(reset_index)
+    bpy.app.handlers.redo_post.append(reset_index)
 
 
 def unregister():
     for cls in classes:
         bpy.utils.unregister_class(cls)
     del bpy.types.Scene.g4f_progress
+    del bpy.types.Scene.g4f_eta
     del bpy.types.Scene.g4f_chat_history
+    del bpy.types.Scene.g4f_history_blobs
+    del bpy.types.Scene.g4f_prompt_queue
     del bpy.types.Scene.g4f_chat_input
     del bpy.types.Scene.g4f_button_pressed
+    del bpy.types.Scene.g4f_history_page
+    del bpy.types.Scene.g4f_race_mode
+    del bpy.types.Scene.g4f_pipeline_exec
+    del bpy.types.Scene.g4f_compress_history
+    del bpy.types.Scene.g4f_exec_scope
+    del bpy.types.Scene.g4f_exec_collection
+    stop_background_refresh()
+    cancel_warm_up()
+    runtime.shutdown()
+    bpy.app.handlers.load_post.remove(migrate_history)
+    bpy.app.handlers.undo_post.remove(reset_index)
+    bpy.app.handlers.redo_post.remove(reset_index)
+    stop_logging()
 
 
 if __name__ == "__main__":
@@ -0,0 +1,188 @@
+import json
+import os
+import re
+import time
+import traceback
+
+import bpy
+
+from .Settings import BATCH_POLL_INTERVAL
+from .prompt_op import GenerationMixin
+from .model_registry import model_registry
+from .utils import setup_logger
+
+
+def load_jobs(path):
+    """Read batch jobs from a JSON lines file.
+
+    Each line is an object with a ``prompt`` and optionally ``blend`` (file to
+    open, relative to the jobs file), ``model`` (defaults to the model saved in
+    the file), ``id``, ``timeout`` in seconds and ``save`` (default true).
+    Blank lines and lines starting with ``#`` are skipped.
+
+    Raises:
+        ValueError: A line is not a JSON object with a prompt.
+    """
+    base = os.path.dirname(os.path.abspath(path))
+    jobs = []
+    with open(path, "r", encoding="utf-8") as f:
+        for number, line in enumerate(f, 1):
+            line = line.strip()
+            if not line or line.startswith("#"):
+                continue
+            try:
+                job = json.loads(line)
+            except json.JSONDecodeError as e:
+                raise ValueError(f"{path}:{number}: {e}") from e
+            if not isinstance(job, dict) or not job.get("prompt"):
+                raise ValueError(f"{path}:{number}: a job needs a prompt")
+            if job.get("blend"):
+                job["blend"] = os.path.join(base, job["blend"])
+            job.setdefault("id", f"line-{number:05d}")
+            jobs.append(job)
+    return jobs
+
+
+class HeadlessGeneration(GenerationMixin):
+    """Run one generation to completion without a window or modal timer.
+
+    Used when Blender runs in the background. Reports are collected instead
+    of shown.
+    """
+
+    replay_path = ""
+    replay_speed = 0.0
+
+    def __init__(self):
+        super().__init__()
+        self.reports = []
+
+    def report(self, type, message):
+        self.reports.append({"type": sorted(type)[0], "message": message})
+
+    def run(self, context, model=None, timeout=None):
+        """Generate, extract and execute the prompt on ``context.scene``.
+
+        Args:
+            context: Blender context.
+            model (str): Model to ask, defaults to the one selected on the scene.
+            timeout (float): Cancel the generation after this many seconds.
+
+        Returns:
+            dict: The finished metrics record of the request.
+        """
+        if not self.start(context, model):
+            raise RuntimeError(self.reports[-1]["message"])
+        deadline = time.monotonic() + timeout if timeout else None
+        while not self._future.done():
+            if self.pipelined and not self.is_cancelled:
+                self.run_ready_blocks(context)
+            if deadline is not None and time.monotonic() > deadline and not self.is_cancelled:
+                self.logger.warning(f"Job timed out after {timeout}s")
+                self.error = TimeoutError(f"No answer within {timeout}s")
+                self.is_cancelled = True
+                self._future.cancel()
+            time.sleep(BATCH_POLL_INTERVAL)
+
+        if self.is_done and not self.is_cancelled:
+            self.callback(context, self.code_buffers, self.is_image_model)
+        elif self.executed_count:
+            self.logger.warning(
+                f"{self.executed_count} pipelined block(s) ran before the job failed"
+            )
+        self.cleanup(context)
+        return self.last_metrics
+
+
+def job_filename(job_id):
+    return re.sub(r"[^\w.-]+", "_", str(job_id))
+
+
+def run_job(job, output_dir):
+    """Open the job's file, run its prompt and save the result.
+
+    Args:
+        job (dict): A job from :func:`load_jobs`.
+        output_dir (str): Directory the resulting .blend file is saved to.
+
+    Returns:
+        dict: The job's report.
+    """
+    logger = setup_logger()
+    started = time.monotonic()
+    result = {
+        "id": job["id"],
+        "blend": job.get("blend"),
+        "model": job.get("model"),
+        "prompt": job["prompt"],
+        "status": "error",
+        "error": None,
+        "output": None,
+    }
+    try:
+        if job.get("blend"):
+            bpy.ops.wm.open_mainfile(filepath=job["blend"])
+        else:
+            bpy.ops.wm.read_homefile(use_empty=True)
+        context = bpy.context
+        context.scene.g4f_chat_input = job["prompt"]
+        result["model"] = job.get("model") or model_registry.resolve(context.scene.ai_models)
+
+        generation = HeadlessGeneration()
+        record = generation.run(context, result["model"], job.get("timeout"))
+        blocks = record["blocks"]
+        result.update(
+            status=record["status"],
+            error=record["error"],
+            answered_by=record.get("answered_by"),
+            blocks=len(blocks),
+            blocks_ok=sum(1 for block in blocks if block.get("ok")),
+            ttfb=record.get("ttfb"),
+            tokens=record.get("tokens"),
+            reports=generation.reports,
+        )
+
+        if job.get("save", True):
+            output = os.path.join(output_dir, job_filename(job["id"]) + ".blend")
+            bpy.ops.wm.save_as_mainfile(filepath=output, copy=True)
+            result["output"] = output
+    except Exception as e:
+        logger.error(f"Batch job {job['id']} failed: {e}\n{traceback.format_exc()}")
+        result["error"] = str(e)
+    result["duration"] = time.monotonic() - started
+    return result
+
+
+def run_jobs(jobs_path, output_dir, start=0, stop=None, report_path=None):
+    """Run a slice of a jobs file one after another in this Blender process.
+
+    Each report is appended to ``report_path`` as soon as its job finishes, so a
+    crash only loses the job that was running.
+
+    Args:
+        jobs_path (str): JSON lines file read with :func:`load_jobs`.
+        output_dir (str): Directory for the saved files and the default report.
+        start (int): Index of the first job to run.
+        stop (int): Index after the last job, None for the end of the file.
+        report_path (str): Defaults to ``report.jsonl`` in ``output_dir``.
+
+    Returns:
+        list: The reports of the jobs that ran.
+    """
+    jobs = load_jobs(jobs_path)
+    os.makedirs(output_dir, exist_ok=True)
+    report_path = report_path or os.path.join(output_dir, "report.jsonl")
+    results = []
+    with open(report_path, "a", encoding="utf-8") as report:
+        for index in range(start, min(stop if stop is not None else len(jobs), len(jobs))):
+            result = run_job(jobs[index], output_dir)
+            result["index"] = index
+            report.write(json.dumps(result) + "\n")
+            report.flush()
+            results.append(result)
+            print(
+                f"[{index + 1}/{len(jobs)}] {result['id']}: {result['status']} "
+                f"in {result['duration']:.1f}s" + (f" ({result['error']})" if result["error"] else ""),
+                flush=True,
+            )
+    return results
@@ -0,0 +1,109 @@
+"""Benchmark the context override built before executing generated code.
+
+Fakes scenes of 1k/10k/100k objects and compares the old per-block override
+(``bpy.context.copy()`` plus ``list(scene.objects)`` for every block) with
+``exec_context.build_override`` called once per response for each scope.
+
+The fake collection creates a wrapper per item on iteration, like RNA does, and
+the fake ``copy()`` materializes the object-list members a 3D View context
+exposes. Absolute numbers differ from Blender; the scaling is what matters.
+
+Usage:
+    python benchmarks/bench_exec_context.py [--blocks 5] [--sizes 1000 10000 100000]
+"""
+import argparse
+import os
+import sys
+import time
+import tracemalloc
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from exec_context import build_override
+
+COPIED_LIST_MEMBERS = (
+    "visible_objects",
+    "selectable_objects",
+    "selected_objects",
+    "editable_objects",
+    "selected_editable_objects",
+    "objects_in_mode",
+)
+
+
+class FakeObjectRef:
+    __slots__ = ("obj",)
+
+    def __init__(self, obj):
+        self.obj = obj
+
+
+class FakeCollection:
+    """Stands in for ``bpy_prop_collection``: iteration allocates a new reference per item."""
+
+    def __init__(self, objects):
+        self._objects = objects
+
+    def __iter__(self):
+        for obj in self._objects:
+            yield FakeObjectRef(obj)
+
+    def __len__(self):
+        return len(self._objects)
+
+
+class FakeScene:
+    def __init__(self, count):
+        self.objects = FakeCollection([object() for _ in range(count)])
+
+
+class FakeContext:
+    def __init__(self, count):
+        self.scene = FakeScene(count)
+
+    def copy(self):
+        override = {name: list(self.scene.objects) for name in COPIED_LIST_MEMBERS}
+        override["scene"] = self.scene
+        return override
+
+
+def old_override(context):
+    override = context.copy()
+    override["selected_objects"] = list(context.scene.objects)
+    return override
+
+
+def measure(func, context, blocks, per_block):
+    tracemalloc.start()
+    start = time.perf_counter()
+    if per_block:
+        for _ in range(blocks):
+            func(context)
+    else:
+        func(context)
+    elapsed = time.perf_counter() - start
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return 1e3 * elapsed / blocks, peak / 1024
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--blocks", type=int, default=5, help="Code blocks per response")
+    parser.add_argument("--sizes", type=int, nargs="+", default=[1000, 10000, 100000])
+    args = parser.parse_args()
+
+    cases = [("per-block copy+list (old)", old_override, True)]
+    for scope in ("SCENE", "SELECTED", "SNAPSHOT"):
+        cases.append((f"once per response {scope}", lambda c, s=scope: build_override(c, s), False))
+
+    print(f"{'objects':>8}  {'strategy':<30}{'ms/block':>10}{'peak KiB':>12}")
+    for size in args.sizes:
+        context = FakeContext(size)
+        for name, func, per_block in cases:
+            ms, peak = measure(func, context, args.blocks, per_block)
+            print(f"{size:>8}  {name:<30}{ms:>10.3f}{peak:>12.0f}")
+
+
+if __name__ == "__main__":
+    main()
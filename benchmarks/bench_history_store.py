@@ -0,0 +1,122 @@
+"""Measure .blend size and save/load time for a long chat history.
+
+Fills a scene with N chat turns twice: once with bodies as raw ``content``
+strings on the history collection (the old layout), once through
+``history_store`` (compressed, deduplicated blobs plus lightweight handles). Each
+variant is filled, saved and reloaded, and the time to walk the history after
+loading is measured the way the panel does it.
+
+Run inside Blender, or with the ``bpy`` module from PyPI installed:
+    blender -b --factory-startup --python benchmarks/bench_history_store.py -- [--turns 1000]
+    python benchmarks/bench_history_store.py -- [--turns 1000]
+"""
+import argparse
+import os
+import random
+import sys
+import tempfile
+import time
+import types
+
+import bpy
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+package = types.ModuleType("free_gpt")
+package.__path__ = [ROOT]
+sys.modules.setdefault("free_gpt", package)
+
+from free_gpt import history_store  # noqa: E402
+
+PROMPTS = [
+    "create 10 cubes in random locations",
+    "make them red",
+    "add a sun light above the scene",
+    "animate the cubes rotating",
+]
+
+
+def make_script(rng, lines):
+    body = ["import bpy", "import random", ""]
+    for i in range(lines):
+        body.append(
+            f"bpy.ops.mesh.primitive_cube_add(location=({rng.randint(-10, 10)}, "
+            f"{rng.randint(-10, 10)}, {rng.randint(-10, 10)}))  # cube {i}"
+        )
+    return "\n".join(body)
+
+
+def register_properties():
+    bpy.types.PropertyGroup.type = bpy.props.StringProperty()
+    bpy.types.PropertyGroup.content = bpy.props.StringProperty()
+    bpy.types.PropertyGroup.hash = bpy.props.StringProperty()
+    bpy.types.PropertyGroup.length = bpy.props.IntProperty()
+    bpy.types.PropertyGroup.preview = bpy.props.StringProperty()
+    bpy.types.Scene.g4f_chat_history = bpy.props.CollectionProperty(type=bpy.types.PropertyGroup)
+    bpy.types.Scene.g4f_history_blobs = bpy.props.CollectionProperty(type=bpy.types.PropertyGroup)
+
+
+def fill(turns, use_store):
+    rng = random.Random(0)
+    history = bpy.context.scene.g4f_chat_history
+    history.clear()
+    for _ in range(turns):
+        prompt = rng.choice(PROMPTS)
+        script = make_script(rng, rng.randint(20, 120))
+        if use_store:
+            history_store.add_message(history, "user", prompt)
+            history_store.add_message(history, "assistant", script)
+        else:
+            for message_type, body in (("user", prompt), ("assistant", script)):
+                message = history.add()
+                message.type = message_type
+                message.content = body
+
+
+def walk_history(use_store):
+    total = 0
+    for message in bpy.context.scene.g4f_chat_history:
+        total += len(history_store.get_preview(message) if use_store else message.content)
+    return total
+
+
+def run(turns, use_store, directory):
+    bpy.ops.wm.read_factory_settings(use_empty=True)
+    history_store.reset_index()
+    start = time.perf_counter()
+    fill(turns, use_store)
+    fill_time = time.perf_counter() - start
+    path = os.path.join(directory, f"history_{'store' if use_store else 'raw'}.blend")
+
+    start = time.perf_counter()
+    bpy.ops.wm.save_as_mainfile(filepath=path, compress=False)
+    save_time = time.perf_counter() - start
+
+    start = time.perf_counter()
+    bpy.ops.wm.open_mainfile(filepath=path)
+    load_time = time.perf_counter() - start
+
+    start = time.perf_counter()
+    walk_history(use_store)
+    walk_time = time.perf_counter() - start
+    return os.path.getsize(path), fill_time, save_time, load_time, walk_time
+
+
+def main():
+    argv = sys.argv[sys.argv.index("--") + 1:] if "--" in sys.argv else []
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--turns", type=int, default=1000)
+    args = parser.parse_args(argv)
+
+    register_properties()
+    with tempfile.TemporaryDirectory() as directory:
+        print(f"{'layout':<8}{'size KiB':>10}{'fill ms':>10}{'save ms':>10}{'load ms':>10}{'walk ms':>10}")
+        for use_store in (False, True):
+            size, fill_time, save_time, load_time, walk_time = run(args.turns, use_store, directory)
+            print(
+                f"{'store' if use_store else 'raw':<8}{size / 1024:>10.0f}{1e3 * fill_time:>10.1f}"
+                f"{1e3 * save_time:>10.1f}{1e3 * load_time:>10.1f}{1e3 * walk_time:>10.1f}"
+            )
+
+
+if __name__ == "__main__":
+    main()
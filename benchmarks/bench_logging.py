@@ -0,0 +1,111 @@
+"""Benchmark the logging cost paid by the streaming loop per chunk.
+
+Compares the old setup (``basicConfig`` at DEBUG writing straight to the file,
+two ``repr()`` lines per chunk) with ``logging_setup`` at its defaults (INFO,
+per-chunk lines off) and with per-chunk debug switched on, which still moves
+file I/O to the listener thread.
+
+Only the time spent on the streaming thread is measured; the listener's time
+to drain the queue is reported separately.
+
+Usage:
+    python benchmarks/bench_logging.py [--chunks 20000] [--runs 3]
+"""
+import argparse
+import importlib
+import logging
+import os
+import sys
+import tempfile
+import time
+import types
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Load the add-on modules as a package so their relative imports resolve
+package = types.ModuleType("free_gpt")
+package.__path__ = [ROOT]
+sys.modules["free_gpt"] = package
+logging_setup = importlib.import_module("free_gpt.logging_setup")
+
+
+def make_chunks(count):
+    return [f'data: {{"content": "token {i} of the answer "}}' for i in range(count)]
+
+
+def stream(logger, chunks, log_chunks):
+    start = time.perf_counter()
+    for chunk in chunks:
+        content = chunk[16:-2]
+        if log_chunks:
+            logger.debug(f"Raw chunk: {repr(chunk)} -> Parsed: {repr(content)}")
+    return time.perf_counter() - start
+
+
+def reset(name):
+    logger = logging.getLogger(name)
+    for handler in logger.handlers[:]:
+        logger.removeHandler(handler)
+        handler.close()
+    return logger
+
+
+def run_old(chunks, directory):
+    root = logging.getLogger()
+    handler = logging.FileHandler(os.path.join(directory, "old.log"))
+    handler.setFormatter(logging.Formatter("%(asctime)s - %(levelname)s - %(message)s"))
+    root.addHandler(handler)
+    root.setLevel(logging.DEBUG)
+    logger = reset("G4F_Old")
+    logger.setLevel(logging.NOTSET)
+    logger.propagate = True
+    try:
+        return stream(logger, chunks, True), 0.0
+    finally:
+        root.removeHandler(handler)
+        handler.close()
+        root.setLevel(logging.WARNING)
+
+
+def run_new(chunks, directory, level, chunk_debug):
+    logger = logging_setup.configure_logging(path=os.path.join(directory, "new.log"))
+    logging_setup.set_log_level(level, chunk_debug)
+    try:
+        elapsed = stream(logger, chunks, logging_setup.log_chunks_enabled())
+        start = time.perf_counter()
+    finally:
+        logging_setup.stop_logging()  # Waits until the listener has drained the queue
+    return elapsed, time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n")[0])
+    parser.add_argument("--chunks", type=int, default=20000)
+    parser.add_argument("--runs", type=int, default=3)
+    args = parser.parse_args()
+    chunks = make_chunks(args.chunks)
+
+    cases = [
+        ("old: basicConfig DEBUG, repr per chunk", lambda d: run_old(chunks, d)),
+        ("new: INFO, chunk debug off", lambda d: run_new(chunks, d, "INFO", False)),
+        ("new: DEBUG, chunk debug off", lambda d: run_new(chunks, d, "DEBUG", False)),
+        ("new: DEBUG, chunk debug on (queued)", lambda d: run_new(chunks, d, "DEBUG", True)),
+    ]
+    print(f"{args.chunks} chunks, best of {args.runs} runs")
+    print(f"{'setup':<40}{'stream thread':>16}{'per chunk':>12}{'drain':>10}")
+    for name, case in cases:
+        best = None
+        for _ in range(args.runs):
+            with tempfile.TemporaryDirectory() as directory:
+                result = case(directory)
+            if best is None or result[0] < best[0]:
+                best = result
+        elapsed, drain = best
+        print(
+            f"{name:<40}{elapsed * 1000:>13.1f} ms"
+            f"{elapsed / len(chunks) * 1e6:>9.2f} us{drain * 1000:>7.0f} ms"
+        )
+
+
+if __name__ == "__main__":
+    main()
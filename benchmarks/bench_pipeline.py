@@ -0,0 +1,151 @@
+"""End-to-end benchmark of G4F_OT_Callback without Blender or network.
+
+Runs the whole operator through ``offline.py``: message formatting, the g4f
+client, SSE parsing, console rendering, fence extraction, compile, exec and
+the chat history, against a scripted provider streaming from memory. Chunks
+arrive as fast as they are consumed unless ``--rate`` is given, so the numbers
+are the add-on's own overhead.
+
+Per-stage times come from the add-on's request metrics plus wrappers around
+the formatting, SSE, rendering and history functions. CPU time is process
+time; peak memory is measured in a second pass under tracemalloc so it does
+not slow down the timed pass.
+
+Usage:
+    python benchmarks/bench_pipeline.py [--chunks 500 2000 8000] [--chunk-size 12]
+        [--rate 0] [--sse] [--runs 3]
+"""
+import argparse
+import collections
+import math
+import resource
+import time
+import tracemalloc
+
+import offline
+
+STAGES = (
+    ("format", "build_context"),
+    ("sse", "parse_stream_chunk"),
+    ("render", "StreamingMarkdown"),
+    ("extract", "extract_time"),
+    ("compile", "compile_time"),
+    ("exec", "exec_time"),
+    ("history", "add_message"),
+)
+
+
+class StageTimer:
+    """Accumulate time spent in wrapped functions, per stage."""
+
+    def __init__(self):
+        self.totals = collections.Counter()
+
+    def wrap(self, stage, function):
+        totals = self.totals
+
+        def timed(*args, **kwargs):
+            start = time.perf_counter()
+            try:
+                return function(*args, **kwargs)
+            finally:
+                totals[stage] += time.perf_counter() - start
+
+        return timed
+
+
+def instrument(addon, timer):
+    prompt_op = addon.prompt_op
+    prompt_op.build_context = timer.wrap("format", prompt_op.build_context)
+    prompt_op.parse_stream_chunk = timer.wrap("sse", prompt_op.parse_stream_chunk)
+    prompt_op.add_message = timer.wrap("history", prompt_op.add_message)
+
+    base = prompt_op.StreamingMarkdown
+
+    class TimedMarkdown(base):
+        feed = timer.wrap("render", base.feed)
+        finish = timer.wrap("render", base.finish)
+
+    prompt_op.StreamingMarkdown = TimedMarkdown
+
+
+def make_script(chunk_count, chunk_size, rate, sse):
+    block = offline.scripted_response(blocks=1)
+    blocks = max(1, math.ceil(chunk_count * chunk_size / len(block)))
+    chunks = offline.split_chunks(offline.scripted_response(blocks=blocks), chunk_size, sse)
+    chunks = chunks[:chunk_count]
+    delay = 1.0 / rate if rate else 0.0
+    return [(delay, chunk) for chunk in chunks]
+
+
+def run_once(addon, timer, script, trace_memory=False):
+    addon.provider.script = script
+    context = offline.make_context(addon)
+    timer.totals.clear()
+    if trace_memory:
+        tracemalloc.start()
+    cpu = time.process_time()
+    wall = time.perf_counter()
+    status, execute_seconds, operator = offline.run_generation(addon, context, "Add a ring of cubes")
+    wall = time.perf_counter() - wall
+    cpu = time.process_time() - cpu
+    peak = None
+    if trace_memory:
+        peak = tracemalloc.get_traced_memory()[1]
+        tracemalloc.stop()
+    record = addon.metrics_records[-1]
+    if record["status"] != "ok":
+        raise RuntimeError(f"Generation failed: {record['error']}")
+    stages = dict(timer.totals)
+    for stage, key in STAGES:
+        if key in record:
+            stages[stage] = record[key]
+    stages["execute"] = execute_seconds
+    stages["ttfb"] = record["ttfb"]
+    stages["stream"] = record["stream_duration"]
+    return {"wall": wall, "cpu": cpu, "peak": peak, "stages": stages}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n")[0])
+    parser.add_argument("--chunks", type=int, nargs="+", default=[500, 2000, 8000])
+    parser.add_argument("--chunk-size", type=int, default=12, help="Characters per chunk")
+    parser.add_argument("--rate", type=float, default=0.0, help="Chunks per second, 0 for unthrottled")
+    parser.add_argument("--sse", action="store_true", help="Wrap chunks as SSE data lines")
+    parser.add_argument("--runs", type=int, default=3)
+    args = parser.parse_args()
+
+    addon = offline.load_addon()
+    timer = StageTimer()
+    instrument(addon, timer)
+    try:
+        # Warm up imports, the g4f client and the bytecode cache
+        run_once(addon, timer, make_script(50, args.chunk_size, 0, args.sse))
+
+        names = ["execute", "format", "ttfb", "stream", "sse", "render", "extract", "compile", "exec", "history"]
+        print(
+            f"chunk size {args.chunk_size}, rate {args.rate or 'unthrottled'}, "
+            f"{'SSE' if args.sse else 'plain'} chunks, best of {args.runs} runs, times in ms"
+        )
+        print(
+            f"{'chunks':>7}{'wall':>9}"
+            + "".join(f"{name:>9}" for name in names)
+            + f"{'cpu/1k':>9}{'peak KiB':>10}"
+        )
+        for count in args.chunks:
+            script = make_script(count, args.chunk_size, args.rate, args.sse)
+            best = min((run_once(addon, timer, script) for _ in range(args.runs)), key=lambda r: r["wall"])
+            peak = run_once(addon, timer, script, trace_memory=True)["peak"]
+            stages = best["stages"]
+            print(
+                f"{len(script):>7}{best['wall'] * 1000:>9.1f}"
+                + "".join(f"{stages.get(name, 0.0) * 1000:>9.1f}" for name in names)
+                + f"{best['cpu'] / len(script) * 1e6:>9.1f}{peak / 1024:>10.0f}"
+            )
+        print(f"max RSS {resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024:.0f} MiB")
+    finally:
+        addon.runtime.shutdown()
+
+
+if __name__ == "__main__":
+    main()
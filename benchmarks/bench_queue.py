@@ -0,0 +1,104 @@
+"""Compare running prompts one by one with the prefetching prompt queue.
+
+Each scripted answer streams for ``--network`` seconds and holds one block that
+runs for ``--exec`` seconds on the main thread, the shape of a multi-step
+scripted build. One by one, every prompt waits for the previous answer to run
+before it is sent. The queue sends prompt N+1 as soon as answer N is
+generated, so its network time overlaps the execution of answer N.
+
+The queue is also checked for correctness: answers land in the history in
+prompt order, and every request after the first carries the previous answer.
+
+Usage:
+    python benchmarks/bench_queue.py [--prompts 6] [--network 0.4] [--exec 0.4]
+"""
+import argparse
+import sys
+import time
+
+import offline
+
+
+def make_script(network, exec_seconds, step, chunk_size=12):
+    answer = (
+        f"Step {step}.\n\n```python\nimport time\n\n"
+        f"time.sleep({exec_seconds})\nbpy.ops.mesh.primitive_cube_add()\n```\n"
+    )
+    chunks = offline.split_chunks(answer, chunk_size)
+    return [(network / len(chunks), chunk) for chunk in chunks]
+
+
+def record_requests(addon):
+    """Capture the messages of every request the scripted provider gets."""
+    provider = addon.provider
+    requests = []
+    stream = provider.create_async_generator.__func__
+
+    @classmethod
+    async def create_async_generator(cls, model, messages, **kwargs):
+        requests.append(messages)
+        async for chunk in stream(cls, model, messages, **kwargs):
+            yield chunk
+
+    provider.create_async_generator = create_async_generator
+    return requests
+
+
+def history_prompts(addon, context):
+    history_store = addon.prompt_op.get_content
+    return [
+        history_store(message)
+        for message in context.scene.g4f_chat_history
+        if message.type == "user"
+    ]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n")[0])
+    parser.add_argument("--prompts", type=int, default=6)
+    parser.add_argument("--network", type=float, default=0.4, help="Seconds each answer streams")
+    parser.add_argument("--exec", type=float, default=0.4, dest="exec_seconds", help="Seconds each answer runs")
+    args = parser.parse_args()
+
+    addon = offline.load_addon()
+    requests = record_requests(addon)
+    prompts = [f"Build step {i + 1}" for i in range(args.prompts)]
+    addon.provider.script = make_script(args.network, args.exec_seconds, 1)
+    try:
+        context = offline.make_context(addon)
+        start = time.perf_counter()
+        for prompt in prompts:
+            offline.run_generation(addon, context, prompt)
+        one_by_one = time.perf_counter() - start
+
+        context = offline.make_context(addon)
+        requests.clear()
+        start = time.perf_counter()
+        status, _, operator = offline.run_queue(addon, context, prompts)
+        queued = time.perf_counter() - start
+
+        problems = []
+        if status != {"FINISHED"} or operator.applied != len(prompts):
+            problems.append(f"queue ended with {status} after {operator.applied} prompts")
+        if history_prompts(addon, context) != prompts:
+            problems.append(f"history order {history_prompts(addon, context)}")
+        for i, messages in enumerate(requests[1:], 1):
+            previous = [m["content"] for m in messages if m["role"] == "user"]
+            if not any(prompts[i - 1] in content for content in previous):
+                problems.append(f"request {i + 1} does not carry prompt {i}")
+            if not any(m["role"] == "assistant" for m in messages):
+                problems.append(f"request {i + 1} has no earlier answer")
+
+        ideal = args.prompts * max(args.network, args.exec_seconds) + min(args.network, args.exec_seconds)
+        print(f"{args.prompts} prompts, {args.network}s network and {args.exec_seconds}s exec each")
+        print(f"one by one {one_by_one:7.2f}s")
+        print(f"queue      {queued:7.2f}s  {one_by_one / queued:.2f}x, ideal overlap {ideal:.2f}s")
+        for problem in problems:
+            print(f"PROBLEM {problem}")
+        return 1 if problems else 0
+    finally:
+        addon.runtime.shutdown()
+
+
+if __name__ == "__main__":
+    sys.exit(main())
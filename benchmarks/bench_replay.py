@@ -0,0 +1,167 @@
+"""Replay recorded provider streams through G4F_OT_Callback and check for regressions.
+
+Transcripts are recorded in Blender with the "Record Streams" preference and
+land in ``data/transcripts``. Each one is replayed through the full operator
+with the offline harness (no Blender, no network) and measured: chunks per
+second, time in rendering, extraction, compile and exec, and how many blocks
+were extracted and ran.
+
+With ``--baseline`` the results are compared against an earlier
+``--save-baseline`` run: the exit status is 1 if a transcript got slower than
+the tolerance allows or extracted or ran a different number of blocks. The
+stand-in ``bpy`` only covers what the add-on needs, so generated code that
+uses more of the API fails to run; that is the same on both sides of a
+comparison.
+
+Usage:
+    python benchmarks/bench_replay.py CORPUS [CORPUS ...] [--speed 0] [--runs 3]
+        [--save-baseline FILE] [--baseline FILE] [--tolerance 0.25]
+    python benchmarks/bench_replay.py --make-sample data/transcripts/sample.jsonl.gz
+"""
+import argparse
+import json
+import os
+import sys
+import time
+
+import offline
+
+
+def find_transcripts(paths):
+    found = []
+    for path in paths:
+        if os.path.isdir(path):
+            found.extend(
+                os.path.join(path, name)
+                for name in sorted(os.listdir(path))
+                if name.endswith(".jsonl.gz")
+            )
+        else:
+            found.append(path)
+    return found
+
+
+def make_sample(addon, path, chunk_size=12, rate=200.0):
+    """Write a synthetic transcript, for trying the runner without a recorded corpus."""
+    transcript_module = addon.transcript
+    chunks = offline.split_chunks(offline.scripted_response(blocks=3), chunk_size)
+    messages = [
+        {"role": "system", "content": "You are an assistant made for Blender."},
+        {"role": "user", "content": "Add a ring of cubes"},
+    ]
+    transcript = transcript_module.Transcript(
+        offline.BENCH_MODEL,
+        messages,
+        chunks=[(0.2 + i / rate, chunk) for i, chunk in enumerate(chunks)],
+        duration=0.2 + len(chunks) / rate,
+    )
+    return transcript.save(path)
+
+
+def replay(addon, path, speed):
+    context = offline.make_context(addon)
+    records = len(addon.metrics_records)
+    start = time.perf_counter()
+    status, _, operator = offline.run_generation(
+        addon, context, "", replay_path=path, replay_speed=speed
+    )
+    wall = time.perf_counter() - start
+    if len(addon.metrics_records) == records:
+        reports = "; ".join(message for _, message in operator.__dict__.get("reports", []))
+        sys.exit(f"{path}: replay ended with {status} before metrics were written: {reports or 'no report'}")
+    record = addon.metrics_records[-1]
+    transcript = operator.replay
+    blocks = record["blocks"]
+    return {
+        "status": record["status"],
+        "error": record["error"],
+        "chunks": len(transcript.chunks),
+        "wall": wall,
+        "chunks_per_sec": len(transcript.chunks) / max(record["stream_duration"] or wall, 1e-9),
+        "stream": record["stream_duration"],
+        "extract": record["extract_time"],
+        "compile": record["compile_time"],
+        "exec": record["exec_time"],
+        "blocks": len(blocks),
+        "blocks_ok": sum(1 for block in blocks if block["ok"]),
+    }
+
+
+def compare(results, baseline, tolerance):
+    """Return a list of regression messages."""
+    problems = []
+    for name, result in results.items():
+        before = baseline.get(name)
+        if before is None:
+            continue
+        if result["chunks_per_sec"] < before["chunks_per_sec"] * (1 - tolerance):
+            problems.append(
+                f"{name}: {result['chunks_per_sec']:.0f} chunks/s, "
+                f"baseline {before['chunks_per_sec']:.0f}"
+            )
+        for key in ("status", "blocks", "blocks_ok"):
+            if result[key] != before[key]:
+                problems.append(f"{name}: {key} {result[key]!r}, baseline {before[key]!r}")
+    return problems
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n")[0])
+    parser.add_argument("corpus", nargs="*", help="Transcript files or directories")
+    parser.add_argument("--speed", type=float, default=0.0, help="1 for recorded timing, 0 as fast as possible")
+    parser.add_argument("--runs", type=int, default=3, help="Best of N replays per transcript")
+    parser.add_argument("--baseline", help="Compare against this results file")
+    parser.add_argument("--save-baseline", help="Write the results to this file")
+    parser.add_argument("--tolerance", type=float, default=0.25, help="Allowed throughput drop")
+    parser.add_argument("--make-sample", metavar="PATH", help="Write a synthetic transcript and exit")
+    args = parser.parse_args()
+
+    addon = offline.load_addon()
+    addon.transcript = sys.modules[f"{offline.PACKAGE}.transcript"]
+    try:
+        if args.make_sample:
+            print(f"Wrote {make_sample(addon, args.make_sample)}")
+            return 0
+
+        paths = find_transcripts(args.corpus)
+        if not paths:
+            parser.error("no transcripts found")
+        missing = [path for path in paths if not os.path.isfile(path)]
+        if missing:
+            parser.error(f"no such transcript: {', '.join(missing)}")
+
+        results = {}
+        print(
+            f"{'transcript':<48}{'chunks':>7}{'chunks/s':>10}{'stream ms':>11}"
+            f"{'extract':>9}{'compile':>9}{'exec':>8}{'blocks':>8}{'ran':>5}"
+        )
+        for path in paths:
+            runs = [replay(addon, path, args.speed) for _ in range(args.runs)]
+            best = max(runs, key=lambda r: r["chunks_per_sec"])
+            name = os.path.basename(path)
+            results[name] = best
+            print(
+                f"{name[:47]:<48}{best['chunks']:>7}{best['chunks_per_sec']:>10.0f}"
+                f"{(best['stream'] or 0) * 1000:>11.1f}{best['extract'] * 1000:>9.1f}"
+                f"{best['compile'] * 1000:>9.1f}{best['exec'] * 1000:>8.1f}"
+                f"{best['blocks']:>8}{best['blocks_ok']:>5}"
+            )
+            if best["status"] != "ok":
+                print(f"  {best['status']}: {best['error']}")
+
+        if args.save_baseline:
+            with open(args.save_baseline, "w") as f:
+                json.dump(results, f, indent=2)
+        if args.baseline:
+            with open(args.baseline, "r") as f:
+                problems = compare(results, json.load(f), args.tolerance)
+            for problem in problems:
+                print(f"REGRESSION {problem}")
+            return 1 if problems else 0
+        return 0
+    finally:
+        addon.runtime.shutdown()
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,153 @@
+"""Measure what importing and registering the add-on costs at Blender start-up.
+
+Each measurement runs in a fresh ``python -X importtime`` process: the bpy
+stand-in from ``offline.py`` is installed, then the add-on package is imported
+and ``register()`` is called, the way Blender enables it on start-up. The
+``-X importtime`` report is parsed for the time spent importing g4f, rich and
+the add-on's own modules.
+
+With ``--before REV`` the same is measured for a git revision, exported to a
+temporary directory, to show what a change saves. The working tree is copied
+too, so neither run touches the logs and statistics in ``data/``.
+
+Usage:
+    python benchmarks/bench_startup.py [--before HEAD~1] [--runs 5]
+"""
+import argparse
+import json
+import os
+import shutil
+import subprocess
+import sys
+import tarfile
+import tempfile
+
+import offline
+
+HEAVY = ("g4f", "rich")
+
+SNIPPET = """
+import importlib.util, json, sys, time
+sys.path.insert(0, {benchmarks!r})
+import offline
+offline.install_bpy()
+root = {root!r}
+start = time.perf_counter()
+spec = importlib.util.spec_from_file_location(
+    "free_gpt", root + "/__init__.py", submodule_search_locations=[root]
+)
+package = importlib.util.module_from_spec(spec)
+sys.modules["free_gpt"] = package
+spec.loader.exec_module(package)
+imported = time.perf_counter()
+package.register()
+registered = time.perf_counter()
+print(json.dumps({{
+    "import": imported - start,
+    "register": registered - imported,
+    "loaded": [name for name in {heavy!r} if name in sys.modules],
+}}))
+"""
+
+
+def export_tree(revision, directory):
+    """Write the files of ``revision``, or of the working tree if None, to ``directory``."""
+    if revision is None:
+        shutil.copytree(
+            offline.ROOT,
+            directory,
+            ignore=shutil.ignore_patterns(".git", "__pycache__", "benchmarks", "transcripts", "metrics", "*.log*"),
+            dirs_exist_ok=True,
+        )
+        return
+    archive = subprocess.run(
+        ["git", "-C", offline.ROOT, "archive", "--format=tar", revision],
+        check=True,
+        capture_output=True,
+    ).stdout
+    with tempfile.TemporaryFile() as f:
+        f.write(archive)
+        f.seek(0)
+        with tarfile.open(fileobj=f) as tar:
+            tar.extractall(directory)
+
+
+def parse_importtime(stderr):
+    """Return the cumulative microseconds spent importing each package.
+
+    ``-X importtime`` lists a module after the modules it imported, indented
+    two spaces per level. Walking the report backwards visits parents first,
+    so a module is only counted if no ancestor of the same package was.
+    """
+    totals = {}
+    ancestors = []  # (depth, package) of the modules enclosing the current one
+    for line in reversed(stderr.splitlines()):
+        if not line.startswith("import time:") or line.count("|") != 2:
+            continue
+        _, cumulative, name = line.split("|")
+        try:
+            microseconds = int(cumulative)
+        except ValueError:
+            continue  # Header line
+        depth = len(name) - len(name.lstrip())
+        package = name.strip().split(".")[0]
+        while ancestors and ancestors[-1][0] >= depth:
+            ancestors.pop()
+        if all(parent != package for _, parent in ancestors):
+            totals[package] = totals.get(package, 0) + microseconds
+        ancestors.append((depth, package))
+    return totals
+
+
+def measure(root):
+    code = SNIPPET.format(benchmarks=os.path.dirname(os.path.abspath(__file__)), root=root, heavy=HEAVY)
+    process = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", code], capture_output=True, text=True
+    )
+    if process.returncode:
+        raise RuntimeError(process.stderr[-2000:])
+    result = json.loads(process.stdout.strip().splitlines()[-1])
+    result["importtime"] = parse_importtime(process.stderr)
+    return result
+
+
+def best_of(root, runs):
+    measure(root)  # Write the bytecode caches first
+    results = [measure(root) for _ in range(runs)]
+    return min(results, key=lambda r: r["import"] + r["register"])
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n")[0])
+    parser.add_argument("--before", metavar="REV", help="Also measure this git revision")
+    parser.add_argument("--runs", type=int, default=5, help="Best of N processes")
+    args = parser.parse_args()
+
+    trees = [("working tree", None)]
+    if args.before:
+        trees.insert(0, (args.before, args.before))
+
+    rows = []
+    with tempfile.TemporaryDirectory(prefix="free_gpt_startup_") as tmp:
+        for label, revision in trees:
+            root = os.path.join(tmp, str(len(rows)))
+            export_tree(revision, root)
+            rows.append((label, best_of(root, args.runs)))
+
+    print(f"best of {args.runs} processes, times in ms")
+    print(f"{'tree':<16}{'import':>9}{'register':>10}{'total':>9}" + "".join(f"{name:>8}" for name in HEAVY) + "  imported")
+    for label, result in rows:
+        total = result["import"] + result["register"]
+        heavy = "".join(f"{result['importtime'].get(name, 0) / 1000:>8.0f}" for name in HEAVY)
+        print(
+            f"{label[:15]:<16}{result['import'] * 1000:>9.1f}{result['register'] * 1000:>10.1f}"
+            f"{total * 1000:>9.1f}{heavy}  {', '.join(result['loaded']) or '-'}"
+        )
+    if len(rows) == 2:
+        before = rows[0][1]["import"] + rows[0][1]["register"]
+        after = rows[1][1]["import"] + rows[1][1]["register"]
+        print(f"saved {(before - after) * 1000:.0f} ms per start-up ({before / after:.1f}x faster)")
+
+
+if __name__ == "__main__":
+    main()
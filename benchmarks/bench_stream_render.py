@@ -0,0 +1,101 @@
+"""Benchmark the console renderer used while streaming a response.
+
+Compares the old approach (re-parse the whole response on every chunk) with
+``StreamingMarkdown`` and prints the mean render cost per chunk for each slice of
+the response, so it is visible whether the cost grows with the response length.
+
+Usage:
+    python benchmarks/bench_stream_render.py [--chunks 300] [--buckets 3] [--skip-naive]
+
+The naive renderer is quadratic; use ``--skip-naive`` for long responses.
+"""
+import argparse
+import importlib
+import io
+import os
+import sys
+import time
+import types
+
+from rich.console import Console
+from rich.live import Live
+from rich.markdown import Markdown
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Load the add-on modules as a package so their relative imports resolve
+package = types.ModuleType("free_gpt")
+package.__path__ = [ROOT]
+sys.modules["free_gpt"] = package
+StreamingMarkdown = importlib.import_module("free_gpt.console_render").StreamingMarkdown
+
+PARAGRAPH = "Here is a script that creates the requested objects in the scene.\n\n"
+CODE_LINE = "    bpy.ops.mesh.primitive_cube_add(location=(x, y, z))  # add cube\n"
+
+
+def make_chunks(count, size=12):
+    text = []
+    while sum(map(len, text)) < count * size:
+        text.append(PARAGRAPH)
+        text.append("```python\nimport bpy\n")
+        text.extend([CODE_LINE] * 20)
+        text.append("```\n\n")
+    text = "".join(text)
+    return [text[i:i + size] for i in range(0, count * size, size)]
+
+
+def make_console():
+    return Console(file=io.StringIO(), force_terminal=True, width=100, height=40)
+
+
+def run_naive(chunks):
+    timings = []
+    completion_text = ""
+    with Live(console=make_console(), refresh_per_second=30, transient=False) as live:
+        for chunk in chunks:
+            start = time.perf_counter()
+            completion_text += chunk
+            live.update(Markdown(completion_text.strip()), refresh=True)
+            timings.append(time.perf_counter() - start)
+    return timings
+
+
+def run_incremental(chunks):
+    timings = []
+    with Live(console=make_console(), auto_refresh=False, transient=False) as live:
+        renderer = StreamingMarkdown(live, refresh_per_second=30)
+        for chunk in chunks:
+            start = time.perf_counter()
+            renderer.feed(chunk)
+            timings.append(time.perf_counter() - start)
+        renderer.finish()
+    return timings
+
+
+def report(name, timings, buckets):
+    size = len(timings) // buckets
+    cells = []
+    for i in range(buckets):
+        part = timings[i * size:(i + 1) * size]
+        cells.append(f"{1e6 * sum(part) / len(part):9.1f}")
+    print(f"{name:<12}" + "".join(cells) + f"   total {sum(timings):.3f}s")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--chunks", type=int, default=300)
+    parser.add_argument("--buckets", type=int, default=3)
+    parser.add_argument("--skip-naive", action="store_true")
+    args = parser.parse_args()
+
+    chunks = make_chunks(args.chunks)
+    size = args.chunks // args.buckets
+    print("mean us/chunk for chunks " + ", ".join(
+        f"{i * size}-{(i + 1) * size}" for i in range(args.buckets)))
+    if not args.skip_naive:
+        report("naive", run_naive(chunks), args.buckets)
+    report("incremental", run_incremental(chunks), args.buckets)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,535 @@
+"""Offline harness that runs ``G4F_OT_Callback`` outside Blender.
+
+Provides a minimal ``bpy`` stand-in, a scripted g4f provider that streams
+chunks from memory, and :func:`run_generation`, which drives the operator the
+way Blender does: ``execute`` once, then ``modal`` on a timer until it finishes.
+
+Only what the add-on touches is stubbed. Properties declared with ``bpy.props``
+resolve to their defaults, so scenes and preferences behave like freshly
+registered ones. Nothing here opens a network connection.
+
+Usage from a benchmark::
+
+    from offline import load_addon, make_context, run_generation, scripted_response
+    addon = load_addon()
+    context = make_context(addon, model)
+"""
+import asyncio
+import contextlib
+import importlib.util
+import io
+import os
+import sys
+import tempfile
+import time
+import types
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+PACKAGE = "free_gpt"
+BENCH_MODEL = "bench-scripted"
+
+
+# --- bpy stand-in ---
+class Prop:
+    """Descriptor standing in for a ``bpy.props`` property."""
+
+    def __init__(self, kind, options):
+        self.kind = kind
+        self.options = options
+        self.name = None
+
+    def __set_name__(self, owner, name):
+        self.name = name
+
+    def default(self, instance=None):
+        if self.kind == "CollectionProperty":
+            return StubCollection(instance)
+        if self.kind == "EnumProperty":
+            items = self.options.get("items", [])
+            if callable(items):
+                items = items(None, None)
+            if "default" not in self.options:
+                return items[0][0] if items else ""
+            # A number default selects the item with that number, like Blender
+            default = self.options["default"]
+            if isinstance(default, int):
+                return next((item[0] for item in items if item[3] == default), "")
+            return default
+        if "default" in self.options:
+            return self.options["default"]
+        return {
+            "BoolProperty": False,
+            "IntProperty": 0,
+            "FloatProperty": 0.0,
+            "StringProperty": "",
+        }.get(self.kind)
+
+    def __get__(self, instance, owner):
+        if instance is None:
+            return self
+        values = instance.__dict__.setdefault("_props", {})
+        if self.name not in values:
+            values[self.name] = self.default(instance)
+        return values[self.name]
+
+    def __set__(self, instance, value):
+        instance.__dict__.setdefault("_props", {})[self.name] = value
+
+
+class StubMeta(type):
+    def __setattr__(cls, name, value):
+        # Props assigned after class creation, e.g. Scene.g4f_progress in register()
+        if isinstance(value, Prop) and value.name is None:
+            value.name = name
+        super().__setattr__(name, value)
+
+
+class StubStruct(metaclass=StubMeta):
+    """Base for stubbed ``bpy.types`` classes; annotated props become descriptors."""
+
+    def __init_subclass__(cls, **kwargs):
+        super().__init_subclass__(**kwargs)
+        for name, value in list(cls.__dict__.get("__annotations__", {}).items()):
+            if isinstance(value, Prop):
+                setattr(cls, name, value)
+
+    def __init__(self, *args, **kwargs):
+        pass
+
+    def as_pointer(self):
+        return id(self)
+
+
+class Operator(StubStruct):
+    def report(self, level, message):
+        self.__dict__.setdefault("reports", []).append((set(level), message))
+
+
+class StubCollection:
+    """``CollectionProperty`` value holding ``PropertyGroup`` items."""
+
+    def __init__(self, id_data=None):
+        self.id_data = id_data
+        self._items = []
+
+    def add(self):
+        item = bpy_types.PropertyGroup()
+        item.id_data = self.id_data
+        self._items.append(item)
+        return item
+
+    def remove(self, index):
+        del self._items[index]
+
+    def clear(self):
+        self._items.clear()
+
+    def __len__(self):
+        return len(self._items)
+
+    def __getitem__(self, index):
+        return self._items[index]
+
+    def __iter__(self):
+        return iter(self._items)
+
+
+class TextLine:
+    __slots__ = ("body",)
+
+    def __init__(self, body):
+        self.body = body
+
+
+class Text:
+    def __init__(self, name):
+        self.name = name
+        self.use_fake_user = False
+        self._body = ""
+
+    @property
+    def lines(self):
+        return [TextLine(line) for line in self._body.split("\n")]
+
+    def cursor_set(self, line, character=0):
+        pass  # Writes always append, which is what history_store asks for
+
+    def write(self, text):
+        self._body += text
+
+    def from_string(self, text):
+        self._body = text
+
+    def as_string(self):
+        return self._body
+
+
+class Texts(dict):
+    def new(self, name):
+        text = self[name] = Text(name)
+        return text
+
+
+class OpsRecorder:
+    """``bpy.ops`` stand-in that counts operator calls made by generated code."""
+
+    def __init__(self, path="bpy.ops", calls=None):
+        self._path = path
+        self._calls = {} if calls is None else calls
+
+    def __getattr__(self, name):
+        return OpsRecorder(f"{self._path}.{name}", self._calls)
+
+    def __call__(self, *args, **kwargs):
+        self._calls[self._path] = self._calls.get(self._path, 0) + 1
+        return {"FINISHED"}
+
+
+class StubObject:
+    def __init__(self, name):
+        self.name = name
+        self.location = (0.0, 0.0, 0.0)
+
+
+class WindowManager:
+    def event_timer_add(self, interval, window=None):
+        return object()
+
+    def event_timer_remove(self, timer):
+        pass
+
+    def modal_handler_add(self, operator):
+        pass
+
+
+class Area:
+    def tag_redraw(self):
+        pass
+
+
+class AddonEntry:
+    def __init__(self, preferences):
+        self.preferences = preferences
+
+
+class Preferences:
+    def __init__(self):
+        self.addons = {}
+
+
+class Context:
+    """Just enough of ``bpy.context`` for the operator and generated code."""
+
+    def __init__(self, scene, preferences):
+        self.scene = scene
+        self.preferences = preferences
+        self.window_manager = WindowManager()
+        self.window = object()
+        self.area = Area()
+        self._overrides = []
+
+    @contextlib.contextmanager
+    def temp_override(self, **overrides):
+        self._overrides.append(overrides)
+        try:
+            yield self
+        finally:
+            self._overrides.pop()
+
+    @property
+    def selected_objects(self):
+        for overrides in reversed(self._overrides):
+            if "selected_objects" in overrides:
+                return overrides["selected_objects"]
+        return []
+
+
+class Event:
+    def __init__(self, event_type, value="NOTHING", shift=False):
+        self.type = event_type
+        self.value = value
+        self.shift = shift
+
+
+class Timers:
+    def __init__(self):
+        self._registered = set()
+
+    def register(self, function, first_interval=0.0, persistent=False):
+        self._registered.add(function)
+
+    def unregister(self, function):
+        self._registered.discard(function)
+
+    def is_registered(self, function):
+        return function in self._registered
+
+
+bpy_types = types.ModuleType("bpy.types")
+
+
+def install_bpy():
+    """Install the stand-in as ``bpy`` unless the real module is importable."""
+    if "bpy" in sys.modules:
+        return sys.modules["bpy"]
+
+    bpy = types.ModuleType("bpy")
+    props = types.ModuleType("bpy.props")
+    for kind in (
+        "BoolProperty", "IntProperty", "FloatProperty", "StringProperty",
+        "EnumProperty", "CollectionProperty", "PointerProperty",
+    ):
+        setattr(props, kind, lambda _kind=kind, **options: Prop(_kind, options))
+
+    for name in ("Operator",):
+        setattr(bpy_types, name, Operator)
+    for name in (
+        "Panel", "PropertyGroup", "AddonPreferences", "Scene", "Collection",
+        "Object", "Text", "Context", "Event", "UILayout",
+    ):
+        setattr(bpy_types, name, type(name, (StubStruct,), {}))
+
+    app = types.ModuleType("bpy.app")
+    handlers = types.ModuleType("bpy.app.handlers")
+    handlers.persistent = lambda function: function
+    for name in ("load_post", "undo_post", "redo_post", "save_pre"):
+        setattr(handlers, name, [])
+    app.handlers = handlers
+    app.timers = Timers()
+    app.online_access = False
+    app.background = True
+    app.version = (4, 2, 0)
+
+    utils = types.ModuleType("bpy.utils")
+    utils.register_class = lambda cls: None
+    utils.unregister_class = lambda cls: None
+    path = types.ModuleType("bpy.path")
+    path.abspath = lambda p: os.path.abspath(p)
+
+    bpy.props = props
+    bpy.types = bpy_types
+    bpy.app = app
+    bpy.utils = utils
+    bpy.path = path
+    bpy.ops = OpsRecorder()
+    bpy.data = types.SimpleNamespace(texts=Texts(), scenes=[], objects={})
+    bpy.context = Context(None, Preferences())
+    for module in (bpy, props, bpy_types, app, handlers, utils, path):
+        sys.modules[module.__name__] = module
+    return bpy
+
+
+# --- Scripted provider ---
+def scripted_response(blocks=3, lines_per_block=20, prose_lines=4):
+    """Build a markdown answer with prose and ``blocks`` runnable python blocks."""
+    parts = []
+    for b in range(blocks):
+        parts.extend(f"Step {b + 1}, line {i}: placing objects as requested." for i in range(prose_lines))
+        parts.append("")
+        parts.append("```python")
+        parts.append("import bpy")
+        parts.append("import math")
+        parts.append("")
+        parts.append("count = 8")
+        parts.append("for i in range(count):")
+        parts.append("    angle = i / count * 2 * math.pi")
+        parts.append("    bpy.ops.mesh.primitive_cube_add(location=(math.cos(angle), math.sin(angle), 0))")
+        for i in range(max(0, lines_per_block - 7)):
+            parts.append(f"value_{b}_{i} = sum(j * j for j in range({i + 10}))")
+        parts.append("```")
+        parts.append("")
+    return "\n".join(parts) + "\n"
+
+
+def split_chunks(text, chunk_size, sse=False):
+    """Split ``text`` into chunks, optionally wrapped as SSE ``data:`` lines."""
+    chunks = [text[i:i + chunk_size] for i in range(0, len(text), chunk_size)]
+    if sse:
+        import json
+
+        chunks = [f"data: {json.dumps({'content': chunk})}\n\n" for chunk in chunks]
+    return chunks
+
+
+def make_provider(g4f):
+    """Create a g4f provider class that streams ``provider.script`` from memory.
+
+    ``script`` is a list of ``(delay, chunk)`` pairs. Delays are slept on the
+    event loop, so 0 streams as fast as the add-on consumes.
+    """
+    from g4f.providers.base_provider import AsyncGeneratorProvider
+
+    class ScriptedProvider(AsyncGeneratorProvider):
+        working = True
+        supports_stream = True
+        script = []
+
+        @classmethod
+        async def create_async_generator(cls, model, messages, **kwargs):
+            for delay, chunk in cls.script:
+                if delay:
+                    await asyncio.sleep(delay)
+                yield chunk
+
+    return ScriptedProvider
+
+
+# --- Add-on driver ---
+class NullFile(io.TextIOBase):
+    """Terminal stand-in for rich; rendering still happens, output is dropped."""
+
+    def write(self, text):
+        return len(text)
+
+    def isatty(self):
+        return True
+
+
+def load_addon(data_dir=None):
+    """Import the add-on as a package with the stand-ins installed.
+
+    Statistics, metrics and logs the add-on writes next to itself are
+    redirected to ``data_dir`` (a temporary directory by default).
+
+    Returns:
+        types.SimpleNamespace: Loaded modules plus ``provider``, ``data_dir``
+        and ``metrics_records``.
+    """
+    install_bpy()
+    import g4f
+    import g4f.models
+    from g4f.client import AsyncClient
+    import rich.live
+    import rich.markdown
+    import rich.text
+    from rich.console import Console
+
+    data_dir = data_dir or tempfile.mkdtemp(prefix="free_gpt_bench_")
+    spec = importlib.util.spec_from_file_location(
+        PACKAGE, os.path.join(ROOT, "__init__.py"), submodule_search_locations=[ROOT]
+    )
+    package = importlib.util.module_from_spec(spec)
+    sys.modules[PACKAGE] = package
+    spec.loader.exec_module(package)
+
+    def module(name):
+        return importlib.import_module(f"{PACKAGE}.{name}")
+
+    addon = types.SimpleNamespace(
+        package=package,
+        prompt_op=module("prompt_op"),
+        runtime=module("runtime").runtime,
+        data_dir=data_dir,
+        metrics_records=[],
+    )
+
+    # Keep the real statistics and logs untouched
+    module("logging_setup").configure_logging(path=os.path.join(data_dir, "g4f_callbacks.log"))
+    module("stream_stats").stream_stats.path = os.path.join(data_dir, "stream_stats.json")
+    module("failover").ATTEMPT_STATS_PATH = os.path.join(data_dir, "request_stats.json")
+    registry = module("model_registry").model_registry
+    registry.stats_path = os.path.join(data_dir, "request_stats.json")
+
+    class MetricsSink:
+        def write(self, record, prometheus_dir=None):
+            addon.metrics_records.append(record)
+
+    addon.prompt_op.metrics = MetricsSink()
+    addon.prompt_op.rich = types.SimpleNamespace(
+        console=types.SimpleNamespace(
+            Console=lambda: Console(file=NullFile(), force_terminal=True, width=120, color_system="truecolor")
+        ),
+        live=rich.live,
+        markdown=rich.markdown,
+        text=rich.text,
+    )
+
+    provider = make_provider(g4f)
+    g4f.models.ModelUtils.convert[BENCH_MODEL] = g4f.models.Model(
+        name=BENCH_MODEL, base_provider="bench", best_provider=provider
+    )
+    g4f.models._all_models.append(BENCH_MODEL)
+    registry.invalidate()
+    client = AsyncClient(provider=provider)
+    addon.runtime.client = lambda: client
+    addon.provider = provider
+    package.register()
+    return addon
+
+
+def make_context(addon, model=BENCH_MODEL, objects=100, **preferences):
+    """Create a context with a fresh scene and default add-on preferences.
+
+    Args:
+        addon: Result of :func:`load_addon`.
+        model (str): Model selected in the scene.
+        objects (int): Number of objects in the scene.
+        **preferences: Preference values overriding the defaults.
+    """
+    import bpy
+
+    package = addon.package
+    prefs = package.G4FPreferences()
+    for name, value in {"use_response_cache": False, "failover_models": 0, **preferences}.items():
+        setattr(prefs, name, value)
+    context_preferences = Preferences()
+    context_preferences.addons[PACKAGE] = AddonEntry(prefs)
+
+    scene = bpy.types.Scene()
+    scene.ai_models = model
+    scene.objects = [StubObject(f"Object.{i:05d}") for i in range(objects)]
+    context = Context(scene, context_preferences)
+    bpy.context = context
+    bpy.data.scenes[:] = [scene]
+    return context
+
+
+def run_generation(addon, context, prompt, tick=0.01, **properties):
+    """Run one prompt through the operator like Blender's modal loop would.
+
+    Args:
+        addon: Result of :func:`load_addon`.
+        context: Result of :func:`make_context`.
+        prompt (str): Chat input.
+        tick (float): Modal timer interval in seconds.
+        **properties: Operator properties, e.g. ``replay_path``.
+
+    Returns:
+        tuple: ``(status, execute_seconds, operator)`` where ``status`` is the set
+        returned by the last ``modal`` call.
+    """
+    context.scene.g4f_chat_input = prompt
+    operator = addon.prompt_op.G4F_OT_Callback()
+    for name, value in properties.items():
+        setattr(operator, name, value)
+    return drive_modal(operator, context, tick)
+
+
+def run_queue(addon, context, prompts, tick=0.01):
+    """Queue ``prompts`` and run them with ``G4F_OT_RunQueue``.
+
+    Returns:
+        tuple: ``(status, execute_seconds, operator)`` like :func:`run_generation`.
+    """
+    queue = context.scene.g4f_prompt_queue
+    for prompt in prompts:
+        item = queue.add()
+        item.content = prompt
+        item.type = "queued"
+    return drive_modal(addon.prompt_op.G4F_OT_RunQueue(), context, tick)
+
+
+def drive_modal(operator, context, tick=0.01):
+    """Call ``execute``, then ``modal`` with timer events until the operator ends."""
+    start = time.perf_counter()
+    status = operator.execute(context)
+    execute_seconds = time.perf_counter() - start
+    if "RUNNING_MODAL" not in status:
+        return status, execute_seconds, operator
+
+    timer = Event("TIMER")
+    while True:
+        status = operator.modal(context, timer)
+        if status & {"FINISHED", "CANCELLED"}:
+            return status, execute_seconds, operator
+        time.sleep(tick)
@@ -0,0 +1,165 @@
+import hashlib
+import importlib.util
+import logging
+import marshal
+import os
+import threading
+from collections import OrderedDict
+
+from .Settings import BYTECODE_CACHE_DIR, BYTECODE_CACHE_ENTRIES, BYTECODE_CACHE_MAX_FILES
+from .logging_setup import LOGGER_NAME
+
+
+class BytecodeCache:
+    """Cache of compiled generated scripts keyed by a hash of their code.
+
+    Compiled code objects are kept in an in-memory LRU. Optionally they are also
+    marshalled to disk, tagged with the interpreter's magic number so files from
+    another Python version are ignored. Failed reads and writes are logged and
+    treated as a miss. Safe to use from the generation thread.
+    """
+
+    def __init__(self, directory, max_entries, max_files):
+        self.directory = directory
+        self.max_entries = max_entries
+        self.max_files = max_files
+        self._memory = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+
+    @staticmethod
+    def make_key(source, filename):
+        digest = hashlib.sha256()
+        digest.update(filename.encode("utf-8"))
+        digest.update(b"\0")
+        digest.update(source.encode("utf-8"))
+        return digest.hexdigest()
+
+    def compile(self, source, filename, use_disk=False):
+        """Return the code object for ``source``, compiling it only on a miss.
+
+        Args:
+            source (str): Python source code.
+            filename (str): Filename baked into the code object and tracebacks.
+            use_disk (bool): Also look up and store marshalled bytecode on disk.
+
+        Returns:
+            code: Compiled code object.
+
+        Raises:
+            SyntaxError: If the source does not compile. Failures are not cached.
+        """
+        key = self.make_key(source, filename)
+        with self._lock:
+            code = self._memory.get(key)
+            if code is not None:
+                self._memory.move_to_end(key)
+                self.hits += 1
+                return code
+
+        code = self._load(key) if use_disk else None
+        if code is not None:
+            with self._lock:
+                self.hits += 1
+                self.disk_hits += 1
+                self._remember(key, code)
+            return code
+
+        code = compile(source, filename, "exec")
+        with self._lock:
+            self.misses += 1
+            self._remember(key, code)
+        if use_disk:
+            self._store(key, code)
+        return code
+
+    def clear(self):
+        """Drop all cached bytecode, in memory and on disk, and reset the counters."""
+        with self._lock:
+            self._memory.clear()
+            self.hits = self.disk_hits = self.misses = 0
+            for name in self._disk_files():
+                os.remove(os.path.join(self.directory, name))
+
+    def stats(self):
+        """Return hit/miss counters and the number of cached entries.
+
+        Returns:
+            dict: Counters, hit rate and memory/disk occupancy.
+        """
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "hits": self.hits,
+                "disk_hits": self.disk_hits,
+                "misses": self.misses,
+                "hit_rate": self.hits / lookups if lookups else 0.0,
+                "memory_entries": len(self._memory),
+                "disk_entries": len(self._disk_files()),
+            }
+
+    # --- Internals ---
+    def _path(self, key):
+        return os.path.join(self.directory, f"{key}.bin")
+
+    def _remember(self, key, code):
+        self._memory[key] = code
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.max_entries:
+            self._memory.popitem(last=False)
+
+    def _disk_files(self):
+        if not os.path.isdir(self.directory):
+            return []
+        return [name for name in os.listdir(self.directory) if name.endswith(".bin")]
+
+    def _load(self, key):
+        path = self._path(key)
+        try:
+            with open(path, "rb") as f:
+                data = f.read()
+        except OSError:
+            return None
+        magic = importlib.util.MAGIC_NUMBER
+        if not data.startswith(magic):
+            return None
+        try:
+            code = marshal.loads(data[len(magic):])
+        except (EOFError, ValueError, TypeError):
+            return None
+        try:
+            os.utime(path)  # Mark as recently used for eviction
+        except OSError as e:
+            # Still a hit, it may only be evicted earlier
+            logging.getLogger(LOGGER_NAME).warning(f"Could not update the bytecode cache: {e}")
+        return code
+
+    def _store(self, key, code):
+        path = self._path(key)
+        tmp_path = f"{path}.{threading.get_ident()}.tmp"
+        try:
+            os.makedirs(self.directory, exist_ok=True)
+            with open(tmp_path, "wb") as f:
+                f.write(importlib.util.MAGIC_NUMBER)
+                f.write(marshal.dumps(code))
+            os.replace(tmp_path, path)
+
+            names = self._disk_files()
+            if len(names) > self.max_files:
+                paths = sorted(
+                    (os.path.join(self.directory, name) for name in names),
+                    key=os.path.getmtime,
+                )
+                for old_path in paths[: len(paths) - self.max_files]:
+                    os.remove(old_path)
+        except OSError as e:
+            logging.getLogger(LOGGER_NAME).warning(f"Could not write the bytecode cache: {e}")
+            try:
+                os.remove(tmp_path)
+            except OSError:
+                pass
+
+
+bytecode_cache = BytecodeCache(BYTECODE_CACHE_DIR, BYTECODE_CACHE_ENTRIES, BYTECODE_CACHE_MAX_FILES)
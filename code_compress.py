@@ -0,0 +1,106 @@
+import ast
+import functools
+import re
+
+OUTPUT_MARKER = "# Code Output:"  # Written by utils.append_error_as_comment
+OUTLINE_HEADER = "# Earlier script (outline, bodies omitted)"
+MAX_ERROR_LINES = 4
+
+_IMPORT_RE = re.compile(r"^\s*(import|from)\s+\S+")
+_DEF_RE = re.compile(r"^\s*(async\s+def|def|class)\s+\w+.*:\s*$")
+
+
+def split_error_comment(source):
+    """Split a stored script from the error comments appended after running it.
+
+    A stored response can hold several executed blocks, each followed by its own
+    ``# Code Output:`` comment. Only the last comment is returned.
+
+    Returns:
+        tuple: ``(code, error_lines)``.
+    """
+    code_lines = []
+    error_lines = []
+    in_output = False
+    for line in source.splitlines():
+        stripped = line.strip()
+        if stripped == OUTPUT_MARKER:
+            in_output = True
+            error_lines = []
+        elif in_output and (stripped.startswith("#") or not stripped):
+            if stripped:
+                error_lines.append(stripped)
+        else:
+            in_output = False
+            code_lines.append(line)
+    return "\n".join(code_lines).rstrip(), error_lines
+
+
+def _signature(node, indent=""):
+    if isinstance(node, ast.ClassDef):
+        bases = ", ".join(ast.unparse(base) for base in node.bases)
+        lines = [f"{indent}class {node.name}({bases}):" if bases else f"{indent}class {node.name}:"]
+        methods = [n for n in node.body if isinstance(n, (ast.FunctionDef, ast.AsyncFunctionDef))]
+        for method in methods:
+            lines.extend(_signature(method, indent + "    "))
+        if not methods:
+            lines.append(f"{indent}    ...")
+        return lines
+    prefix = "async def" if isinstance(node, ast.AsyncFunctionDef) else "def"
+    return [f"{indent}{prefix} {node.name}({ast.unparse(node.args)}): ..."]
+
+
+def _created_names(tree):
+    """Collect string names given to datablocks: ``name="..."`` and ``x.name = "..."``."""
+    names = []
+    for node in ast.walk(tree):
+        if isinstance(node, ast.Call):
+            for keyword in node.keywords:
+                if keyword.arg == "name" and isinstance(keyword.value, ast.Constant):
+                    names.append(keyword.value.value)
+        elif isinstance(node, ast.Assign) and isinstance(node.value, ast.Constant):
+            for target in node.targets:
+                if isinstance(target, ast.Attribute) and target.attr == "name":
+                    names.append(node.value.value)
+    return [name for name in dict.fromkeys(names) if isinstance(name, str)]
+
+
+@functools.lru_cache(maxsize=256)
+def outline_script(source):
+    """Reduce a generated script to an outline for use as prompt history.
+
+    Keeps imports, function and class signatures, the names of created
+    datablocks and the tail of the error comment added after execution.
+
+    Args:
+        source (str): Script as stored in the chat history.
+
+    Returns:
+        str: The outline.
+    """
+    code, error_lines = split_error_comment(source)
+    lines = [OUTLINE_HEADER]
+    try:
+        tree = ast.parse(code)
+    except SyntaxError:
+        # Unparsable script, keep the lines that look like imports and definitions
+        lines.extend(
+            line.rstrip() for line in code.splitlines()
+            if _IMPORT_RE.match(line) or _DEF_RE.match(line)
+        )
+    else:
+        for node in tree.body:
+            if isinstance(node, (ast.Import, ast.ImportFrom)):
+                statement = ast.unparse(node)
+                if statement not in lines:
+                    lines.append(statement)
+            elif isinstance(node, (ast.FunctionDef, ast.AsyncFunctionDef, ast.ClassDef)):
+                lines.extend(_signature(node))
+        names = _created_names(tree)
+        if names:
+            lines.append(f"# Creates: {', '.join(names)}")
+
+    if error_lines:
+        lines.append(OUTPUT_MARKER)
+        lines.extend(error_lines[-MAX_ERROR_LINES:])
+    return "\n".join(lines)
@@ -0,0 +1,135 @@
+PYTHON_LANGUAGES = ("", "python", "py", "python3", "bpy")
+
+
+class CodeBlock:
+    """A fenced code block taken from a model response.
+
+    Attributes:
+        source (str): Code inside the fence.
+        language (str): Lower-cased language tag, empty if the fence had none.
+        closed (bool): False if the response ended before the closing fence.
+        code: Compiled code object once :meth:`compile` succeeded.
+        error (SyntaxError): Compile error, if any.
+    """
+
+    def __init__(self, source, language="", closed=True):
+        self.source = source
+        self.language = language
+        self.closed = closed
+        self.code = None
+        self.error = None
+
+    @property
+    def is_python(self):
+        return self.language in PYTHON_LANGUAGES
+
+    def compile(self, filename, compiler=None):
+        """Compile the block, keeping either the code object or the SyntaxError.
+
+        Args:
+            filename (str): Filename used in tracebacks.
+            compiler (callable): ``compiler(source, filename)`` returning a code
+                object, e.g. a bytecode cache. Defaults to the builtin.
+        """
+        try:
+            if compiler is None:
+                self.code = compile(self.source, filename, "exec")
+            else:
+                self.code = compiler(self.source, filename)
+            self.error = None
+        except (SyntaxError, ValueError) as e:
+            self.code = None
+            self.error = e if isinstance(e, SyntaxError) else SyntaxError(str(e))
+        return self
+
+
+class FenceParser:
+    """Incremental markdown code fence parser.
+
+    Feed the response chunk by chunk; every block is returned as soon as its
+    closing fence arrives. Supports backtick and tilde fences of any length,
+    language tags and indented fences. :meth:`close` returns a trailing block
+    whose closing fence never arrived.
+    """
+
+    def __init__(self):
+        self._pending = ""  # Partial line not yet terminated by a newline
+        self._fence = None  # (char, length, indent, language) of the open fence
+        self._lines = []
+        self.blocks = []
+
+    @property
+    def in_fence(self):
+        """bool: An opening fence arrived and its closing fence has not yet."""
+        return self._fence is not None
+
+    def feed(self, chunk):
+        """Consume a chunk of the response.
+
+        Args:
+            chunk (str): Next piece of streamed text.
+
+        Returns:
+            list: ``CodeBlock`` objects completed by this chunk.
+        """
+        if not chunk:
+            return []
+        lines = (self._pending + chunk).split("\n")
+        self._pending = lines.pop()
+        finished = []
+        for line in lines:
+            block = self._push_line(line)
+            if block is not None:
+                finished.append(block)
+        return finished
+
+    def close(self):
+        """Finish parsing.
+
+        Returns:
+            list: The unterminated trailing block, if the response ended inside one.
+        """
+        finished = []
+        if self._pending:
+            block = self._push_line(self._pending)
+            self._pending = ""
+            if block is not None:
+                finished.append(block)
+        if self._fence is not None:
+            block = CodeBlock("\n".join(self._lines).strip("\n"), self._fence[3], closed=False)
+            self._fence = None
+            self._lines = []
+            if block.source.strip():
+                self.blocks.append(block)
+                finished.append(block)
+        return finished
+
+    def _push_line(self, line):
+        stripped = line.strip()
+        if self._fence is None:
+            marker = stripped[:3]
+            if marker not in ("```", "~~~"):
+                return None
+            char = marker[0]
+            length = len(stripped) - len(stripped.lstrip(char))
+            info = stripped[length:].strip()
+            if char == "`" and "`" in info:
+                return None  # Inline code span, not a fence
+            indent = len(line) - len(line.lstrip())
+            language = info.split()[0].lower() if info else ""
+            self._fence = (char, length, indent, language)
+            self._lines = []
+            return None
+
+        char, length, indent, language = self._fence
+        if stripped.startswith(char * length) and not stripped.lstrip(char):
+            block = CodeBlock("\n".join(self._lines).strip("\n"), language)
+            self._fence = None
+            self._lines = []
+            self.blocks.append(block)
+            return block
+
+        if indent and line[:indent].isspace():
+            line = line[indent:]
+        self._lines.append(line)
+        return None
@@ -0,0 +1,98 @@
+import time
+
+from .code_fence import FenceParser
+from .lazy import rich
+
+
+class StreamingMarkdown:
+    """Incrementally render a streamed markdown response into a rich ``Live`` display.
+
+    Finished blocks (paragraphs ended by a blank line and closed code fences) are
+    printed once above the live region and never parsed again. Only the open,
+    unfinished block is re-parsed, at most ``refresh_per_second`` times a second and
+    only the lines that fit on screen, so the cost per chunk stays flat as the
+    response grows.
+    """
+
+    def __init__(self, live, refresh_per_second=30, clock=time.perf_counter):
+        """Create a renderer bound to a started ``Live`` display.
+
+        Args:
+            live: A ``rich.live.Live`` created with ``auto_refresh=False``.
+            refresh_per_second (float): Upper bound on live refreshes.
+            clock: Monotonic clock used to coalesce refreshes.
+        """
+        self.live = live
+        self.console = live.console
+        self._interval = 1.0 / refresh_per_second
+        self._clock = clock
+        self._last_refresh = 0.0
+
+        self._chunks = []  # Append-only buffer of the raw response
+        self._text = None  # Joined cache of _chunks
+        self._pending = ""  # Partial line not yet terminated by a newline
+        self._open_lines = []  # Complete lines of the unfinished block
+        self._fences = FenceParser()  # Fed line by line, tells where code blocks start and end
+        self._opener = None  # Opening fence line of the open code block
+
+    @property
+    def text(self):
+        """str: The full response received so far."""
+        if self._text is None:
+            self._text = "".join(self._chunks)
+            self._chunks = [self._text]
+        return self._text
+
+    def feed(self, chunk):
+        """Append a streamed chunk and refresh the live region if the budget allows."""
+        if not chunk:
+            return
+        self._chunks.append(chunk)
+        self._text = None
+
+        lines = (self._pending + chunk).split("\n")
+        self._pending = lines.pop()
+        for line in lines:
+            self._push_line(line)
+
+        now = self._clock()
+        if now - self._last_refresh >= self._interval:
+            self._refresh(now)
+
+    def finish(self):
+        """Flush the unfinished block and clear the live region."""
+        if self._pending:
+            self._open_lines.append(self._pending)
+            self._pending = ""
+        self._commit()
+        self.live.update(rich.text.Text(""), refresh=True)
+
+    # --- Internals ---
+    def _push_line(self, line):
+        self._open_lines.append(line)
+        in_fence = self._fences.in_fence
+        closed = self._fences.feed(line + "\n")
+        if closed:
+            self._commit()
+        elif self._fences.in_fence:
+            if not in_fence:
+                self._opener = line
+        elif not line.strip() and len(self._open_lines) > 1:
+            self._commit()
+
+    def _commit(self):
+        block = "\n".join(self._open_lines).strip()
+        self._open_lines = []
+        self._opener = None
+        if block:
+            self.console.print(rich.markdown.Markdown(block))
+
+    def _refresh(self, now):
+        self._last_refresh = now
+        height = max(1, self.console.size.height - 1)
+        lines = self._open_lines[-height:]
+        if self._pending:
+            lines = lines + [self._pending]
+        if self._opener is not None and len(self._open_lines) > height:
+            lines = [self._opener] + lines
+        self.live.update(rich.markdown.Markdown("\n".join(lines).strip()), refresh=True)
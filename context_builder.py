@@ -0,0 +1,91 @@
+import re
+
+# Words are split into pieces of up to four characters and every symbol counts
+# as one token, which tracks BPE tokenizers closely enough for code and prose.
+_TOKEN_RE = re.compile(r"\w{1,4}|[^\w\s]")
+
+TRUNCATION_MARKER = "\n# ... [truncated]"
+MIN_TRUNCATED_TOKENS = 64
+FENCE_TOKENS = 8  # Code fence around assistant turns plus slack
+
+
+def estimate_tokens(text):
+    """Estimate the number of tokens in ``text`` without a tokenizer.
+
+    Args:
+        text (str): Text to measure.
+
+    Returns:
+        int: Approximate token count.
+    """
+    return len(_TOKEN_RE.findall(text))
+
+
+def truncate_to_tokens(text, tokens, total=None):
+    """Keep the beginning of ``text`` so it fits in roughly ``tokens`` tokens."""
+    total = estimate_tokens(text) if total is None else total
+    if total <= tokens:
+        return text
+    keep = max(0, int(len(text) * tokens / total) - len(TRUNCATION_MARKER))
+    return text[:keep].rstrip() + TRUNCATION_MARKER
+
+
+def build_context(system_prompt, turns, prompt, budget):
+    """Pack as much chat history as fits into a token budget.
+
+    The system prompt and the new prompt are always sent. History turns are
+    added newest first, assistant turns wrapped in a code fence. The first turn
+    that does not fit is truncated instead of dropped if enough budget is left,
+    and everything older is left out.
+
+    Args:
+        system_prompt (str): System message.
+        turns: Iterable of ``(role, content)`` pairs, newest first. It is consumed
+            lazily, so older turns are never read once the budget is spent.
+        prompt (str): New user message.
+        budget (int): Token budget for the whole request.
+
+    Returns:
+        tuple: ``(messages, report)`` where ``messages`` is the chronological
+        message list and ``report`` holds the token accounting.
+    """
+    system_tokens = estimate_tokens(system_prompt)
+    prompt_tokens = estimate_tokens(prompt)
+    remaining = budget - system_tokens - prompt_tokens
+
+    packed = []
+    history_tokens = 0
+    truncated = 0
+    for role, content in turns:
+        if remaining <= 0:
+            break
+        overhead = FENCE_TOKENS if role == "assistant" else 0
+        tokens = estimate_tokens(content)
+        if tokens + overhead > remaining:
+            if remaining - overhead < MIN_TRUNCATED_TOKENS:
+                break
+            content = truncate_to_tokens(content, remaining - overhead, tokens)
+            truncated += 1
+        if role == "assistant":
+            content = f"```\n{content}\n```"
+        tokens = estimate_tokens(content)
+        packed.append({"role": role, "content": content})
+        history_tokens += tokens
+        remaining -= tokens
+        if truncated:
+            break
+
+    messages = [{"role": "system", "content": system_prompt}]
+    messages.extend(reversed(packed))
+    messages.append({"role": "user", "content": prompt})
+
+    report = {
+        "budget": budget,
+        "system_tokens": system_tokens,
+        "history_tokens": history_tokens,
+        "prompt_tokens": prompt_tokens,
+        "total_tokens": system_tokens + history_tokens + prompt_tokens,
+        "turns": len(packed),
+        "truncated_turns": truncated,
+    }
+    return messages, report
@@ -1,14 +1,47 @@
+import asyncio
 import re
 import subprocess
 import sys
 import bpy
 import threading
 import os
-from .utils import create_models, setup_logger
+from .utils import setup_logger
+from .runtime import runtime
 from .import toml
+from .lazy import g4f
 
 Modules = ["g4f", "rich"]
 
+_version_check = None
+
+
+async def _fetch_is_update():
+    # VersionUtils does blocking HTTP requests, keep them off the loop
+    def is_update():
+        utils = g4f.version.utils
+        return utils.current_version != utils.latest_version
+
+    return await asyncio.to_thread(is_update)
+
+
+def check_for_update():
+    """Return whether a newer g4f is available without blocking the UI.
+
+    The first call schedules the version lookup on the add-on runtime.
+
+    Returns:
+        bool or None: None while the check is still running.
+    """
+    global _version_check
+    if _version_check is None:
+        _version_check = runtime.submit(_fetch_is_update())
+    if not _version_check.done():
+        return None
+    try:
+        return _version_check.result()
+    except Exception:
+        return False
+
 class Module_Updater(bpy.types.Operator):
     bl_idname = "g4f.module_update"
     bl_label = "Module Updater"
@@ -167,7 +200,6 @@ class Module_Updater(bpy.types.Operator):
         """Reload Blender scripts and update module list."""
         self.logger.info("Reloading Blender scripts")
         bpy.ops.script.reload()
-        create_models()
     
     def append_wheel(self, file_path, module_list, wheels_path):
         """Append wheel entries to TOML configuration."""
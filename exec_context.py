@@ -0,0 +1,41 @@
+EXEC_SCOPES = [
+    ("SCENE", "Scene", "Expose every scene object as selected. The live collection is passed, "
+     "so no list is built unless the code asks for the selection"),
+    ("SELECTED", "Selection", "Keep the user's current selection"),
+    ("COLLECTION", "Collection", "Expose the objects of one collection as selected"),
+    ("SNAPSHOT", "Snapshot", "Copy every scene object into a list once per response"),
+]
+
+
+def build_override(context, scope="SCENE", collection=None):
+    """Build the context override used to execute generated code.
+
+    Only the members that differ from the current context are overridden, so
+    ``context.copy()``, which materializes every context member, is never called.
+    Build it once per response and reuse it for every block.
+
+    Args:
+        context: Blender context.
+        scope (str): One of the identifiers in ``EXEC_SCOPES``.
+        collection: Collection used by the ``COLLECTION`` scope.
+
+    Returns:
+        dict: Keyword arguments for ``context.temp_override``.
+    """
+    if scope == "SELECTED":
+        return {}
+    if scope == "COLLECTION" and collection is not None:
+        return {"selected_objects": collection.all_objects}
+    if scope == "SNAPSHOT":
+        return {"selected_objects": list(context.scene.objects)}
+    return {"selected_objects": context.scene.objects}
+
+
+def scene_override(context):
+    """Build the override for the scope configured on the current scene."""
+    scene = context.scene
+    return build_override(
+        context,
+        getattr(scene, "g4f_exec_scope", "SCENE"),
+        getattr(scene, "g4f_exec_collection", None),
+    )
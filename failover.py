@@ -0,0 +1,213 @@
+import asyncio
+import json
+import os
+import random
+import time
+
+from .Settings import (
+    ATTEMPT_STATS_PATH,
+    REQUEST_ATTEMPT_TIMEOUT,
+    REQUEST_BACKOFF_BASE,
+    REQUEST_BACKOFF_MAX,
+    REQUEST_LATENCY_SMOOTHING,
+    REQUEST_RETRIES,
+)
+from .get_models import load_models_config
+from .model_registry import model_registry
+
+
+def load_attempt_stats():
+    """Load per-model request statistics.
+
+    Returns:
+        dict: ``{model: {"attempts", "failures", "latency"}}`` where ``latency``
+        is a moving average of successful attempts in seconds.
+    """
+    if os.path.exists(ATTEMPT_STATS_PATH):
+        try:
+            with open(ATTEMPT_STATS_PATH, "r") as f:
+                return json.load(f)
+        except (OSError, json.JSONDecodeError):
+            pass
+    return {}
+
+
+def record_attempts(attempts):
+    """Fold a list of attempt records into the persisted statistics.
+
+    Args:
+        attempts (list): Dicts with ``model``, ``ok`` and ``latency``.
+    """
+    if not attempts:
+        return
+    stats = load_attempt_stats()
+    for attempt in attempts:
+        entry = stats.setdefault(
+            attempt["model"], {"attempts": 0, "failures": 0, "latency": None}
+        )
+        entry["attempts"] += 1
+        if not attempt["ok"]:
+            entry["failures"] += 1
+        elif entry["latency"] is None:
+            entry["latency"] = attempt["latency"]
+        else:
+            entry["latency"] += REQUEST_LATENCY_SMOOTHING * (
+                attempt["latency"] - entry["latency"]
+            )
+    tmp_path = ATTEMPT_STATS_PATH + ".tmp"
+    with open(tmp_path, "w") as f:
+        json.dump(stats, f, indent=2)
+    os.replace(tmp_path, ATTEMPT_STATS_PATH)
+
+
+def rank_failover_models(selected_model, count, data=None, stats=None):
+    """Rank the active models to fall back to when the selected one keeps failing.
+
+    Models are ordered by success rate, then by average latency. A model without
+    request history uses its probe result from ``models_config.json``.
+
+    Args:
+        selected_model (str): Model chosen in the panel, never included.
+        count (int): Number of fallback models to return.
+        data (dict): Model configuration, loaded if not given.
+        stats (dict): Attempt statistics, loaded if not given.
+
+    Returns:
+        list: Model names, best first.
+    """
+    if count <= 0:
+        return []
+    data = load_models_config() if data is None else data
+    stats = load_attempt_stats() if stats is None else stats
+    checks = data.get("checks", {})
+
+    def score(model):
+        entry = stats.get(model, {})
+        attempts = entry.get("attempts", 0)
+        # One assumed success keeps new models from ranking first or last
+        success_rate = (attempts - entry.get("failures", 0) + 1) / (attempts + 1)
+        latency = entry.get("latency")
+        if latency is None:
+            latency = checks.get(model, {}).get("total") or REQUEST_ATTEMPT_TIMEOUT
+        return (-success_rate, latency)
+
+    candidates = [
+        model for model in data["active"]
+        if model != selected_model and model_registry.is_known(model)
+    ]
+    return sorted(candidates, key=score)[:count]
+
+
+def backoff_delay(attempt, base=REQUEST_BACKOFF_BASE, maximum=REQUEST_BACKOFF_MAX):
+    """Return the delay before retry number ``attempt`` (0-based), with full jitter."""
+    return random.uniform(0, min(maximum, base * 2 ** attempt))
+
+
+class RequestExecutor:
+    """Run a request with retries, backoff and failover to other models.
+
+    Each model gets ``retries`` attempts, each bounded by ``timeout``. Attempts
+    are separated by a jittered exponential backoff. Once a model has used up
+    its attempts the next model in the list is tried. Every attempt is logged
+    with its latency and folded into the statistics used for ranking.
+    """
+
+    def __init__(
+        self,
+        models,
+        logger,
+        is_cancelled,
+        retries=REQUEST_RETRIES,
+        timeout=REQUEST_ATTEMPT_TIMEOUT,
+        can_retry=None,
+    ):
+        """Prepare an executor.
+
+        Args:
+            models (list): Selected model first, then the fallback models.
+            logger: Logger used for per-attempt diagnostics.
+            is_cancelled (callable): Returns True once the user aborted.
+            retries (int): Attempts per model.
+            timeout (float): Deadline in seconds for each attempt.
+            can_retry (callable): Returns False once a failed attempt had side
+                effects that must not be repeated, e.g. code already executed.
+        """
+        self.models = list(models)
+        self.logger = logger
+        self.is_cancelled = is_cancelled
+        self.retries = max(1, retries)
+        self.timeout = timeout
+        self.can_retry = can_retry or (lambda: True)
+        self.attempts = []
+
+    async def run(self, request):
+        """Run ``request(model)`` until one attempt succeeds.
+
+        Args:
+            request (callable): Coroutine function taking a model name.
+
+        Returns:
+            tuple: ``(model, result)`` of the successful attempt, or
+            ``(None, None)`` if the user cancelled.
+
+        Raises:
+            Exception: The error of the last attempt if every attempt failed.
+        """
+        last_error = None
+        total = len(self.models) * self.retries
+        try:
+            for model in self.models:
+                for retry in range(self.retries):
+                    if self.is_cancelled():
+                        return None, None
+                    if retry:
+                        # Back off before retrying the same model, fail over immediately
+                        delay = backoff_delay(retry - 1)
+                        self.logger.info(
+                            f"Retrying {model} in {delay:.1f}s "
+                            f"(attempt {len(self.attempts) + 1}/{total})"
+                        )
+                        if not await self._sleep(delay):
+                            return None, None
+
+                    start = time.perf_counter()
+                    try:
+                        result = await asyncio.wait_for(request(model), self.timeout)
+                    except asyncio.CancelledError:
+                        raise
+                    except Exception as e:
+                        if isinstance(e, asyncio.TimeoutError):
+                            e = TimeoutError(f"{model} did not answer within {self.timeout:.0f}s")
+                        latency = time.perf_counter() - start
+                        self.attempts.append({"model": model, "ok": False, "latency": latency})
+                        self.logger.warning(
+                            f"Attempt {len(self.attempts)}/{total} with {model} "
+                            f"failed after {latency:.2f}s: {e}"
+                        )
+                        last_error = e
+                        if not self.can_retry():
+                            raise last_error
+                        continue
+
+                    latency = time.perf_counter() - start
+                    self.attempts.append({"model": model, "ok": True, "latency": latency})
+                    self.logger.info(
+                        f"Attempt {len(self.attempts)}/{total} with {model} "
+                        f"succeeded in {latency:.2f}s"
+                    )
+                    return model, result
+        finally:
+            try:
+                record_attempts(self.attempts)
+            except OSError as e:
+                self.logger.warning(f"Could not save request statistics: {e}")
+        raise last_error
+
+    async def _sleep(self, delay):
+        """Sleep in short steps so a cancel is noticed. Returns False if cancelled."""
+        deadline = time.monotonic() + delay
+        while time.monotonic() < deadline:
+            if self.is_cancelled():
+                return False
+            await asyncio.sleep(min(0.1, deadline - time.monotonic()))
+        return not self.is_cancelled()
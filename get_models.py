@@ -1,34 +1,26 @@
 import json
 import os
 from .Settings import JSON_PATH
-from typing import List, Tuple
-no_dep = False
-try:
-    import g4f
-except ModuleNotFoundError:
-    no_dep = True
 
-def get_models() -> List[Tuple[str, str, str]]:
-    """Get a list of available models.
+def load_models_config() -> dict:
+    """Load ``models_config.json``, filling in any missing sections.
 
     Returns:
-        List[Tuple[str, str, str]]: A list of tuples where each tuple contains the model name repeated three times.
+        dict: The model configuration.
     """
-    file_path = JSON_PATH
-    if not os.path.exists(file_path):
-        deprecated_models = set()
-    else:
-        with open(file_path, 'r') as file:
+    data = {}
+    if os.path.exists(JSON_PATH):
+        with open(JSON_PATH, 'r') as file:
             data = json.load(file)
+    data.setdefault("active", [])
+    data.setdefault("deprecated", [])
+    return data
 
-        deprecated_models = set(data["deprecated"])
-    if not no_dep:
-        available_models: List[Tuple[str, str, str]] = [
-            (model, model, model) 
-            for model in g4f.models._all_models 
-            if model not in deprecated_models
-        ]
-    else:
-        available_models = []
-    return available_models
+
+def save_models_config(data: dict) -> None:
+    """Atomically write ``models_config.json``."""
+    tmp_path = JSON_PATH + ".tmp"
+    with open(tmp_path, 'w') as file:
+        json.dump(data, file, indent=2)
+    os.replace(tmp_path, JSON_PATH)
 
@@ -0,0 +1,179 @@
+import base64
+import hashlib
+import threading
+import zlib
+from collections import OrderedDict
+
+import bpy
+from bpy.app.handlers import persistent
+
+from .Settings import HISTORY_BLOB_TEXT, HISTORY_BODY_CACHE, HISTORY_PREVIEW_LENGTH
+
+# Message bodies live zlib-compressed in Scene.g4f_history_blobs, one item per
+# distinct body with its sha256 in ``hash`` and the base64 blob in ``content``.
+# Chat history entries only keep a handle (type, length, hash, preview). Blobs
+# are content-addressed, so the caches below can never return a wrong body,
+# only miss.
+#
+# Trade-off: the .blend is about a third smaller than with bodies stored in
+# the history, but every blob is still read with the .blend, so saving and
+# loading cost about the same (the number of items dominates, not their bytes).
+# Only decompression is deferred until a body is needed. Appending costs a hash
+# and a compression on top of storing the body as is.
+_bodies = OrderedDict()  # hash -> decompressed body, LRU
+_positions = {}  # scene pointer -> {hash: index in Scene.g4f_history_blobs}
+_lock = threading.Lock()
+
+
+def make_preview(body):
+    """Return the single-line preview shown in the history panel."""
+    line = body.strip().split("\n", 1)[0]
+    if len(line) > HISTORY_PREVIEW_LENGTH:
+        line = line[: HISTORY_PREVIEW_LENGTH - 1] + "…"
+    return line
+
+
+def add_message(history, message_type, body):
+    """Append a message to a chat history collection.
+
+    Args:
+        history: ``Scene.g4f_chat_history`` collection.
+        message_type (str): ``"user"`` or ``"assistant"``.
+        body (str): Full message text.
+
+    Returns:
+        The new history entry.
+    """
+    message = history.add()
+    message.type = message_type
+    set_content(message, body)
+    return message
+
+
+def set_content(message, body):
+    """Store ``body`` as a blob of the message's scene and point the entry at it."""
+    message.hash = _store_blob(message.id_data, body)
+    message.length = len(body)
+    message.preview = make_preview(body)
+    if message.content:
+        message.content = ""  # Only set if migrated, an empty string is still stored
+
+
+def get_content(message):
+    """Return the full body of a history entry, decompressing it if needed.
+
+    Entries saved before blobs existed still carry their body in ``content``.
+    """
+    if not message.hash:
+        return message.content
+    return _load_blob(message.id_data, message.hash)
+
+
+def get_preview(message):
+    return message.preview if message.hash else make_preview(message.content)
+
+
+# --- Blob storage ---
+def _index(scene):
+    # Built once per scene after load/undo/redo (see reset_index); appends keep it
+    # current, so storing a blob never walks the collection
+    positions = _positions.get(scene.as_pointer())
+    if positions is None:
+        positions = _positions[scene.as_pointer()] = {
+            blob.hash: i for i, blob in enumerate(scene.g4f_history_blobs)
+        }
+    return positions
+
+
+def _find(scene, key):
+    blobs = scene.g4f_history_blobs
+    position = _index(scene).get(key)
+    if position is None:
+        return None
+    if position < len(blobs) and blobs[position].hash == key:
+        return blobs[position]
+    # Moved behind our back, e.g. a new scene at the address of a deleted one
+    _positions.pop(scene.as_pointer(), None)
+    position = _index(scene).get(key)
+    return None if position is None else blobs[position]
+
+
+def _remember(key, body):
+    _bodies[key] = body
+    _bodies.move_to_end(key)
+    while len(_bodies) > HISTORY_BODY_CACHE:
+        _bodies.popitem(last=False)
+
+
+def _store_blob(scene, body):
+    data = body.encode("utf-8")
+    key = hashlib.sha256(data).hexdigest()
+    with _lock:
+        if _find(scene, key) is None:
+            blob = scene.g4f_history_blobs.add()
+            blob.hash = key
+            blob.content = base64.b64encode(zlib.compress(data, 6)).decode("ascii")
+            _index(scene)[key] = len(scene.g4f_history_blobs) - 1
+        _remember(key, body)
+    return key
+
+
+def _load_blob(scene, key):
+    with _lock:
+        body = _bodies.get(key)
+        if body is not None:
+            _bodies.move_to_end(key)
+            return body
+        blob = _find(scene, key)
+        if blob is None:
+            return ""  # Blob was removed
+        body = zlib.decompress(base64.b64decode(blob.content)).decode("utf-8")
+        _remember(key, body)
+        return body
+
+
+def collect_garbage():
+    """Drop blobs no chat history entry of their scene refers to any more."""
+    with _lock:
+        for scene in bpy.data.scenes:
+            referenced = {message.hash for message in scene.g4f_chat_history if message.hash}
+            blobs = scene.g4f_history_blobs
+            for i in reversed(range(len(blobs))):
+                if blobs[i].hash not in referenced:
+                    blobs.remove(i)
+            _positions.pop(scene.as_pointer(), None)
+
+
+@persistent
+def reset_index(*_args):
+    """Forget the blob positions after the blobs may have changed (load, undo)."""
+    with _lock:
+        _positions.clear()
+
+
+@persistent
+def migrate_history(*_args):
+    """Move bodies of entries saved in older layouts into the scene's blobs.
+
+    Handles bodies stored in ``content`` before blobs existed and blobs kept as
+    lines of the ``HISTORY_BLOB_TEXT`` text datablock.
+    """
+    reset_index()
+    text = bpy.data.texts.get(HISTORY_BLOB_TEXT)
+    lines = {}
+    if text is not None:
+        for line in text.lines:
+            key, _, blob = line.body.partition(" ")
+            if blob:
+                lines[key] = base64.b64encode(base64.b85decode(blob)).decode("ascii")
+    for scene in bpy.data.scenes:
+        for message in scene.g4f_chat_history:
+            if not message.hash and message.content:
+                set_content(message, message.content)
+            elif message.hash in lines and _find(scene, message.hash) is None:
+                blob = scene.g4f_history_blobs.add()
+                blob.hash = message.hash
+                blob.content = lines[message.hash]
+                _index(scene)[message.hash] = len(scene.g4f_history_blobs) - 1
+    if text is not None:
+        bpy.data.texts.remove(text)
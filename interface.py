@@ -1,14 +1,14 @@
 import bpy
 import bpy.props
+from .Settings import HISTORY_PAGE_SIZE
 from .dependencies import Module_Updater
-from .ui_op import G4F_OT_ClearChat , G4T_Del_Message , G4F_OT_ShowCode
-from .prompt_op import G4F_OT_Callback, G4F_TEST_OT_TestModels
+from .ui_op import G4F_OT_ClearChat , G4T_Del_Message , G4F_OT_ShowCode, G4F_OT_RerunCode, G4F_OT_HistoryPage, G4F_OT_QueuePrompt, G4F_OT_RemoveQueued
+from .prompt_op import G4F_OT_Callback, G4F_OT_RunQueue, G4F_TEST_OT_TestModels
+from .history_store import get_preview, make_preview
+from .lazy import missing_dependencies
+from .model_registry import model_registry
 
-no_dep = False
-try:
-    import g4f.models
-except ModuleNotFoundError:
-    no_dep = True
+no_dep = missing_dependencies()
 
 class Chat_PT_history(bpy.types.Panel):
     bl_label = "Chat History"
@@ -22,18 +22,34 @@ class Chat_PT_history(bpy.types.Panel):
         column = layout.column(align=True)
         column.enabled = not Module_Updater.is_working and not no_dep
         column.label(text="Chat history:")
-        for index, message in enumerate(context.scene.g4f_chat_history):
+
+        # Only draw one page of turns, newest page first
+        history = context.scene.g4f_chat_history
+        page_length = 2 * HISTORY_PAGE_SIZE
+        pages = max(1, (len(history) + page_length - 1) // page_length)
+        page = min(context.scene.g4f_history_page, pages - 1)
+        end = len(history) - page * page_length
+        start = max(0, end - page_length)
+        start -= start % 2  # Keep prompt/answer pairs together
+
+        for index in range(start, end):
+            message = history[index]
             if index % 2 == 0:
                 box = column.box()
             row = box.row()
             if message.type == 'assistant':
                 row.label(text="Assistant: ")
-                code_part = row.operator(G4F_OT_ShowCode.bl_idname, text="Show Code")
-                code_part.code = message.content
+                row.operator(G4F_OT_ShowCode.bl_idname, text="Show Code").index = index
+                row.operator(G4F_OT_RerunCode.bl_idname, text="", icon="FILE_REFRESH").index = index
             else:
-                row.label(text=f"User: {message.content}")
+                row.label(text=f"User: {get_preview(message)}")
             if index % 2 == 0:
                 row.operator(G4T_Del_Message.bl_idname, text="", icon="TRASH", emboss=False).index = index
+        if pages > 1:
+            row = column.row(align=True)
+            row.operator(G4F_OT_HistoryPage.bl_idname, text="", icon="TRIA_LEFT").step = 1
+            row.label(text=f"Page {pages - page}/{pages}")
+            row.operator(G4F_OT_HistoryPage.bl_idname, text="", icon="TRIA_RIGHT").step = -1
         layout.operator(G4F_OT_ClearChat.bl_idname, text="Clear Chat")
         column.separator()
     
@@ -59,6 +75,10 @@ class G4f_PT_main(bpy.types.Panel):
         row.label(text="GPT Model:")
         row.operator(G4F_TEST_OT_TestModels.bl_idname, icon="FORCE_CHARGE", text="")
         column.prop(context.scene, "ai_models", text="")
+        row = column.row(align=True)
+        row.prop(context.scene, "g4f_race_mode", toggle=True)
+        row.prop(context.scene, "g4f_pipeline_exec", toggle=True)
+        column.prop(context.scene, "g4f_compress_history", toggle=True)
 
         # Chat input
         column.label(text="Enter your message:")
@@ -70,6 +90,19 @@ class G4f_PT_main(bpy.types.Panel):
         button_label = "Please wait..." if context.scene.g4f_button_pressed else "Prompt"
         row = column.row(align=True)
         row.operator(G4F_OT_Callback.bl_idname, text=button_label)
+        row.operator(G4F_OT_QueuePrompt.bl_idname, text="", icon="ADD")
+
+        # Prompt queue
+        queue = context.scene.g4f_prompt_queue
+        if len(queue):
+            box = column.box()
+            icons = {"generating": "SORTTIME", "ready": "CHECKMARK"}
+            for index, item in enumerate(queue):
+                row = box.row()
+                row.label(text=make_preview(item.content), icon=icons.get(item.type, "TIME"))
+                if item.type == "queued" or not context.scene.g4f_button_pressed:
+                    row.operator(G4F_OT_RemoveQueued.bl_idname, text="", icon="X", emboss=False).index = index
+            box.operator(G4F_OT_RunQueue.bl_idname, text=f"Run Queue ({len(queue)})")
         
         # Progress indicator with dynamic text
         if context.scene.g4f_button_pressed:
@@ -82,13 +115,17 @@ class G4f_PT_main(bpy.types.Panel):
             elif progress <= 0.1:
                 status_text = "Preparing request..."
             elif progress <= 0.7:
-                status_text = "Generating response..." if context.scene.ai_models in g4f.models.ModelUtils.convert and g4f.models.ModelUtils.convert[context.scene.ai_models].best_provider.supports_stream else "Waiting for response..."
+                info = model_registry.get(context.scene.ai_models)
+                status_text = "Generating response..." if info is not None and info.streaming else "Waiting for response..."
             elif progress <= 0.8:
                 status_text = "Processing response..."
             elif progress <= 0.9:
                 status_text = "Finalizing..."
             else:
                 status_text = "Generation Complete!"
+            eta = context.scene.g4f_eta
+            if 0.1 < progress <= 0.7 and eta >= 0.0:
+                status_text = f"{status_text} ~{eta:.0f}s left"
             
             # Display progress bar and text
             if progress < 1.0:
@@ -100,3 +137,18 @@ class G4f_PT_main(bpy.types.Panel):
             column.label(text="Updating Dependencies..." , icon="ERROR")
         elif no_dep:
             column.label(text="Dependencies not installed" , icon="ERROR")
+
+class G4F_PT_execution(bpy.types.Panel):
+    bl_label = "Execution"
+    bl_idname = "G4T_PT_Execution"
+    bl_space_type = 'VIEW_3D'
+    bl_region_type = 'UI'
+    bl_category = 'Free Gpt'
+    bl_parent_id = "G4T_PT_Panel"
+    bl_options = {'DEFAULT_CLOSED'}
+
+    def draw(self, context):
+        layout = self.layout
+        layout.prop(context.scene, "g4f_exec_scope")
+        if context.scene.g4f_exec_scope == 'COLLECTION':
+            layout.prop(context.scene, "g4f_exec_collection")
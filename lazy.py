@@ -0,0 +1,88 @@
+import importlib
+import importlib.util
+import threading
+
+
+class LazyModule:
+    """Stand-in for a module that is only imported on first attribute access.
+
+    ``g4f`` and its provider tree take around half a second to import. Going
+    through a ``LazyModule`` keeps that out of add-on registration, so Blender
+    sessions that never prompt never pay for it.
+
+    Args:
+        name (str): Module to import.
+        submodules (tuple): Submodules imported together with it.
+        on_load: Called with the module once, right after the import.
+    """
+
+    def __init__(self, name, submodules=(), on_load=None):
+        self._name = name
+        self._submodules = submodules
+        self._on_load = on_load
+        self._module = None
+        self._lock = threading.Lock()
+
+    @property
+    def available(self):
+        """bool: Whether the module is installed, without importing it."""
+        return self._module is not None or importlib.util.find_spec(self._name) is not None
+
+    @property
+    def loaded(self):
+        return self._module is not None
+
+    def load(self):
+        """Import the module if needed and return it.
+
+        Safe to call from several threads; the import runs once.
+        """
+        if self._module is None:
+            with self._lock:
+                if self._module is None:
+                    module = importlib.import_module(self._name)
+                    for submodule in self._submodules:
+                        importlib.import_module(f"{self._name}.{submodule}")
+                    if self._on_load is not None:
+                        self._on_load(module)
+                    self._module = module
+        return self._module
+
+    def __getattr__(self, attr):
+        return getattr(self.load(), attr)
+
+    def __repr__(self):
+        state = "loaded" if self.loaded else "not loaded"
+        return f"<LazyModule {self._name!r} ({state})>"
+
+
+def _configure_g4f(module):
+    module.debug.version_check = False
+
+
+g4f = LazyModule("g4f", ("models", "client", "version"), _configure_g4f)
+rich = LazyModule("rich", ("console", "live", "markdown", "text"))
+
+
+def missing_dependencies():
+    """Return True if g4f or rich is not installed. Nothing is imported."""
+    return not (g4f.available and rich.available)
+
+
+def warm_up():
+    """Import g4f and rich on a background thread.
+
+    Returns:
+        threading.Thread: The started thread.
+    """
+
+    def load():
+        for module in (g4f, rich):
+            try:
+                module.load()
+            except ImportError:
+                pass  # Reported as missing dependencies elsewhere
+
+    thread = threading.Thread(target=load, name="G4F-Import", daemon=True)
+    thread.start()
+    return thread
@@ -0,0 +1,102 @@
+import gzip
+import logging
+import logging.handlers
+import os
+import queue
+import shutil
+import threading
+
+from .Settings import LOG_BACKUPS, LOG_LEVEL, LOG_MAX_BYTES, LOG_PATH
+
+LOGGER_NAME = "G4F_Callback"
+LOG_FORMAT = "%(asctime)s - %(threadName)s - %(levelname)s - %(message)s"
+
+_listener = None
+_lock = threading.Lock()
+_log_chunks = False
+
+
+class _DeferredQueueHandler(logging.handlers.QueueHandler):
+    """Queue records without formatting them; the listener formats them.
+
+    The stock ``prepare`` formats the message on the calling thread so records
+    can be pickled. The queue never leaves the process, so that is skipped.
+    """
+
+    def prepare(self, record):
+        return record
+
+
+def _gzip_namer(name):
+    return name + ".gz"
+
+
+def _gzip_rotator(source, dest):
+    with open(source, "rb") as f_in, gzip.open(dest, "wb") as f_out:
+        shutil.copyfileobj(f_in, f_out)
+    os.remove(source)
+
+
+def configure_logging(path=LOG_PATH, max_bytes=LOG_MAX_BYTES, backups=LOG_BACKUPS):
+    """Set up the add-on logger once and return it.
+
+    Records go through a ``QueueHandler``; a ``QueueListener`` thread formats them
+    and writes them to a size-rotated file whose backups are gzipped. Callers on
+    the main thread or the runtime loop only pay for putting a record on the queue.
+    Only the add-on logger is configured, the root logger is left alone.
+
+    Returns:
+        logging.Logger: The add-on logger.
+    """
+    global _listener
+    logger = logging.getLogger(LOGGER_NAME)
+    with _lock:
+        if _listener is not None:
+            return logger
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        file_handler = logging.handlers.RotatingFileHandler(
+            path, maxBytes=max_bytes, backupCount=backups, encoding="utf-8"
+        )
+        file_handler.namer = _gzip_namer
+        file_handler.rotator = _gzip_rotator
+        file_handler.setFormatter(logging.Formatter(LOG_FORMAT))
+
+        records = queue.SimpleQueue()
+        logger.handlers.clear()
+        logger.addHandler(_DeferredQueueHandler(records))
+        logger.propagate = False
+        if logger.level == logging.NOTSET:
+            logger.setLevel(LOG_LEVEL)
+        _listener = logging.handlers.QueueListener(records, file_handler)
+        _listener.start()
+    return logger
+
+
+def set_log_level(level, log_chunks=False):
+    """Apply the level and per-chunk debug setting from the add-on preferences.
+
+    Args:
+        level (str): Level name such as ``"INFO"``.
+        log_chunks (bool): Log every streamed chunk. Only has an effect at DEBUG.
+    """
+    global _log_chunks
+    logging.getLogger(LOGGER_NAME).setLevel(level)
+    _log_chunks = log_chunks
+
+
+def log_chunks_enabled():
+    """Return True if streamed chunks should be logged one by one."""
+    return _log_chunks and logging.getLogger(LOGGER_NAME).isEnabledFor(logging.DEBUG)
+
+
+def stop_logging():
+    """Flush queued records and stop the listener thread."""
+    global _listener
+    with _lock:
+        if _listener is None:
+            return
+        _listener.stop()
+        for handler in _listener.handlers:
+            handler.close()
+        _listener = None
+        logging.getLogger(LOGGER_NAME).handlers.clear()
@@ -0,0 +1,242 @@
+import json
+import logging
+import logging.handlers
+import os
+import threading
+import time
+from collections import defaultdict, deque
+
+from .Settings import (
+    METRICS_BACKUPS,
+    METRICS_MAX_BYTES,
+    METRICS_PATH,
+    METRICS_PROMETHEUS_FILE,
+    METRICS_SUMMARY_WINDOW,
+)
+
+# Per-request values summarized by quantile, in seconds unless noted
+SUMMARY_FIELDS = (
+    "queue_wait",
+    "ttfb",
+    "stream_duration",
+    "tokens_per_sec",
+    "extract_time",
+    "compile_time",
+    "exec_time",
+    "total_time",
+)
+
+
+def label_value(value):
+    """Escape a Prometheus label value."""
+    return value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def percentile(values, q):
+    """Return the ``q`` quantile (0-1) of ``values`` by linear interpolation."""
+    values = sorted(values)
+    if not values:
+        return None
+    position = (len(values) - 1) * q
+    low = int(position)
+    high = min(low + 1, len(values) - 1)
+    return values[low] + (values[high] - values[low]) * (position - low)
+
+
+class RequestMetrics:
+    """Timings of one generation, filled in as it progresses.
+
+    Written as a single JSON line by :meth:`MetricsRecorder.write`.
+    """
+
+    def __init__(self, model):
+        self.started = time.monotonic()
+        self.data = {
+            "time": time.time(),
+            "model": model,
+            "answered_by": None,
+            "status": None,
+            "error": None,
+            "queue_wait": None,
+            "ttfb": None,
+            "stream_duration": None,
+            "tokens": None,
+            "tokens_per_sec": None,
+            "extract_time": 0.0,
+            "compile_time": 0.0,
+            "exec_time": 0.0,
+            "blocks": [],
+        }
+
+    def __setitem__(self, key, value):
+        self.data[key] = value
+
+    def __getitem__(self, key):
+        return self.data[key]
+
+    def add_time(self, key, seconds):
+        self.data[key] += seconds
+
+    def block(self, index):
+        """Return the timing entry of block ``index``, creating missing entries."""
+        blocks = self.data["blocks"]
+        while len(blocks) <= index:
+            blocks.append({"compile": None, "exec": None, "ok": None})
+        return blocks[index]
+
+    def finish(self, status, error=None):
+        self.data["status"] = status
+        self.data["error"] = str(error) if error is not None else None
+        self.data["total_time"] = time.monotonic() - self.started
+        return self.data
+
+
+class MetricsRecorder:
+    """Write request metrics to a rotating JSONL file and summarize them.
+
+    A window of recent records per model is kept in memory for summaries and
+    the optional Prometheus textfile, seeded from the JSONL files on first use.
+    """
+
+    def __init__(self, path=METRICS_PATH, max_bytes=METRICS_MAX_BYTES, backups=METRICS_BACKUPS):
+        self.path = path
+        self.max_bytes = max_bytes
+        self.backups = backups
+        self._logger = None
+        self._recent = None
+        self._lock = threading.Lock()
+
+    def write(self, record, prometheus_dir=None):
+        """Append a finished record.
+
+        Args:
+            record (dict): Result of :meth:`RequestMetrics.finish`.
+            prometheus_dir (str): Directory watched by a Prometheus node exporter
+                textfile collector. Nothing is exported if empty.
+        """
+        line = json.dumps(record, separators=(",", ":"))
+        with self._lock:
+            window = self._window(record["model"])  # Seeded from disk before this line is added
+            self._get_logger().info(line)
+            window.append(record)
+        if prometheus_dir:
+            self.write_prometheus(prometheus_dir)
+
+    def records(self):
+        """Return every record still on disk, oldest first."""
+        paths = [f"{self.path}.{i}" for i in range(self.backups, 0, -1)] + [self.path]
+        records = []
+        for path in paths:
+            if not os.path.exists(path):
+                continue
+            with open(path, "r") as f:
+                for line in f:
+                    try:
+                        records.append(json.loads(line))
+                    except json.JSONDecodeError:
+                        continue  # Line cut short by a crash
+        return records
+
+    def summary(self):
+        """Summarize the recent records of every model.
+
+        Returns:
+            dict: ``{model: {"count", "ok", "failed", "cancelled", <field>: {"p50", "p95"}}}``.
+        """
+        with self._lock:
+            self._load_recent()
+            recent = {model: list(records) for model, records in self._recent.items()}
+        summary = {}
+        for model, records in sorted(recent.items()):
+            statuses = [r["status"] for r in records]
+            entry = {
+                "count": len(records),
+                "ok": statuses.count("ok"),
+                "failed": statuses.count("error"),
+                "cancelled": statuses.count("cancelled"),
+            }
+            for field in SUMMARY_FIELDS:
+                values = [r[field] for r in records if r.get(field) is not None]
+                entry[field] = {
+                    "p50": percentile(values, 0.5),
+                    "p95": percentile(values, 0.95),
+                    "sum": sum(values),
+                    "count": len(values),
+                }
+            summary[model] = entry
+        return summary
+
+    def write_prometheus(self, directory):
+        """Write the summary in Prometheus text format, atomically."""
+        lines = [
+            "# HELP free_gpt_requests Generations in the summary window by status.",
+            "# TYPE free_gpt_requests gauge",
+        ]
+        summary = self.summary()
+        for model, entry in summary.items():
+            for status in ("ok", "failed", "cancelled"):
+                lines.append(f'free_gpt_requests{{model="{label_value(model)}",status="{status}"}} {entry[status]}')
+        for field in SUMMARY_FIELDS:
+            unit = "" if field == "tokens_per_sec" else "_seconds"
+            name = f"free_gpt_{field}{unit}"
+            lines.append(f"# TYPE {name} summary")
+            for model, entry in summary.items():
+                model = label_value(model)
+                for quantile, key in (("0.5", "p50"), ("0.95", "p95")):
+                    value = entry[field][key]
+                    if value is not None:
+                        lines.append(f'{name}{{model="{model}",quantile="{quantile}"}} {value:.6g}')
+                lines.append(f'{name}_sum{{model="{model}"}} {entry[field]["sum"]:.6g}')
+                lines.append(f'{name}_count{{model="{model}"}} {entry[field]["count"]}')
+
+        os.makedirs(directory, exist_ok=True)
+        path = os.path.join(directory, METRICS_PROMETHEUS_FILE)
+        tmp_path = path + ".tmp"  # The collector only reads *.prom files
+        with open(tmp_path, "w") as f:
+            f.write("\n".join(lines) + "\n")
+        os.replace(tmp_path, path)
+
+    # --- Internals ---
+    def _get_logger(self):
+        if self._logger is None:
+            os.makedirs(os.path.dirname(self.path), exist_ok=True)
+            handler = logging.handlers.RotatingFileHandler(
+                self.path, maxBytes=self.max_bytes, backupCount=self.backups
+            )
+            handler.setFormatter(logging.Formatter("%(message)s"))
+            logger = logging.getLogger("G4F_Metrics")
+            logger.handlers.clear()
+            logger.addHandler(handler)
+            logger.setLevel(logging.INFO)
+            logger.propagate = False
+            self._logger = logger
+        return self._logger
+
+    def _load_recent(self):
+        if self._recent is None:
+            self._recent = defaultdict(lambda: deque(maxlen=METRICS_SUMMARY_WINDOW))
+            for record in self.records():
+                self._recent[record["model"]].append(record)
+
+    def _window(self, model):
+        self._load_recent()
+        return self._recent[model]
+
+
+def format_summary(summary):
+    """Render :meth:`MetricsRecorder.summary` as a plain text table."""
+    header = f"{'model':<28}{'n':>5}{'ok':>5}{'fail':>5}"
+    columns = ("queue_wait", "ttfb", "stream_duration", "tokens_per_sec", "exec_time", "total_time")
+    header += "".join(f"{name + ' p50/p95':>28}" for name in columns)
+    lines = [header]
+    for model, entry in summary.items():
+        line = f"{model[:27]:<28}{entry['count']:>5}{entry['ok']:>5}{entry['failed']:>5}"
+        for name in columns:
+            p50, p95 = entry[name]["p50"], entry[name]["p95"]
+            cell = "-" if p50 is None else f"{p50:.2f}/{p95:.2f}"
+            line += f"{cell:>28}"
+        lines.append(line)
+    return "\n".join(lines)
+
+
+metrics = MetricsRecorder()
@@ -0,0 +1,253 @@
+import asyncio
+import threading
+import time
+
+import bpy
+
+from .Settings import (
+    MODEL_CHECK_TTL,
+    MODEL_REFRESH_CONCURRENCY,
+    MODEL_REFRESH_INTERVAL,
+    MODEL_RETRY_BASE,
+    MODEL_RETRY_MAX,
+    PROBE_CONCURRENCY,
+    PROBE_MESSAGES,
+    PROBE_TIMEOUT,
+)
+from .get_models import load_models_config, save_models_config
+from .runtime import runtime
+from .utils import (
+    complete_response,
+    parse_stream_chunk,
+    setup_logger,
+    stream_response,
+)
+from .lazy import g4f, missing_dependencies
+from .model_registry import current_g4f_version, model_registry
+
+no_dep = missing_dependencies()
+
+
+class ModelProber:
+    """Check which models answer, with bounded concurrency and a deadline per model.
+
+    Streaming models are probed by reading only until the first non-empty token.
+    Results are recorded as they arrive so the UI can publish working models
+    before the slowest provider finishes.
+    """
+
+    def __init__(self, models, logger, concurrency=PROBE_CONCURRENCY, timeout=PROBE_TIMEOUT):
+        """Prepare a probe run.
+
+        Args:
+            models (list): Model names to probe.
+            logger: Logger used for per-model diagnostics.
+            concurrency (int): Maximum number of probes in flight.
+            timeout (float): Deadline in seconds for each model.
+        """
+        self.models = list(models)
+        self.logger = logger
+        self.concurrency = concurrency
+        self.timeout = timeout
+        self.results = {}
+        self._passed = []
+        self._lock = threading.Lock()
+
+    async def run(self):
+        """Probe every model.
+
+        Returns:
+            dict: ``{model: {"ok", "ttfb", "total", "error"}}``.
+        """
+        semaphore = asyncio.Semaphore(self.concurrency)
+
+        async def bounded(model):
+            async with semaphore:
+                await self.probe(model)
+
+        await asyncio.gather(*(bounded(model) for model in self.models))
+        return self.results
+
+    async def probe(self, model):
+        """Probe a single model and record its result."""
+        start = time.perf_counter()
+        result = {"ok": False, "ttfb": None, "total": None, "error": None}
+        try:
+            ttfb = await asyncio.wait_for(self._first_token(model, start), self.timeout)
+            result.update(ok=True, ttfb=round(ttfb, 3))
+        except asyncio.TimeoutError:
+            result["error"] = f"timed out after {self.timeout:.0f}s"
+        except Exception as e:
+            result["error"] = str(e) or type(e).__name__
+        result["total"] = round(time.perf_counter() - start, 3)
+
+        if result["ok"]:
+            self.logger.debug(f"{model}: ok, ttfb {result['ttfb']}s")
+        else:
+            self.logger.debug(f"{model} failed: {result['error']}")
+        with self._lock:
+            self.results[model] = result
+            if result["ok"]:
+                self._passed.append(model)
+
+    def drain_passed(self):
+        """Return the models that passed since the last call."""
+        with self._lock:
+            passed, self._passed = self._passed, []
+        return passed
+
+    async def _first_token(self, model, start):
+        if not model_registry.supports_stream(model):
+            content = await complete_response(PROBE_MESSAGES, model)
+            if not content.strip():
+                raise ValueError("empty response")
+            return time.perf_counter() - start
+
+        response = stream_response(PROBE_MESSAGES, model)
+        try:
+            async for chunk in response:
+                if parse_stream_chunk(chunk).strip():
+                    return time.perf_counter() - start
+        finally:
+            await response.aclose()
+        raise ValueError("empty response")
+
+
+def models_due_for_check(models, data, now=None):
+    """Select the models whose last check is out of date.
+
+    A model is due if it was never checked, if it passed longer than
+    ``MODEL_CHECK_TTL`` ago, or if it failed and its exponential backoff has
+    expired. A g4f upgrade makes every failed model due again.
+
+    Args:
+        models (list): Every model g4f knows about.
+        data (dict): Model configuration as returned by ``load_models_config``.
+        now (float): Current time, defaults to ``time.time()``.
+
+    Returns:
+        list: Model names to probe.
+    """
+    now = time.time() if now is None else now
+    checks = data.get("checks", {})
+    upgraded = data.get("g4f_version") != current_g4f_version()
+    due = []
+    for model in models:
+        check = checks.get(model)
+        if check is None:
+            due.append(model)
+            continue
+        age = now - check.get("checked", 0)
+        if check.get("ok"):
+            if age > MODEL_CHECK_TTL:
+                due.append(model)
+        elif upgraded:
+            due.append(model)
+        else:
+            backoff = MODEL_RETRY_BASE * 2 ** max(0, check.get("failures", 1) - 1)
+            if age > min(backoff, MODEL_RETRY_MAX):
+                due.append(model)
+    return due
+
+
+def apply_probe_results(results, models):
+    """Merge probe results into ``models_config.json``.
+
+    Each model keeps its last outcome, check time, consecutive failure count and
+    latency. The ``active``/``deprecated`` lists are rebuilt from those records.
+
+    Args:
+        results (dict): Results from :meth:`ModelProber.run`.
+        models (list): Every model g4f knows about; others are dropped.
+
+    Returns:
+        dict: The saved configuration.
+    """
+    now = time.time()
+    data = load_models_config()
+    checks = data.setdefault("checks", {})
+    for model, result in results.items():
+        previous = checks.get(model, {})
+        checks[model] = {
+            "ok": result["ok"],
+            "checked": now,
+            "failures": 0 if result["ok"] else previous.get("failures", 0) + 1,
+            "ttfb": result["ttfb"],
+            "total": result["total"],
+        }
+    for model in list(checks):
+        if model not in models:
+            del checks[model]
+
+    data["active"] = [m for m in models if checks.get(m, {}).get("ok")]
+    data["deprecated"] = [m for m in models if m in checks and not checks[m]["ok"]]
+    data["g4f_version"] = current_g4f_version()
+    data.pop("latency", None)
+    save_models_config(data)
+    return data
+
+
+# --- Background refresher ---
+_refresh_future = None
+_refresh_prober = None
+
+
+def refresh_in_progress():
+    """Return True while the background refresher is probing models."""
+    return _refresh_future is not None
+
+
+def _refresh_enabled():
+    try:
+        return bpy.context.preferences.addons[__package__].preferences.auto_refresh_models
+    except (KeyError, AttributeError):
+        return False
+
+
+def _refresh_models():
+    """Timer callback that re-validates stale models at low priority."""
+    global _refresh_future, _refresh_prober
+
+    if _refresh_future is not None:
+        if not _refresh_future.done():
+            return 5.0
+        if not _refresh_future.cancelled():
+            apply_probe_results(_refresh_prober.results, list(g4f.models._all_models))
+            model_registry.invalidate()
+            _refresh_prober.logger.info(
+                f"Background refresh checked {len(_refresh_prober.results)} models"
+            )
+        _refresh_future = _refresh_prober = None
+        return MODEL_REFRESH_INTERVAL
+
+    if no_dep or not _refresh_enabled():
+        return MODEL_REFRESH_INTERVAL
+    scene = bpy.context.scene
+    if scene is not None and scene.g4f_button_pressed:
+        return 60.0  # Don't compete with a running generation
+
+    models = list(g4f.models._all_models)
+    due = models_due_for_check(models, load_models_config())
+    if not due:
+        return MODEL_REFRESH_INTERVAL
+    _refresh_prober = ModelProber(
+        due, setup_logger(), concurrency=MODEL_REFRESH_CONCURRENCY
+    )
+    _refresh_future = runtime.submit(_refresh_prober.run())
+    return 5.0
+
+
+def start_background_refresh():
+    if not bpy.app.timers.is_registered(_refresh_models):
+        bpy.app.timers.register(
+            _refresh_models, first_interval=60.0, persistent=True
+        )
+
+
+def stop_background_refresh():
+    global _refresh_future, _refresh_prober
+    if bpy.app.timers.is_registered(_refresh_models):
+        bpy.app.timers.unregister(_refresh_models)
+    if _refresh_future is not None:
+        _refresh_future.cancel()
+    _refresh_future = _refresh_prober = None
@@ -0,0 +1,211 @@
+import json
+import os
+import threading
+import zlib
+
+from .Settings import ATTEMPT_STATS_PATH, DEFAULT_MODEL, FALLBACK_MODELS, JSON_PATH
+from .get_models import load_models_config
+from .lazy import g4f
+
+
+def current_g4f_version():
+    try:
+        return g4f.version.utils.current_version
+    except Exception:
+        return None
+
+
+def _mtime(path):
+    try:
+        return os.stat(path).st_mtime_ns
+    except OSError:
+        return None
+
+
+class ModelInfo:
+    """What the add-on knows about one model.
+
+    Attributes:
+        name (str): Model name as g4f knows it.
+        known (bool): g4f is loaded and has the model.
+        streaming (bool): Its best provider streams. None while g4f is not loaded.
+        image (bool): Listed under ``image_models`` in ``models_config.json``.
+        active (bool): Passed its last test.
+        deprecated (bool): Failed its last test.
+        latency (float): Average request latency in seconds, the probe's total
+            time if it was never used, None if neither is known.
+    """
+
+    __slots__ = ("name", "known", "streaming", "image", "active", "deprecated", "latency")
+
+    def __init__(self, name, known=False, streaming=None, image=False, active=False, deprecated=False, latency=None):
+        self.name = name
+        self.known = known
+        self.streaming = streaming
+        self.image = image
+        self.active = active
+        self.deprecated = deprecated
+        self.latency = latency
+
+    def describe(self):
+        """Return the tooltip shown in the model list."""
+        parts = [self.name]
+        if self.image:
+            parts.append("image model")
+        if self.streaming is not None:
+            parts.append("streams" if self.streaming else "answers at once")
+        if self.latency is not None:
+            parts.append(f"~{self.latency:.1f}s")
+        return ", ".join(parts)
+
+
+class ModelRegistry:
+    """In-memory table of every model and its capabilities.
+
+    Built from g4f's model list, ``models_config.json`` and the request
+    statistics on first use. Every lookup compares the modification times of
+    both files and the loaded g4f version with the ones the table was built
+    from, and rebuilds it only if they differ, so the UI can read it on every
+    redraw. g4f is never imported here; until something else imports it only
+    the models named in ``models_config.json`` are known.
+    """
+
+    def __init__(self, config_path=JSON_PATH, stats_path=ATTEMPT_STATS_PATH):
+        self.config_path = config_path
+        self.stats_path = stats_path
+        self._lock = threading.Lock()
+        self._signature = None
+        self._models = {}
+        self._items = []
+        self._version_module = None
+        self._version = None
+
+    def get(self, name):
+        """Return the ``ModelInfo`` of ``name``, None for an unknown model."""
+        return self._table()[0].get(name)
+
+    def models(self):
+        """Return every ``ModelInfo``, in g4f's order."""
+        return list(self._table()[0].values())
+
+    def is_known(self, name):
+        info = self.get(name)
+        return info is not None and info.known
+
+    def supports_stream(self, name):
+        """Return whether the best provider of ``name`` streams, importing g4f if needed.
+
+        False for a model g4f doesn't know, which is then requested without
+        streaming and fails with g4f's own error.
+        """
+        g4f.load()
+        info = self.get(name)
+        return bool(info is not None and info.known and info.streaming)
+
+    def resolve(self, name):
+        """Return the model to use for the ``ai_models`` selection ``name``.
+
+        A selection the model list doesn't offer reads as an empty string, e.g.
+        in a new scene before the list has been filled. It falls back to
+        ``DEFAULT_MODEL`` if listed, otherwise to the first listed model.
+        """
+        if name:
+            return name
+        names = [item[0] for item in self.enum_items()]
+        if not names or DEFAULT_MODEL in names:
+            return DEFAULT_MODEL
+        return names[0]
+
+    def enum_items(self):
+        """Return the items of the ``ai_models`` enum.
+
+        The list is kept until the next rebuild: Blender requires the strings
+        returned by an items callback to stay referenced. Item numbers are
+        derived from the model name, so a saved selection survives models being
+        added or removed. ``DEFAULT_MODEL`` always has number 0, the default of
+        the property.
+        """
+        return self._table()[1]
+
+    def invalidate(self):
+        """Rebuild the table on the next lookup."""
+        with self._lock:
+            self._signature = None
+
+    # --- Internals ---
+    def _g4f_version(self):
+        if not g4f.loaded:
+            return None
+        module = g4f.load()
+        if self._version_module is not module:
+            self._version_module = module
+            self._version = current_g4f_version() or "unknown"
+        return self._version
+
+    def _table(self):
+        signature = (_mtime(self.config_path), _mtime(self.stats_path), self._g4f_version())
+        with self._lock:
+            if signature != self._signature:
+                self._models, self._items = self._build()
+                self._signature = signature
+            return self._models, self._items
+
+    def _load_stats(self):
+        try:
+            with open(self.stats_path, "r") as f:
+                return json.load(f)
+        except (OSError, json.JSONDecodeError):
+            return {}
+
+    def _build(self):
+        try:
+            data = load_models_config()
+        except (OSError, ValueError):
+            data = {"active": [], "deprecated": []}
+        stats = self._load_stats()
+        checks = data.get("checks", {})
+        active = set(data["active"])
+        deprecated = set(data["deprecated"])
+        image = set(data.get("image_models", []))
+
+        if g4f.loaded:
+            convert = g4f.models.ModelUtils.convert
+            listed = list(g4f.models._all_models)
+        else:
+            convert = None
+            listed = list(data["active"]) or list(FALLBACK_MODELS)
+
+        models = {}
+        for name in listed + sorted((active | deprecated | image) - set(listed)):
+            if name in models:
+                continue
+            model = convert.get(name) if convert is not None else None
+            latency = stats.get(name, {}).get("latency") or checks.get(name, {}).get("total")
+            models[name] = ModelInfo(
+                name,
+                known=model is not None,
+                streaming=bool(getattr(model.best_provider, "supports_stream", False)) if model is not None else None,
+                image=name in image,
+                active=name in active,
+                deprecated=name in deprecated,
+                latency=latency,
+            )
+
+        items = []
+        numbers = {0}  # Reserved for DEFAULT_MODEL
+        for name in dict.fromkeys(listed):
+            info = models[name]
+            if info.deprecated:
+                continue
+            if name == DEFAULT_MODEL:
+                items.append((name, name, info.describe(), 0))
+                continue
+            number = zlib.crc32(name.encode()) & 0x7FFFFFFF
+            while number in numbers:
+                number = (number + 1) & 0x7FFFFFFF
+            numbers.add(number)
+            items.append((name, name, info.describe(), number))
+        return models, items
+
+
+model_registry = ModelRegistry()
@@ -1,38 +1,68 @@
-import os
-import json
-import re
 import traceback
 import threading
+import time
 import asyncio
+import queue
 import bpy
 from .dependencies import Module_Updater
 from .utils import (
-    create_models,
     setup_logger,
     wrap_prompt,
     append_error_as_comment,
+    extract_code_blocks,
+    parse_stream_chunk,
     stream_response,
+    complete_response,
 )
-from .Settings import code_system_prompt, JSON_PATH, IMAGE_SYSTEM_PROMPT
+from .Settings import (
+    code_system_prompt,
+    IMAGE_SYSTEM_PROMPT,
+    CONTEXT_TOKEN_BUDGET,
+    CONTEXT_TOKEN_BUDGETS,
+    QUEUE_PREFETCH,
+)
+from .context_builder import build_context, estimate_tokens
+from .code_compress import outline_script
+from .console_render import StreamingMarkdown
+from .code_fence import CodeBlock, FenceParser
+from .bytecode_cache import bytecode_cache
+from .exec_context import scene_override
+from .history_store import add_message, get_content
+from .response_cache import response_cache
+from .race import ModelRace, pick_race_models
+from .failover import RequestExecutor, rank_failover_models
+from .stream_stats import ProgressEstimator, stream_stats
+from .metrics import RequestMetrics, metrics
+from .logging_setup import log_chunks_enabled
+from .transcript import TranscriptRecorder, load_transcript
+from .runtime import runtime
+from .model_probe import (
+    ModelProber,
+    apply_probe_results,
+    models_due_for_check,
+    refresh_in_progress,
+)
+from .get_models import load_models_config, save_models_config
+from .lazy import g4f, rich
+from .model_registry import model_registry
 
-no_dep = False
-try:
-    import g4f
-    from g4f.client import AsyncClient
-    from rich.console import Console
-    from rich.live import Live
-    from rich.markdown import Markdown
-except ModuleNotFoundError:
-    no_g4f = True
 
+def exec_globals():
+    """Return a fresh global namespace for running generated code.
 
+    Generation and re-runs from the history both use it, so a block sees the
+    same names either way.
+    """
+    return globals().copy()
 
-class G4F_OT_Callback(bpy.types.Operator):
-    """Operator to handle AI generation tasks with progress monitoring in Blender."""
 
-    bl_idname = "g4f.callback"
-    bl_label = "Callback for Thread"
-    bl_description = "Callback Model Operator"
+class GenerationMixin:
+    """Generation, code extraction and execution without any UI of its own.
+
+    ``G4F_OT_Callback`` drives it from a modal timer, ``batch.HeadlessGeneration``
+    from a plain loop when Blender runs in the background. Subclasses provide
+    ``report``, ``replay_path`` and ``replay_speed``.
+    """
 
     # --- Initialization ---
     def __init__(self, *args, **kwargs):
@@ -40,37 +70,35 @@ class G4F_OT_Callback(bpy.types.Operator):
         """Initialize thread-safe progress tracking."""
         self._progress = 0.0  # Thread-safe progress variable (0.0 to 1.0)
         self._progress_lock = threading.Lock()  # Lock for thread-safe progress updates
-
-    # --- Class Methods ---
-    @classmethod
-    def poll(cls, context):
-        """Check if the operator can be executed.
-
-        Args:
-            context: Blender context.
-
-        Returns:
-            bool: True if the operator can run, False otherwise.
-        """
-        return (
-            not context.scene.g4f_button_pressed
-            and not Module_Updater.is_working
-            and context.scene.g4f_chat_input
-        )
+        self.request_metrics = None
+        self.last_metrics = None
+        self.collect_metrics = False
 
     # --- Main Execution Methods ---
-    def execute(self, context):
-        """Start the AI generation process in a separate thread.
+    def start(self, context, model=None, prompt=None, pending=()):
+        """Build the request and submit the generation to the add-on runtime.
 
         Args:
             context: Blender context.
+            model (str): Model to ask, defaults to the one selected on the scene.
+            prompt (str): Prompt to send, defaults to the scene's chat input.
+            pending (list): Chronological ``(role, content)`` turns of earlier
+                answers that are generated but not in the chat history yet.
 
         Returns:
-            set: {'RUNNING_MODAL'} to indicate modal operation.
+            bool: True if the generation was submitted.
         """
         # Initialize logging and console
         self.logger = setup_logger()
-        self.console = Console()
+        self.console = rich.console.Console()
+        self.replay = None
+        if self.replay_path:
+            try:
+                self.replay = load_transcript(bpy.path.abspath(self.replay_path))
+            except (OSError, ValueError) as e:
+                self.logger.error(f"Could not load transcript {self.replay_path}: {e}")
+                self.report({"ERROR"}, f"Could not load transcript: {e}")
+                return False
         self.logger.info("Starting new G4F callback operation")
         self.console.print("[bold cyan]Starting AI generation...[/bold cyan]")
 
@@ -84,201 +112,211 @@ class G4F_OT_Callback(bpy.types.Operator):
         self.is_cancelled = False
         self.cancel_done = False
         self.error = None
-        self._thread = None
+        self._future = None
         self._timer = None
+        self._estimator = None
         self.is_image_model = False
+        self.race_models = []
+        self.pipelined = context.scene.g4f_pipeline_exec
+        self._ready_blocks = queue.SimpleQueue()
+        self.queued_count = 0
+        self.executed_count = 0
+        self.executed_codes = []
+        self._exec_globals = exec_globals()
+        self._exec_locals = {}
+        self._exec_override = None
+        preferences = context.preferences.addons[__package__].preferences
+        self.use_cache = preferences.use_response_cache
+        self.use_bytecode_disk = preferences.use_bytecode_disk_cache
+        self.request_retries = preferences.request_retries
+        self.request_timeout = preferences.request_timeout
+        self.connect_timeout = preferences.connect_timeout or None
+        self.first_byte_timeout = preferences.first_byte_timeout or None
+        self.failover_models = []
+        self.collect_metrics = preferences.collect_metrics
+        self.prometheus_dir = bpy.path.abspath(preferences.prometheus_dir) if preferences.prometheus_dir else ""
+        self.record_transcripts = preferences.record_transcripts
 
         # Get input data
-        ai_model = context.scene.ai_models
-        chat_input = context.scene.g4f_chat_input
+        ai_model = model or model_registry.resolve(context.scene.ai_models)
+        if self.replay is not None:
+            ai_model = self.replay.model
+            self.use_cache = False
+            self.request_retries = 1
+        self.request_metrics = RequestMetrics(ai_model)
+        chat_input = context.scene.g4f_chat_input if prompt is None else prompt
+        self.prompt = chat_input
+        self.from_input = prompt is None
         chat_history = context.scene.g4f_chat_history
         system_prompt = self.get_system_prompt(ai_model)
+        budget = preferences.context_token_budget or CONTEXT_TOKEN_BUDGETS.get(
+            ai_model, CONTEXT_TOKEN_BUDGET
+        )
+        if self.replay is not None:
+            pass  # Replays answer as the recorded model only
+        elif context.scene.g4f_race_mode and not self.is_image_model:
+            configured = [
+                m.strip() for m in preferences.race_models.split(",") if m.strip()
+            ]
+            self.race_models = pick_race_models(
+                ai_model, configured, preferences.race_size
+            )
+        elif not self.is_image_model:
+            self.failover_models = rank_failover_models(
+                ai_model, preferences.failover_models
+            )
 
-        # Launch generation thread
+        # Schedule generation on the background loop
         self.logger.debug(
-            f"Launching thread with model: {ai_model}, input length: {len(chat_input)}"
+            f"Submitting generation with model: {ai_model}, input length: {len(chat_input)}"
         )
         self.console.print(f"[cyan]Using model:[/cyan] [italic]{ai_model}[/italic]")
-        self._thread = threading.Thread(
-            target=self.generate_g4f_code,
-            args=(chat_input, chat_history, ai_model, system_prompt),
-        )
-        self._thread.start()
 
-        # Set up modal timer
-        self._timer = context.window_manager.event_timer_add(
-            0.01, window=context.window
+        # Build the request on the main thread, newest history first
+        prompt = chat_input if self.is_image_model else wrap_prompt(chat_input)
+        compression = {"scripts": 0, "bytes_saved": 0}
+        turns = self.history_turns(
+            chat_history, context.scene.g4f_compress_history, compression, pending
         )
-        self.report({"INFO"}, "Generating... (ESC=Abort)")
-        context.window_manager.modal_handler_add(self)
-        return {"RUNNING_MODAL"}
-
-    def modal(self, context, event):
-        """Handle modal events during generation.
-
-        Args:
-            context: Blender context.
-            event: The event to process (e.g., 'TIMER', 'ESC').
-
-        Returns:
-            set: Status indicating how to proceed ('PASS_THROUGH', 'CANCELLED', 'FINISHED').
-        """
-        if event.type == "ESC":
-            self.logger.info("User requested abort via ESC key")
+        formatted_messages, self.context_report = build_context(
+            system_prompt, turns, prompt, budget
+        )
+        report = self.context_report
+        report["compressed_scripts"] = compression["scripts"]
+        report["compressed_bytes_saved"] = compression["bytes_saved"]
+        self.logger.info(f"Request context: {report}")
+        self.console.print(
+            f"[cyan]Context:[/cyan] {report['total_tokens']}/{report['budget']} tokens "
+            f"(system {report['system_tokens']}, history {report['history_tokens']} "
+            f"in {report['turns']} turns, prompt {report['prompt_tokens']})"
+        )
+        if compression["scripts"]:
             self.console.print(
-                "[bold red]ESC pressed - Aborting operation...[/bold red]"
+                f"[cyan]Outlined {compression['scripts']} earlier scripts, "
+                f"saved {compression['bytes_saved']} bytes[/cyan]"
+            )
+        if self.replay is not None:
+            formatted_messages = self.replay.messages
+            self.console.print(
+                f"[cyan]Replaying {len(self.replay.chunks)} recorded chunks "
+                f"from {self.replay.model}[/cyan]"
             )
-            self.report({"INFO"}, "Aborting...")
-            self.is_cancelled = True
-            return {"PASS_THROUGH"}
 
-        if event.type == "TIMER":
-            with self._progress_lock:
-                context.scene.g4f_progress = self._progress
-            context.area.tag_redraw()  # Redraw UI to reflect progress
-            if self.is_cancelled and self.cancel_done:
-                self.cleanup(context)
-                return {"CANCELLED"}
-            if self.is_done and not self.is_cancelled:
-                self.logger.debug("Operation completed, executing callback")
-                self.console.print(
-                    "[green]Generation complete, executing callback...[/green]"
-                )
-                self.callback(context, self.code_buffers, self.is_image_model)
-                self.cleanup(context)
-                return {"FINISHED"}
-        return {"PASS_THROUGH"}
+        self._future = runtime.submit(
+            self.generate_g4f_code(formatted_messages, ai_model)
+        )
+        return True
 
     # --- Generation Logic ---
-    def generate_g4f_code(self, prompt, chat_history, model, system_prompt):
-        """Generate AI response in a separate thread.
+    async def generate_g4f_code(self, formatted_messages, model):
+        """Generate AI response on the add-on runtime loop.
 
         Args:
-            prompt (str): User input text.
-            chat_history: Collection of previous chat messages.
+            formatted_messages (list): Chat messages to send, system prompt first.
             model (str): AI model name.
-            system_prompt (str): System prompt for the AI.
         """
+        self.request_metrics["queue_wait"] = time.monotonic() - self.request_metrics.started
         self.logger.info("Starting generation")
         self.console.print("[blue]Generating response...[/blue]")
 
-        # Format chat messages
-        formatted_messages = [{"role": "system", "content": system_prompt}]
-        for message in chat_history[-10:]:
-            role = "assistant" if message.type == "assistant" else message.type.lower()
-            content = (
-                f"```\n{message.content}\n```"
-                if message.type == "assistant"
-                else message.content
-            )
-            formatted_messages.append({"role": role, "content": content})
-        if self.is_image_model:
-            formatted_messages.append({"role": "user", "content": prompt})
-        else:
-            formatted_messages.append({"role": "user", "content": wrap_prompt(prompt)})
-
-        stream = g4f.models.ModelUtils.convert[model].best_provider.supports_stream
+        parser = FenceParser()
+        cache_key = None
+        completion_text = None
+        if self.use_cache:
+            # Race order follows the win statistics, the key must not
+            cache_model = "+".join(sorted(self.race_models)) if self.race_models else model
+            cache_key = response_cache.make_key(cache_model, formatted_messages)
+            completion_text = response_cache.get(cache_key)
 
         try:
-            client = g4f.client.Client()
             with self._progress_lock:
                 self._progress = 0.1  # Initializing
 
-            if stream:
-                completion_text = ""
-                self.logger.debug("Using streaming response")
-                self.console.print("[magenta]Streaming response...[/magenta]")
-                with Live(
-                    console=self.console, refresh_per_second=30, transient=False
-                ) as live:
-                    chunk_count = 0
-                    for chunk in stream_response(formatted_messages, model):
-                        if self.is_cancelled:
-                            self.logger.warning("Stream cancelled by user")
-                            self.console.print(
-                                "[yellow]Generation cancelled by user[/yellow]"
-                            )
-                            self.cancel_done = True
-                            return
-
-                        # Parse chunk if it's in SSE format (data: {"content": "..."})
-                        if isinstance(chunk, str):
-                            if "data: " in chunk:
-                                cleaned_chunk = chunk.replace("data: ", "").strip()
-                                self.logger.debug(
-                                    f"Raw chunk: {repr(chunk)} -> Cleaned: {repr(cleaned_chunk)}"
-                                )
-                                try:
-                                    chunk_data = json.loads(cleaned_chunk)
-                                    content = chunk_data.get("content", "")
-                                    if (
-                                        content is None
-                                    ):  # Handle cases where content might be null
-                                        content = ""
-                                    self.logger.debug(
-                                        f"Parsed chunk content: {repr(content)}"
-                                    )
-                                except json.JSONDecodeError as e:
-                                    self.logger.warning(
-                                        f"Invalid chunk format: {repr(chunk)} - Error: {str(e)}"
-                                    )
-                                    content = chunk  # Fallback to raw chunk
-                            else:
-                                content = chunk  # Plain text chunk
-
-                        completion_text += content or ""
-                        chunk_count += 1
-                        with self._progress_lock:
-                            # Dynamic progress: assume up to 0.7 during streaming
-                            self._progress = min(
-                                0.7, 0.1 + (0.6 * (chunk_count / 100.0))
-                            )
-                        markdown_output = Markdown(completion_text.strip())
-                        live.update(markdown_output, refresh=True)
-                    with self._progress_lock:
-                        self._progress = 0.8  # Stream complete
-                # print(completion_text)
-            else:
-                self.logger.debug("Using non-streaming response")
+            if completion_text is not None:
+                self.logger.info(f"Response cache hit for model {model}")
+                self.console.print("[green]Using cached response[/green]")
+                self.console.print(rich.markdown.Markdown(completion_text.strip()))
+                self.collect_code_blocks(self.parse(parser, completion_text))
+                cache_key = None  # Already stored
+            elif self.race_models:
+                self.logger.info(f"Racing models: {self.race_models}")
                 self.console.print(
-                    "[magenta]Generating non-streaming response...[/magenta]"
+                    f"[magenta]Racing {len(self.race_models)} models...[/magenta]"
                 )
                 with self._progress_lock:
-                    self._progress = 0.3  # Sending request
-                response = client.chat.completions.create(
-                    model=model, messages=formatted_messages
+                    self._progress = 0.3  # Requests sent
+                race = ModelRace(
+                    self.race_models,
+                    formatted_messages,
+                    self.logger,
+                    lambda: self.is_cancelled,
+                    timeout=self.request_timeout,
+                    connect_timeout=self.connect_timeout,
+                    first_byte_timeout=self.first_byte_timeout,
                 )
+                winner, completion_text = await race.run()
+                if self.is_cancelled:
+                    self.logger.warning("Race cancelled by user")
+                    self.console.print("[yellow]Generation cancelled by user[/yellow]")
+                    self.cancel_done = True
+                    return
+                if winner is None:
+                    raise RuntimeError("No model in the race returned usable code")
+                self.request_metrics["answered_by"] = winner
+                self.logger.info(
+                    f"Race won by {winner} in {race.latencies[winner]:.2f}s"
+                )
+                self.console.print(
+                    f"[green]Race won by[/green] [italic]{winner}[/italic] "
+                    f"({race.latencies[winner]:.1f}s)"
+                )
+                self.console.print(rich.markdown.Markdown(completion_text.strip()))
+                self.collect_code_blocks(self.parse(parser, completion_text))
                 with self._progress_lock:
                     self._progress = 0.7  # Response received
-                completion_text = str(response.choices[0].message.content)
-                with self._progress_lock:
-                    self._progress = 0.8  # Processing response
-                self.console.print(Markdown(completion_text.strip()))
-                if self.is_cancelled:
-                    self.logger.warning("Non-streaming operation cancelled")
+            else:
+                executor = RequestExecutor(
+                    [model] + self.failover_models,
+                    self.logger,
+                    lambda: self.is_cancelled,
+                    retries=self.request_retries,
+                    timeout=self.request_timeout,
+                    can_retry=lambda: self.queued_count == 0,
+                )
+                used_model, result = await executor.run(
+                    lambda name: self.request_model(formatted_messages, name)
+                )
+                if self.is_cancelled or result is None:
+                    self.logger.warning("Generation cancelled by user")
                     self.console.print("[yellow]Generation cancelled by user[/yellow]")
                     self.cancel_done = True
                     return
+                completion_text, parser = result
+                self.request_metrics["answered_by"] = used_model
+                if used_model != model:
+                    self.logger.info(f"Answered by fallback model {used_model}")
+                    self.console.print(
+                        f"[yellow]{model} failed, answered by[/yellow] [italic]{used_model}[/italic]"
+                    )
+                    if cache_key is not None:
+                        cache_key = response_cache.make_key(used_model, formatted_messages)
+
+            if cache_key is not None:
+                response_cache.put(cache_key, completion_text)
 
             # Process response into code buffers
             if self.is_image_model:
                 self.code_buffers = [
-                    f"# Image Description:\n# {completion_text.strip()}"
+                    CodeBlock(f"# Image Description:\n# {completion_text.strip()}")
                 ]
             else:
-                code_blocks = re.findall(
-                    r"```(?:python)?\s*\n(.*?)\n```", completion_text, re.DOTALL
-                )
-                if not code_blocks:
-                    code_blocks = re.findall(r"```(.*?)```", completion_text, re.DOTALL)
-                self.code_buffers = (
-                    [
-                        re.sub(r"^python", "", code.strip(), flags=re.MULTILINE)
-                        for code in code_blocks
-                    ]
-                    if code_blocks
-                    else [completion_text]
-                )
+                self.collect_code_blocks(self.parse(parser, close=True))
+                if not self.code_buffers:
+                    # No python fences, fall back to loose extraction
+                    start = time.perf_counter()
+                    codes = extract_code_blocks(completion_text) or [completion_text]
+                    self.request_metrics.add_time("extract_time", time.perf_counter() - start)
+                    self.collect_code_blocks(CodeBlock(code) for code in codes)
 
             with self._progress_lock:
                 self._progress = 0.9  # Finalizing
@@ -286,6 +324,11 @@ class G4F_OT_Callback(bpy.types.Operator):
             self.console.print("[magenta]Generation completed[/magenta]")
             self.is_done = True
 
+        except asyncio.CancelledError:
+            self.logger.warning("Generation cancelled, request aborted")
+            self.console.print("[yellow]Generation cancelled by user[/yellow]")
+            self.cancel_done = True
+            raise
         except Exception as e:
             self.logger.error(
                 f"Error in generation: {str(e)}\n{traceback.format_exc()}"
@@ -295,7 +338,199 @@ class G4F_OT_Callback(bpy.types.Operator):
             self.is_cancelled = True
             self.cancel_done = True
 
+    async def request_model(self, formatted_messages, model):
+        """Send the messages to one model, streaming if its provider supports it.
+
+        Called once per attempt, so parser and collected blocks start fresh.
+
+        Args:
+            formatted_messages (list): Chat messages to send.
+            model (str): AI model name.
+
+        Returns:
+            tuple: ``(completion_text, parser)``, or None if cancelled.
+        """
+        self.code_buffers = []
+        parser = FenceParser()
+        if self.replay is not None:
+            stream = self.replay.streamed
+        else:
+            stream = model_registry.supports_stream(model)
+        recorder = None
+        if self.record_transcripts and self.replay is None:
+            recorder = TranscriptRecorder(model, formatted_messages, stream)
+        estimator = ProgressEstimator(stream_stats.expected(model), stream)
+        with self._progress_lock:
+            self._progress = 0.1
+            self._estimator = estimator  # Drives progress and ETA from the modal timer
+        error = None
+        try:
+            if stream:
+                self.logger.debug(f"Using streaming response from {model}")
+                self.console.print("[magenta]Streaming response...[/magenta]")
+                with rich.live.Live(
+                    console=self.console, auto_refresh=False, transient=False
+                ) as live:
+                    renderer = StreamingMarkdown(live, refresh_per_second=30)
+                    log_chunks = log_chunks_enabled()
+                    if self.replay is not None:
+                        chunks = self.replay.replay(self.replay_speed)
+                    else:
+                        chunks = stream_response(
+                            formatted_messages,
+                            model,
+                            connect_timeout=self.connect_timeout,
+                            first_byte_timeout=self.first_byte_timeout,
+                        )
+                    async for chunk in chunks:
+                        if recorder is not None:
+                            recorder.chunk(chunk)
+                        if self.is_cancelled:
+                            self.logger.warning("Stream cancelled by user")
+                            return None
+
+                        content = parse_stream_chunk(chunk)
+                        if log_chunks:
+                            self.logger.debug(
+                                f"Raw chunk: {repr(chunk)} -> Parsed: {repr(content)}"
+                            )
+
+                        renderer.feed(content or "")
+                        estimator.feed(content)
+                        self.collect_code_blocks(self.parse(parser, content))
+                    renderer.finish()
+                    completion_text = renderer.text
+            else:
+                self.logger.debug(f"Using non-streaming response from {model}")
+                self.console.print(
+                    "[magenta]Generating non-streaming response...[/magenta]"
+                )
+                if self.replay is not None:
+                    parts = [chunk async for chunk in self.replay.replay(self.replay_speed)]
+                    completion_text = "".join(part for part in parts if part)
+                else:
+                    completion_text = await complete_response(formatted_messages, model)
+                if recorder is not None:
+                    recorder.chunk(completion_text)
+                estimator.feed(completion_text)
+                if self.is_cancelled:
+                    self.logger.warning("Non-streaming operation cancelled")
+                    return None
+        except BaseException as e:
+            error = "cancelled" if isinstance(e, asyncio.CancelledError) else e
+            raise
+        finally:
+            with self._progress_lock:
+                self._estimator = None
+            if recorder is not None:
+                try:
+                    path = recorder.save(error)
+                    self.logger.info(f"Stream transcript saved to {path}")
+                except OSError as e:
+                    self.logger.warning(f"Could not save stream transcript: {e}")
+
+        duration = estimator.clock() - estimator.started
+        ttfb = (estimator.first_text_at or estimator.clock()) - estimator.started
+        tokens = estimate_tokens(completion_text)
+        self.request_metrics["ttfb"] = ttfb
+        self.request_metrics["stream_duration"] = duration - ttfb
+        self.request_metrics["tokens"] = tokens
+        self.request_metrics["tokens_per_sec"] = tokens / max(duration - ttfb, 1e-3)
+        stream_stats.record(
+            model,
+            ttfb,
+            duration,
+            estimator.chunks,
+            len(completion_text),
+            tokens,
+            stream,
+        )
+        self.logger.debug(
+            f"{model}: TTFB {ttfb:.2f}s, {estimator.chunks} chunks, "
+            f"{len(completion_text)} chars in {duration:.2f}s"
+        )
+        with self._progress_lock:
+            self._progress = 0.8  # Response complete
+        if not stream:
+            self.console.print(rich.markdown.Markdown(completion_text.strip()))
+            self.collect_code_blocks(self.parse(parser, completion_text))
+        return completion_text, parser
+
     # --- Helper Methods ---
+    @staticmethod
+    def history_turns(chat_history, compress=False, stats=None, pending=()):
+        """Yield ``(role, content)`` for each history message, newest first.
+
+        Bodies are only loaded for the turns the context builder asks for.
+
+        Args:
+            chat_history: ``Scene.g4f_chat_history`` collection.
+            compress (bool): Send every assistant script but the latest as an outline.
+            stats (dict): Receives ``scripts`` and ``bytes_saved`` counts when compressing.
+            pending (list): Chronological turns newer than the history.
+        """
+
+        def newest_first():
+            yield from reversed(pending)
+            for index in range(len(chat_history) - 1, -1, -1):
+                message = chat_history[index]
+                role = "assistant" if message.type == "assistant" else message.type.lower()
+                yield role, get_content(message)
+
+        latest_script = True
+        for role, content in newest_first():
+            if role == "assistant" and compress:
+                if latest_script:
+                    latest_script = False
+                else:
+                    outline = outline_script(content)
+                    if len(outline) < len(content):
+                        if stats is not None:
+                            stats["scripts"] += 1
+                            stats["bytes_saved"] += len(content.encode()) - len(outline.encode())
+                        content = outline
+            yield role, content
+
+    def parse(self, parser, text=None, close=False):
+        """Feed ``text`` to the fence parser, or close it, timing the extraction.
+
+        Returns:
+            list: ``CodeBlock`` objects completed by this call.
+        """
+        start = time.perf_counter()
+        blocks = parser.close() if close else parser.feed(text)
+        self.request_metrics.add_time("extract_time", time.perf_counter() - start)
+        return blocks
+
+    def collect_code_blocks(self, blocks):
+        """Compile finished python blocks on the generation thread as they arrive.
+
+        Args:
+            blocks: ``CodeBlock`` objects completed by the fence parser.
+        """
+        if self.is_image_model:
+            return
+        for block in blocks:
+            if not block.is_python or not block.source.strip():
+                continue
+            index = len(self.code_buffers) + 1
+            start = time.perf_counter()
+            block.compile(f"<AI_code_block_{index}>", self.compile_source)
+            elapsed = time.perf_counter() - start
+            self.request_metrics.block(index - 1)["compile"] = elapsed
+            self.request_metrics.add_time("compile_time", elapsed)
+            self.code_buffers.append(block)
+            if block.error is not None:
+                self.logger.warning(f"Syntax error in streamed block {index}: {block.error}")
+            else:
+                self.logger.debug(f"Compiled streamed block {index}")
+            if self.pipelined:
+                self.queued_count += 1
+                self._ready_blocks.put((index - 1, block))
+
+    def compile_source(self, source, filename):
+        return bytecode_cache.compile(source, filename, self.use_bytecode_disk)
+
     def get_system_prompt(self, model_name):
         """Determine the appropriate system prompt based on the model type.
 
@@ -305,24 +540,12 @@ class G4F_OT_Callback(bpy.types.Operator):
         Returns:
             str: System prompt (image or code-specific).
         """
-        try:
-            if os.path.exists(JSON_PATH):
-                with open(JSON_PATH, "r") as f:
-                    config = json.load(f)
-                    image_models = config.get("image_models", [])
-                    if model_name in image_models:
-                        self.is_image_model = True
-                        self.logger.info(f"Detected image model: {model_name}")
-                        self.console.print(
-                            f"[purple]Image model detected: {model_name}[/purple]"
-                        )
-                        return IMAGE_SYSTEM_PROMPT
-            else:
-                self.logger.warning("Model config file not found")
-                self.console.print("[yellow]Model config file not found[/yellow]")
-        except Exception as e:
-            self.logger.error(f"Error reading JSON config: {str(e)}")
-            self.console.print(f"[red]Error reading model config: {str(e)}[/red]")
+        info = model_registry.get(model_name)
+        if info is not None and info.image:
+            self.is_image_model = True
+            self.logger.info(f"Detected image model: {model_name}")
+            self.console.print(f"[purple]Image model detected: {model_name}[/purple]")
+            return IMAGE_SYSTEM_PROMPT
         return code_system_prompt
 
     def callback(self, context, code_buffers, is_image_model):
@@ -330,7 +553,7 @@ class G4F_OT_Callback(bpy.types.Operator):
 
         Args:
             context: Blender context.
-            code_buffers (list): List of generated code or text blocks.
+            code_buffers (list): ``CodeBlock`` objects with generated code or text.
             is_image_model (bool): Whether the model is an image model.
         """
         if self.is_cancelled:
@@ -342,10 +565,9 @@ class G4F_OT_Callback(bpy.types.Operator):
         # Update chat history with user input
         self.logger.debug("Adding user message to chat history")
         self.console.print("[blue]Updating chat history...[/blue]")
-        message = context.scene.g4f_chat_history.add()
-        message.type = "user"
-        message.content = context.scene.g4f_chat_input
-        context.scene.g4f_chat_input = ""
+        add_message(context.scene.g4f_chat_history, "user", self.prompt)
+        if self.from_input:
+            context.scene.g4f_chat_input = ""
 
         if not code_buffers:
             self.logger.warning("No code buffers to process")
@@ -353,82 +575,25 @@ class G4F_OT_Callback(bpy.types.Operator):
             return
 
         if is_image_model:
-            response_content = code_buffers[0]
+            response_content = code_buffers[0].source
             self.logger.info("Image description stored")
             self.console.print("[purple]Image description stored[/purple]")
         else:
-            safe_builtins = globals().copy()
-            local_namespace = {}
-
-            executed_codes = []
-            for i, blender_code in enumerate(code_buffers):
-                if not blender_code.strip():
-                    self.logger.debug(f"Skipping empty code block {i + 1}")
-                    continue
-
-                self.logger.info(f"Processing code block {i + 1}/{len(code_buffers)}")
-                self.console.print(
-                    f"[green]Processing code block {i + 1}/{len(code_buffers)}...[/green]"
-                )
-
-                # Optionally preview code before execution (configurable via scene property)
-                if (
-                    hasattr(context.scene, "g4f_preview_code")
-                    and context.scene.g4f_preview_code
-                ):
-                    self.console.print(
-                        f"[cyan]Preview:[/cyan]\n```python\n{blender_code}\n```"
-                    )
-                    self.report(
-                        {"INFO"}, f"Previewing code block {i + 1} - check console"
-                    )
-                    continue  # Skip execution in preview mode
-
-                try:
-                    # Compile first to catch syntax errors early
-                    compiled_code = compile(
-                        blender_code, f"<AI_code_block_{i + 1}>", "exec"
-                    )
-
-                    # Set up context override
-                    override = bpy.context.copy()
-                    override["selected_objects"] = list(bpy.context.scene.objects)
-                    with context.temp_override(**override):
-                        exec(compiled_code, safe_builtins, local_namespace)
-
-                    self.logger.info(f"Code block {i + 1} executed successfully")
-                    self.console.print(
-                        f"[bold green]Code block {i + 1} executed successfully[/bold green]"
-                    )
-                    executed_codes.append(blender_code)
-
-                except SyntaxError as se:
-                    error_msg = f"Syntax error in block {i + 1}: {str(se)}\nLine {se.lineno}: {se.text}"
-                    self.logger.error(error_msg + f"\n{traceback.format_exc()}")
-                    self.console.print(f"[red]{error_msg}[/red]")
-                    failed_code = append_error_as_comment(blender_code, error_msg)
-                    executed_codes.append(failed_code)
-                    self.report({"ERROR"}, f"Syntax error in block {i + 1}: {se}")
-
-                except Exception as e:
-                    error_msg = f"Error executing block {i + 1}: {str(e)}"
-                    self.logger.error(error_msg + f"\n{traceback.format_exc()}")
-                    self.console.print(f"[red]{error_msg}[/red]")
-                    full_traceback = traceback.format_exc()
-                    failed_code = append_error_as_comment(blender_code, full_traceback)
-                    executed_codes.append(failed_code)
-                    self.report({"ERROR"}, error_msg)
+            # Blocks already run by the pipeline are skipped
+            self.run_ready_blocks(context)
+            for i in range(self.executed_count, len(code_buffers)):
+                self.execute_block(context, i, code_buffers[i], len(code_buffers))
 
             response_content = (
-                "\n\n".join(executed_codes) if executed_codes else code_buffers[0]
+                "\n\n".join(self.executed_codes)
+                if self.executed_codes
+                else code_buffers[0].source
             )
 
         # Add response to chat history
         self.logger.debug("Adding assistant response to chat history")
         self.console.print("[blue]Adding response to chat history[/blue]")
-        message = context.scene.g4f_chat_history.add()
-        message.type = "assistant"
-        message.content = response_content
+        add_message(context.scene.g4f_chat_history, "assistant", response_content)
 
         context.scene.g4f_button_pressed = False
         context.scene.g4f_progress = 1.0  # Mark completion
@@ -436,6 +601,145 @@ class G4F_OT_Callback(bpy.types.Operator):
         self.logger.info("Callback operation completed")
         self.console.print("[bold cyan]Operation completed[/bold cyan]")
 
+    def answer_turns(self):
+        """Return the turns this generation will add to the chat history.
+
+        The answer is taken as generated, before it runs, so prompts queued
+        after it can be sent before it is applied. Errors appended while
+        running are only in the history.
+
+        Returns:
+            list: Chronological ``(role, content)`` pairs.
+        """
+        turns = [("user", self.prompt)]
+        if self.code_buffers:
+            turns.append(("assistant", "\n\n".join(block.source for block in self.code_buffers)))
+        return turns
+
+    def update_progress(self, context):
+        """Publish the progress and ETA of the request to the scene."""
+        with self._progress_lock:
+            if self._estimator is not None:
+                fraction, eta = self._estimator.estimate()
+                self._progress = 0.1 + 0.6 * fraction
+                context.scene.g4f_eta = eta
+            else:
+                context.scene.g4f_eta = -1.0
+            context.scene.g4f_progress = self._progress
+
+    def run_ready_blocks(self, context):
+        """Execute the blocks the pipeline has handed over so far, in order.
+
+        Args:
+            context: Blender context.
+        """
+        while True:
+            try:
+                index, block = self._ready_blocks.get_nowait()
+            except queue.Empty:
+                return
+            self.execute_block(context, index, block)
+
+    def execute_block(self, context, i, block, total=None):
+        """Execute one compiled code block and record it for the chat history.
+
+        Errors are appended to the block's code as comments.
+
+        Args:
+            context: Blender context.
+            i (int): Zero-based block index.
+            block (CodeBlock): Block to run.
+            total (int): Number of blocks, None if still streaming.
+        """
+        self.executed_count = i + 1
+        blender_code = block.source
+        if not blender_code.strip():
+            self.logger.debug(f"Skipping empty code block {i + 1}")
+            return
+
+        position = f"{i + 1}/{total}" if total else f"{i + 1}"
+        self.logger.info(f"Processing code block {position}")
+        self.console.print(f"[green]Processing code block {position}...[/green]")
+
+        # Optionally preview code before execution (configurable via scene property)
+        if (
+            hasattr(context.scene, "g4f_preview_code")
+            and context.scene.g4f_preview_code
+        ):
+            self.console.print(
+                f"[cyan]Preview:[/cyan]\n```python\n{blender_code}\n```"
+            )
+            self.report({"INFO"}, f"Previewing code block {i + 1} - check console")
+            return  # Skip execution in preview mode
+
+        try:
+            # Blocks are compiled while streaming, only exec here
+            if block.error is not None:
+                raise block.error
+            compiled_code = block.code
+
+            # Context override is built once per response
+            if self._exec_override is None:
+                self._exec_override = scene_override(context)
+            block_metrics = self.request_metrics.block(i)
+            start = time.perf_counter()
+            try:
+                with context.temp_override(**self._exec_override):
+                    exec(compiled_code, self._exec_globals, self._exec_locals)
+            finally:
+                elapsed = time.perf_counter() - start
+                block_metrics["exec"] = elapsed
+                self.request_metrics.add_time("exec_time", elapsed)
+            block_metrics["ok"] = True
+
+            self.logger.info(f"Code block {i + 1} executed successfully")
+            self.console.print(
+                f"[bold green]Code block {i + 1} executed successfully[/bold green]"
+            )
+            self.executed_codes.append(blender_code)
+
+        except SyntaxError as se:
+            self.request_metrics.block(i)["ok"] = False
+            error_msg = f"Syntax error in block {i + 1}: {str(se)}\nLine {se.lineno}: {se.text}"
+            self.logger.error(error_msg + f"\n{traceback.format_exc()}")
+            self.console.print(f"[red]{error_msg}[/red]")
+            failed_code = append_error_as_comment(blender_code, error_msg)
+            self.executed_codes.append(failed_code)
+            self.report({"ERROR"}, f"Syntax error in block {i + 1}: {se}")
+
+        except Exception as e:
+            self.request_metrics.block(i)["ok"] = False
+            error_msg = f"Error executing block {i + 1}: {str(e)}"
+            self.logger.error(error_msg + f"\n{traceback.format_exc()}")
+            self.console.print(f"[red]{error_msg}[/red]")
+            full_traceback = traceback.format_exc()
+            failed_code = append_error_as_comment(blender_code, full_traceback)
+            self.executed_codes.append(failed_code)
+            self.report({"ERROR"}, error_msg)
+
+    def write_metrics(self):
+        """Finish the metrics record of this generation and write it out.
+
+        The record is kept as ``last_metrics`` either way.
+        """
+        if self.request_metrics is None:
+            return
+        if self.error is not None:
+            status = "error"
+        elif self.is_cancelled:
+            status = "cancelled"
+        else:
+            status = "ok"
+        record = self.request_metrics.finish(status, self.error)
+        self.request_metrics = None
+        self.last_metrics = record
+        if not self.collect_metrics:
+            return
+        try:
+            metrics.write(record, self.prometheus_dir)
+        except OSError as e:
+            self.logger.warning(f"Could not write metrics: {e}")
+
     def cleanup(self, context):
         """Clean up resources after generation completes or is cancelled.
 
@@ -446,13 +750,19 @@ class G4F_OT_Callback(bpy.types.Operator):
             if self._timer is not None:
                 context.window_manager.event_timer_remove(self._timer)
                 self._timer = None
-            if self._thread is not None and self._thread.is_alive():
-                self._thread.join(timeout=1.0)
+            self.write_metrics()
+            if self._future is not None:
+                # Never wait on the main thread, a still running request is cancelled
+                self._future.cancel()
+                self._future = None
             context.scene.g4f_button_pressed = False
             context.scene.g4f_progress = 0.0
+            context.scene.g4f_eta = -1.0
             with self._progress_lock:
                 self._progress = 0.0
             self.code_buffers = []
+            self.executed_codes = []
+            self.executed_count = 0
             self.is_done = False
             self.is_cancelled = False
             self.cancel_done = False
@@ -466,6 +776,237 @@ class G4F_OT_Callback(bpy.types.Operator):
             self.report({"ERROR"}, f"Cleanup failed: {str(e)}")
 
 
+class G4F_OT_Callback(GenerationMixin, bpy.types.Operator):
+    """Operator to handle AI generation tasks with progress monitoring in Blender."""
+
+    bl_idname = "g4f.callback"
+    bl_label = "Callback for Thread"
+    bl_description = "Callback Model Operator"
+
+    replay_path: bpy.props.StringProperty(
+        name="Replay Transcript",
+        description="Feed a recorded stream transcript back instead of calling the provider",
+        subtype="FILE_PATH",
+        options={"HIDDEN", "SKIP_SAVE"},
+    )
+    replay_speed: bpy.props.FloatProperty(
+        name="Replay Speed",
+        description="1 replays with the recorded timing, 0 as fast as possible",
+        default=0.0,
+        min=0.0,
+        options={"HIDDEN", "SKIP_SAVE"},
+    )
+
+    # --- Class Methods ---
+    @classmethod
+    def poll(cls, context):
+        """Check if the operator can be executed.
+
+        Args:
+            context: Blender context.
+
+        Returns:
+            bool: True if the operator can run, False otherwise.
+        """
+        return (
+            not context.scene.g4f_button_pressed
+            and not Module_Updater.is_working
+            and context.scene.g4f_chat_input
+        )
+
+    # --- Main Execution Methods ---
+    def execute(self, context):
+        """Start the AI generation process on the add-on runtime.
+
+        Args:
+            context: Blender context.
+
+        Returns:
+            set: {'RUNNING_MODAL'} to indicate modal operation.
+        """
+        if not self.start(context):
+            return {"CANCELLED"}
+
+        # Set up modal timer
+        self._timer = context.window_manager.event_timer_add(
+            0.01, window=context.window
+        )
+        self.report({"INFO"}, "Generating... (ESC=Abort)")
+        context.window_manager.modal_handler_add(self)
+        return {"RUNNING_MODAL"}
+
+    def modal(self, context, event):
+        """Handle modal events during generation.
+
+        Args:
+            context: Blender context.
+            event: The event to process (e.g., 'TIMER', 'ESC').
+
+        Returns:
+            set: Status indicating how to proceed ('PASS_THROUGH', 'CANCELLED', 'FINISHED').
+        """
+        if event.type == "ESC":
+            self.logger.info("User requested abort via ESC key")
+            self.console.print(
+                "[bold red]ESC pressed - Aborting operation...[/bold red]"
+            )
+            self.report({"INFO"}, "Aborting...")
+            self.is_cancelled = True
+            if self._future is not None:
+                # Cancels the task on the runtime loop, closing the open request
+                self._future.cancel()
+            return {"PASS_THROUGH"}
+
+        if event.type == "TIMER":
+            self.update_progress(context)
+            context.area.tag_redraw()  # Redraw UI to reflect progress
+            generation_over = self._future is None or self._future.done()
+            if self.is_cancelled and (self.cancel_done or generation_over):
+                if self.executed_count:
+                    self.logger.warning(
+                        f"{self.executed_count} pipelined block(s) ran before cancellation"
+                    )
+                self.cleanup(context)
+                return {"CANCELLED"}
+            if self.pipelined and not self.is_cancelled:
+                self.run_ready_blocks(context)
+            if self.is_done and not self.is_cancelled:
+                self.logger.debug("Operation completed, executing callback")
+                self.console.print(
+                    "[green]Generation complete, executing callback...[/green]"
+                )
+                self.callback(context, self.code_buffers, self.is_image_model)
+                self.cleanup(context)
+                return {"FINISHED"}
+        return {"PASS_THROUGH"}
+
+
+class QueuedGeneration(GenerationMixin):
+    """One prompt of the queue, reporting through the operator running the queue."""
+
+    replay_path = ""
+    replay_speed = 0.0
+
+    def __init__(self, operator):
+        super().__init__()
+        self.operator = operator
+        self.turns = None  # Set once the answer is generated
+
+    def report(self, type, message):
+        self.operator.report(type, message)
+
+
+class G4F_OT_RunQueue(bpy.types.Operator):
+    """Run the queued prompts in order, generating the next answer while the
+    previous one runs."""
+
+    bl_idname = "g4f.run_queue"
+    bl_label = "Run Queue"
+    bl_description = "Run the queued prompts in order. The next answer is generated while the previous one runs"
+
+    @classmethod
+    def poll(cls, context):
+        return (
+            not context.scene.g4f_button_pressed
+            and not Module_Updater.is_working
+            and len(context.scene.g4f_prompt_queue) > 0
+        )
+
+    def execute(self, context):
+        self.logger = setup_logger()
+        self.jobs = []  # Started generations, in queue order
+        self.pending = []  # Turns of generated answers not applied yet
+        self.applied = 0
+        for item in context.scene.g4f_prompt_queue:
+            item.type = "queued"
+        self.start_next(context)
+        self.logger.info(f"Running {len(context.scene.g4f_prompt_queue)} queued prompts")
+        self._timer = context.window_manager.event_timer_add(0.01, window=context.window)
+        self.report({"INFO"}, "Running queue... (ESC=Abort)")
+        context.window_manager.modal_handler_add(self)
+        return {"RUNNING_MODAL"}
+
+    def start_next(self, context):
+        """Start generating the first queued prompt that has not started yet.
+
+        Its request is built from the chat history plus the answers generated
+        before it that are still waiting to be applied.
+        """
+        queue = context.scene.g4f_prompt_queue
+        if len(self.jobs) >= len(queue):
+            return
+        item = queue[len(self.jobs)]
+        job = QueuedGeneration(self)
+        job.start(context, prompt=item.content, pending=list(self.pending))
+        item.type = "generating"
+        self.jobs.append(job)
+
+    def modal(self, context, event):
+        if event.type == "ESC":
+            self.logger.info("Queue aborted via ESC key")
+            self.report({"INFO"}, "Queue aborted")
+            for job in self.jobs:
+                job.is_cancelled = True
+                if job._future is not None:
+                    job._future.cancel()
+            return self.finish(context, {"CANCELLED"})
+
+        if event.type != "TIMER":
+            return {"PASS_THROUGH"}
+
+        queue = context.scene.g4f_prompt_queue
+        for index, job in enumerate(self.jobs):
+            if job.turns is None and job.is_done and not job.is_cancelled:
+                job.turns = job.answer_turns()
+                self.pending.extend(job.turns)
+                queue[index].type = "ready"
+        newest = self.jobs[-1] if self.jobs else None
+        if newest is None or (newest.turns is not None and len(self.jobs) <= QUEUE_PREFETCH):
+            self.start_next(context)
+
+        generating = next((job for job in self.jobs if job.turns is None), None)
+        if generating is not None:
+            generating.update_progress(context)
+        if context.area:
+            context.area.tag_redraw()
+
+        head = self.jobs[0] if self.jobs else None
+        if head is None:
+            return self.finish(context, {"FINISHED"})
+        if head.pipelined and not head.is_cancelled:
+            head.run_ready_blocks(context)
+        if head.turns is not None:
+            # Answers are applied strictly in queue order
+            head.callback(context, head.code_buffers, head.is_image_model)
+            head.cleanup(context)
+            del self.pending[: len(head.turns)]
+            self.jobs.pop(0)
+            queue.remove(0)
+            self.applied += 1
+            context.scene.g4f_button_pressed = True
+        elif head.is_cancelled and (head.cancel_done or head._future.done()):
+            error = head.error
+            self.logger.error(f"Queued prompt failed, stopping the queue: {error}")
+            self.report({"ERROR"}, f"Queued prompt failed: {error}")
+            return self.finish(context, {"CANCELLED"})
+        return {"PASS_THROUGH"}
+
+    def finish(self, context, status):
+        """Stop every running generation and leave unapplied prompts queued."""
+        if self._timer is not None:
+            context.window_manager.event_timer_remove(self._timer)
+            self._timer = None
+        for job in self.jobs:
+            job.is_cancelled = True
+            job.cleanup(context)
+        self.jobs = []
+        for item in context.scene.g4f_prompt_queue:
+            item.type = "queued"
+        context.scene.g4f_button_pressed = False
+        self.logger.info(f"Queue stopped after {self.applied} prompts")
+        return status
+
+
 class G4F_TEST_OT_TestModels(bpy.types.Operator):
     """Checks for working models and updates the list of active models.
     This operator is used to test all available models and update the list of active models.
@@ -474,12 +1015,18 @@ class G4F_TEST_OT_TestModels(bpy.types.Operator):
     bl_idname = "g4f.update_model_list"
     bl_label = "Test g4f Models"
     bl_options = {"REGISTER"}
-    bl_description = "Test all available models and update the list of active models.\n This may take a while."
+    bl_description = "Re-check models whose last test is stale or failed and update the list of active models.\nShift-click to re-test every model"
+
+    full: bpy.props.BoolProperty(
+        name="Re-test All",
+        description="Probe every model instead of only the stale ones",
+        default=False,
+        options={"SKIP_SAVE"},
+    )
 
     _timer = None
-    _loop = None
-    _task = None
-    working = []
+    _future = None
+    prober = None
     is_working = False
 
     @classmethod
@@ -488,40 +1035,34 @@ class G4F_TEST_OT_TestModels(bpy.types.Operator):
             Module_Updater.is_working
             or G4F_TEST_OT_TestModels.is_working
             or context.scene.g4f_button_pressed
+            or refresh_in_progress()
         )
 
+    def invoke(self, context, event):
+        self.full = event.shift
+        return self.execute(context)
+
     def modal(self, context: bpy.types.Context, event: bpy.types.Event) -> set:
-        """Handle timer events for asynchronous task completion."""
+        """Handle timer events, publishing working models as their probes pass."""
 
         if event.type == "TIMER":
-            self._loop.run_until_complete(asyncio.sleep(0))  # Process pending tasks
+            passed = self.prober.drain_passed()
+            if passed:
+                self.publish_models(passed)
+                model_registry.invalidate()
+                context.area.tag_redraw()
 
-            if self._task.done():
+            if self._future.done():
                 self.logger.debug("Task is done, cleaning up")
                 context.window_manager.event_timer_remove(self._timer)
-                self._loop.stop()
-                self._loop.close()
-
-                non_working_models = set(g4f.models._all_models) - set(self.working)
-                non_working_models = list(non_working_models)
-                self.logger.info(f"Non-working models: {non_working_models}")
-
-                path = JSON_PATH
 
-                if not os.path.exists(path):
-                    self.logger.debug(f"Creating new JSON file at {path}")
-                    with open(path, "w") as f:
-                        json.dump({"active": [], "deprecated": []}, f)
-
-                with open(path) as f:
-                    data = json.load(f)
-                data["active"] = self.working
-                data["deprecated"] = non_working_models
-                with open(path, "w") as f:
-                    json.dump(data, f)
-                    self.logger.info("Updated model information saved to JSON")
+                data = apply_probe_results(
+                    self.prober.results, list(g4f.models._all_models)
+                )
+                self.logger.info(f"Non-working models: {data['deprecated']}")
+                self.logger.info("Updated model information saved to JSON")
 
-                create_models()
+                model_registry.invalidate()
                 context.area.tag_redraw()
                 self.logger.debug("Redrawing context area")
                 G4F_TEST_OT_TestModels.is_working = False
@@ -530,38 +1071,34 @@ class G4F_TEST_OT_TestModels(bpy.types.Operator):
                 return {"FINISHED"}
         return {"PASS_THROUGH"}
 
-    async def run_provider(self, model):
-        self.logger.debug(f"Testing model: {model}")
-        try:
-            client = AsyncClient()
-            response = await client.chat.completions.create(
-                model=model,
-                messages=[{"role": "user", "content": "Hello"}],
-            )
-            self.logger.debug(f"{model}: {response.choices[0].message.content}")
-            self.working.append(model)
-        except Exception as e:
-            self.logger.debug(f"{model} failed: {e}")
-
-    async def run_all(self):
-        print("Starting async model tests")
-        calls = [self.run_provider(provider) for provider in g4f.models._all_models]
-        await asyncio.gather(*calls)
+    def publish_models(self, models):
+        """Mark freshly passed models as active so they show up in the model list."""
+        data = load_models_config()
+        for model in models:
+            if model not in data["active"]:
+                data["active"].append(model)
+            if model in data["deprecated"]:
+                data["deprecated"].remove(model)
+        save_models_config(data)
+        self.logger.info(f"Published working models: {models}")
 
     def execute(self, context):
         self.logger = setup_logger()
         self.logger.info("Starting model tests")
 
-        # Reset lists
-        self.working = []
+        models = list(g4f.models._all_models)
+        if not self.full:
+            models = models_due_for_check(models, load_models_config())
+            if not models:
+                self.logger.info("All model checks are up to date")
+                self.report({"INFO"}, "All models are up to date")
+                return {"FINISHED"}
         G4F_TEST_OT_TestModels.is_working = True
 
-        # Create and set up a new event loop
-        self._loop = asyncio.new_event_loop()
-        asyncio.set_event_loop(self._loop)
-        self.logger.info("Created new event loop")
-        self._task = self._loop.create_task(self.run_all())
-        self.logger.info("Created task to run all models")
+        # Run the probes on the add-on runtime loop
+        self.prober = ModelProber(models, self.logger)
+        self._future = runtime.submit(self.prober.run())
+        self.logger.info(f"Submitted probes for {len(models)} models")
 
         # Start the modal timer
         self._timer = context.window_manager.event_timer_add(0.1, window=context.window)
@@ -572,6 +1109,6 @@ class G4F_TEST_OT_TestModels(bpy.types.Operator):
     def cancel(self, context):
         if self._timer:
             context.window_manager.event_timer_remove(self._timer)
-        if self._loop and self._loop.is_running():
-            self._loop.stop()
-            self._loop.close()
+        if self._future:
+            self._future.cancel()
+        G4F_TEST_OT_TestModels.is_working = False
@@ -0,0 +1,192 @@
+import asyncio
+import json
+import os
+import time
+
+from .Settings import RACE_STATS_PATH, REQUEST_ATTEMPT_TIMEOUT
+from .code_fence import FenceParser
+from .utils import complete_response, parse_stream_chunk, stream_response
+from .model_registry import model_registry
+
+
+def has_usable_code(text):
+    """Check that a response contains at least one complete, compilable code block.
+
+    Args:
+        text (str): Full model response.
+
+    Returns:
+        bool: True if every extracted block compiles.
+    """
+    parser = FenceParser()
+    parser.feed(text)
+    parser.close()
+    code_blocks = [
+        block for block in parser.blocks
+        if block.is_python and block.closed and block.source.strip()
+    ]
+    if not code_blocks:
+        return False
+    return all(block.compile("<race_check>").error is None for block in code_blocks)
+
+
+def load_race_stats():
+    """Load per-model race statistics.
+
+    Returns:
+        dict: ``{"wins": {model: int}, "races": {model: int}}``.
+    """
+    if os.path.exists(RACE_STATS_PATH):
+        try:
+            with open(RACE_STATS_PATH, "r") as f:
+                stats = json.load(f)
+            stats.setdefault("wins", {})
+            stats.setdefault("races", {})
+            return stats
+        except (OSError, json.JSONDecodeError):
+            pass
+    return {"wins": {}, "races": {}}
+
+
+def record_race(models, winner):
+    """Add the outcome of a race to the persisted statistics."""
+    stats = load_race_stats()
+    for model in models:
+        stats["races"][model] = stats["races"].get(model, 0) + 1
+    if winner is not None:
+        stats["wins"][winner] = stats["wins"].get(winner, 0) + 1
+    with open(RACE_STATS_PATH, "w") as f:
+        json.dump(stats, f, indent=2)
+
+
+def pick_race_models(selected_model, configured, size):
+    """Choose the models taking part in a race.
+
+    The selected model always races. The rest come from ``configured`` if given,
+    otherwise from the active models with the most race wins.
+
+    Args:
+        selected_model (str): Model chosen in the panel.
+        configured (list): Models listed in the add-on preferences.
+        size (int): Number of models to race.
+
+    Returns:
+        list: Model names, selected model first.
+    """
+    candidates = list(configured)
+    if not candidates:
+        active = [info.name for info in model_registry.models() if info.active]
+        wins = load_race_stats()["wins"]
+        candidates = sorted(active, key=lambda m: wins.get(m, 0), reverse=True)
+
+    models = [selected_model]
+    for model in candidates:
+        if len(models) >= size:
+            break
+        if model not in models and model_registry.is_known(model):
+            models.append(model)
+    return models
+
+
+class ModelRace:
+    """Send the same messages to several models and keep the first usable answer.
+
+    Each model runs as a task on the add-on runtime. Once a winner is known the
+    remaining tasks are cancelled.
+    """
+
+    def __init__(
+        self,
+        models,
+        messages,
+        logger,
+        is_cancelled,
+        timeout=REQUEST_ATTEMPT_TIMEOUT,
+        connect_timeout=None,
+        first_byte_timeout=None,
+    ):
+        """Prepare a race.
+
+        Args:
+            models (list): Model names to race.
+            messages (list): Formatted chat messages sent to every model.
+            logger: Logger used for per-racer diagnostics.
+            is_cancelled (callable): Returns True once the user aborted.
+            timeout (float): Total deadline in seconds for each racer.
+            connect_timeout (float): Connect deadline of streaming racers, see
+                ``stream_response``.
+            first_byte_timeout (float): First text deadline of streaming racers.
+        """
+        self.models = models
+        self.messages = messages
+        self.logger = logger
+        self.is_cancelled = is_cancelled
+        self.timeout = timeout
+        self.connect_timeout = connect_timeout
+        self.first_byte_timeout = first_byte_timeout
+        self.winner = None
+        self.winner_text = None
+        self.latencies = {}
+
+    async def run(self):
+        """Run the race until a winner is found or every racer failed.
+
+        Returns:
+            tuple: ``(model, response_text)`` of the winner, or ``(None, None)``.
+        """
+        start = time.perf_counter()
+        tasks = {
+            asyncio.ensure_future(self._run_racer(model, start)): model
+            for model in self.models
+        }
+        pending = set(tasks)
+        try:
+            while pending and self.winner is None and not self.is_cancelled():
+                done, pending = await asyncio.wait(
+                    pending, timeout=0.1, return_when=asyncio.FIRST_COMPLETED
+                )
+                for task in done:
+                    text = task.result()
+                    if text is not None and has_usable_code(text):
+                        self.winner = tasks[task]
+                        self.winner_text = text
+                        break
+        finally:
+            for task in pending:
+                task.cancel()
+        try:
+            record_race(self.models, self.winner)
+        except OSError as e:
+            self.logger.warning(f"Could not save race statistics: {e}")
+        return self.winner, self.winner_text
+
+    async def _request(self, model):
+        if not model_registry.supports_stream(model):
+            return await complete_response(self.messages, model)
+        parts = []
+        chunks = stream_response(
+            self.messages,
+            model,
+            connect_timeout=self.connect_timeout,
+            first_byte_timeout=self.first_byte_timeout,
+        )
+        async for chunk in chunks:
+            parts.append(parse_stream_chunk(chunk))
+        return "".join(parts)
+
+    async def _run_racer(self, model, start):
+        try:
+            text = await asyncio.wait_for(self._request(model), self.timeout)
+        except asyncio.CancelledError:
+            self.logger.debug(f"Race: {model} cancelled, race already decided")
+            raise
+        except Exception as e:
+            if isinstance(e, asyncio.TimeoutError) and not str(e):
+                e = f"no answer within {self.timeout:.0f}s"  # The total deadline
+            self.logger.debug(f"Race: {model} failed: {e}")
+            return None
+
+        latency = time.perf_counter() - start
+        self.latencies[model] = latency
+        self.logger.debug(f"Race: {model} answered in {latency:.2f}s")
+        return text
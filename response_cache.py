@@ -0,0 +1,148 @@
+import hashlib
+import json
+import logging
+import os
+import threading
+from collections import OrderedDict
+
+from .Settings import CACHE_DIR, CACHE_MAX_DISK_BYTES, CACHE_MAX_MEMORY_ENTRIES
+from .logging_setup import LOGGER_NAME
+
+
+class ResponseCache:
+    """Content-addressed cache of model responses.
+
+    Responses are keyed by a hash of the model name and the formatted messages. A
+    small in-memory LRU sits in front of a disk store that is trimmed to a byte
+    budget by evicting the least recently used files. Safe to use from the
+    generation thread.
+    """
+
+    def __init__(self, directory, max_memory_entries, max_disk_bytes):
+        self.directory = directory
+        self.max_memory_entries = max_memory_entries
+        self.max_disk_bytes = max_disk_bytes
+        self._memory = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+
+    @staticmethod
+    def make_key(model, messages):
+        """Build the cache key for a request.
+
+        Args:
+            model (str): AI model name.
+            messages (list): Formatted chat messages sent to the model.
+
+        Returns:
+            str: Hex digest identifying the request.
+        """
+        payload = json.dumps([model, messages], sort_keys=True, ensure_ascii=False)
+        return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+    def get(self, key):
+        """Return the cached response for ``key`` or None."""
+        with self._lock:
+            if key in self._memory:
+                self._memory.move_to_end(key)
+                self.hits += 1
+                return self._memory[key]
+
+            path = self._path(key)
+            try:
+                with open(path, "r", encoding="utf-8") as f:
+                    text = f.read()
+                os.utime(path)  # Mark as recently used for eviction
+            except OSError:
+                self.misses += 1
+                return None
+
+            self._remember(key, text)
+            self.hits += 1
+            self.disk_hits += 1
+            return text
+
+    def put(self, key, text):
+        """Store a response in memory and on disk.
+
+        A failed disk write only leaves the response out of the disk store.
+        """
+        if not text:
+            return
+        with self._lock:
+            self._remember(key, text)
+            path = self._path(key)
+            tmp_path = f"{path}.{threading.get_ident()}.tmp"
+            try:
+                os.makedirs(self.directory, exist_ok=True)
+                with open(tmp_path, "w", encoding="utf-8") as f:
+                    f.write(text)
+                os.replace(tmp_path, path)
+                self._evict_disk()
+            except OSError as e:
+                logging.getLogger(LOGGER_NAME).warning(f"Could not write the response cache: {e}")
+                try:
+                    os.remove(tmp_path)
+                except OSError:
+                    pass
+
+    def clear(self):
+        """Drop every cached response and reset the counters."""
+        with self._lock:
+            self._memory.clear()
+            for name, _, _ in self._disk_entries():
+                os.remove(os.path.join(self.directory, name))
+            self.hits = self.disk_hits = self.misses = 0
+
+    def stats(self):
+        """Return hit/miss counters and the current cache size.
+
+        Returns:
+            dict: Counters, hit rate and memory/disk occupancy.
+        """
+        with self._lock:
+            entries = self._disk_entries()
+            lookups = self.hits + self.misses
+            return {
+                "hits": self.hits,
+                "disk_hits": self.disk_hits,
+                "misses": self.misses,
+                "hit_rate": self.hits / lookups if lookups else 0.0,
+                "memory_entries": len(self._memory),
+                "disk_entries": len(entries),
+                "disk_bytes": sum(size for _, size, _ in entries),
+            }
+
+    # --- Internals ---
+    def _path(self, key):
+        return os.path.join(self.directory, f"{key}.txt")
+
+    def _remember(self, key, text):
+        self._memory[key] = text
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.max_memory_entries:
+            self._memory.popitem(last=False)
+
+    def _disk_entries(self):
+        if not os.path.isdir(self.directory):
+            return []
+        entries = []
+        for entry in os.scandir(self.directory):
+            if entry.name.endswith(".txt"):
+                stat = entry.stat()
+                entries.append((entry.name, stat.st_size, stat.st_mtime))
+        return entries
+
+    def _evict_disk(self):
+        entries = self._disk_entries()
+        total = sum(size for _, size, _ in entries)
+        for name, size, _ in sorted(entries, key=lambda e: e[2]):
+            if total <= self.max_disk_bytes:
+                break
+            os.remove(os.path.join(self.directory, name))
+            total -= size
+
+
+response_cache = ResponseCache(CACHE_DIR, CACHE_MAX_MEMORY_ENTRIES, CACHE_MAX_DISK_BYTES)
@@ -0,0 +1,169 @@
+"""Run prompt jobs headlessly in background Blender processes.
+
+Jobs are JSON lines with a ``prompt`` and optionally ``blend``, ``model``,
+``id``, ``timeout`` and ``save``, see ``batch.load_jobs``. Results are saved
+as ``<id>.blend`` in the output directory and a report line per job is merged
+into ``report.jsonl`` there, in job order.
+
+Usage:
+    blender -b --python run_batch.py -- JOBS OUTPUT_DIR [--workers N]
+    python run_batch.py JOBS OUTPUT_DIR --blender /path/to/blender [--workers N]
+
+The process started by hand only coordinates: jobs are handed out in slices
+to a pool of ``blender -b`` workers. A worker that crashes is restarted after
+the job it was running, which is reported as crashed. With ``--workers 0``
+the jobs run in the Blender process itself.
+
+This file is not imported by the add-on. Workers enable the add-on it belongs
+to if it is installed but disabled.
+"""
+import argparse
+import concurrent.futures
+import importlib
+import json
+import os
+import subprocess
+import sys
+import time
+
+try:
+    import bpy
+except ModuleNotFoundError:
+    bpy = None
+
+JOBS_PER_WORKER = 8  # Jobs per worker start, amortizes Blender start-up
+
+
+def count_jobs(path):
+    """Count the job lines the way ``batch.load_jobs`` reads them."""
+    with open(path, "r", encoding="utf-8") as f:
+        return sum(1 for line in f if line.strip() and not line.strip().startswith("#"))
+
+
+def read_report(path):
+    results = {}
+    if os.path.exists(path):
+        with open(path, "r", encoding="utf-8") as f:
+            for line in f:
+                try:
+                    result = json.loads(line)
+                except json.JSONDecodeError:
+                    continue  # Cut off by a crash
+                results[result["index"]] = result
+    return results
+
+
+def run_slice(args, start, stop):
+    """Run jobs ``start`` to ``stop`` in background Blender workers.
+
+    Returns:
+        list: Reports of the slice, one per job.
+    """
+    report_path = os.path.join(args.output, "reports", f"slice-{start:05d}.jsonl")
+    log_path = os.path.join(args.output, "reports", f"slice-{start:05d}.log")
+    # Workers append so a restart keeps the reports written before a crash;
+    # anything left from an earlier run would hide a crash of this one
+    for path in (report_path, log_path):
+        if os.path.exists(path):
+            os.remove(path)
+    crashed = {}
+    first = start
+    while first < stop:
+        command = [
+            args.blender, "-b", "--python-exit-code", "1", "--python", os.path.abspath(__file__),
+            "--", args.jobs, args.output, "--worker", f"{first}:{stop}", "--report", report_path,
+        ]
+        with open(log_path, "a", encoding="utf-8") as log:
+            returncode = subprocess.run(command, stdout=log, stderr=subprocess.STDOUT).returncode
+        done = read_report(report_path)
+        missing = [i for i in range(first, stop) if i not in done]
+        if not missing:
+            break
+        crashed[missing[0]] = {
+            "index": missing[0],
+            "status": "crashed",
+            "error": f"Blender exited with code {returncode}, see {log_path}",
+        }
+        first = missing[0] + 1
+    results = read_report(report_path)
+    results.update(crashed)
+    return [results[i] for i in sorted(results)]
+
+
+def coordinate(args):
+    count = count_jobs(args.jobs)
+    os.makedirs(os.path.join(args.output, "reports"), exist_ok=True)
+    slices = [(start, min(start + args.jobs_per_worker, count)) for start in range(0, count, args.jobs_per_worker)]
+    print(f"{count} jobs in {len(slices)} slices on {args.workers} workers", flush=True)
+
+    results = []
+    started = time.monotonic()
+    with concurrent.futures.ThreadPoolExecutor(max_workers=args.workers) as pool:
+        futures = [pool.submit(run_slice, args, start, stop) for start, stop in slices]
+        for future in concurrent.futures.as_completed(futures):
+            results.extend(future.result())
+            print(f"{len(results)}/{count} jobs done", flush=True)
+    results.sort(key=lambda result: result["index"])
+
+    with open(os.path.join(args.output, "report.jsonl"), "w", encoding="utf-8") as f:
+        for result in results:
+            f.write(json.dumps(result) + "\n")
+    statuses = {}
+    for result in results:
+        statuses[result["status"]] = statuses.get(result["status"], 0) + 1
+    summary = ", ".join(f"{n} {status}" for status, n in sorted(statuses.items()))
+    print(f"Finished in {time.monotonic() - started:.0f}s: {summary}", flush=True)
+    return 0 if statuses.get("ok", 0) == count else 1
+
+
+def import_batch():
+    """Import the ``batch`` module of the add-on this file belongs to."""
+    import addon_utils
+
+    here = os.path.dirname(os.path.abspath(__file__))
+    for module in addon_utils.modules():
+        if os.path.dirname(os.path.abspath(module.__file__)) == here:
+            break
+    else:
+        raise RuntimeError(f"{here} is not an installed add-on")
+    if module.__name__ not in bpy.context.preferences.addons:
+        addon_utils.enable(module.__name__, default_set=True)
+    return importlib.import_module(f"{module.__name__}.batch")
+
+
+def parse_args(argv):
+    parser = argparse.ArgumentParser(description=__doc__.split("\n")[0])
+    parser.add_argument("jobs", help="JSON lines file with one job per line")
+    parser.add_argument("output", help="Directory for the saved files and reports")
+    parser.add_argument(
+        "--workers", type=int, default=os.cpu_count() or 1, help="Background Blender processes, 0 to run here"
+    )
+    parser.add_argument("--jobs-per-worker", type=int, default=JOBS_PER_WORKER, help="Jobs per worker start")
+    parser.add_argument("--blender", help="Blender executable, defaults to the running one")
+    parser.add_argument("--worker", help=argparse.SUPPRESS)
+    parser.add_argument("--report", help=argparse.SUPPRESS)
+    args = parser.parse_args(argv)
+    args.jobs = os.path.abspath(args.jobs)
+    args.output = os.path.abspath(args.output)
+    if args.blender is None:
+        args.blender = bpy.app.binary_path if bpy is not None else os.environ.get("BLENDER", "blender")
+    return args
+
+
+def main():
+    argv = sys.argv[sys.argv.index("--") + 1:] if "--" in sys.argv else sys.argv[1:]
+    args = parse_args(argv)
+    if args.worker is None and args.workers > 0:
+        return coordinate(args)
+    if bpy is None:
+        sys.exit("Running jobs needs Blender: blender -b --python run_batch.py -- ...")
+    start, _, stop = (args.worker or "0:").partition(":")
+    batch = import_batch()
+    batch.run_jobs(args.jobs, args.output, int(start), int(stop) if stop else None, args.report)
+    return 0
+
+
+if __name__ == "__main__":
+    code = main()
+    if code:
+        sys.exit(code)
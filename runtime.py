@@ -0,0 +1,83 @@
+import asyncio
+import threading
+
+from .lazy import g4f
+
+
+class AsyncRuntime:
+    """Add-on wide asyncio event loop running in a background thread.
+
+    Operators submit coroutines with :meth:`submit` and poll the returned
+    ``concurrent.futures.Future`` from their modal timer, so network progress no
+    longer depends on Blender ticking the loop. The loop also owns a shared g4f
+    ``AsyncClient`` so requests can reuse it.
+    """
+
+    def __init__(self):
+        self._loop = None
+        self._thread = None
+        self._client = None
+        self._lock = threading.Lock()
+
+    @property
+    def loop(self):
+        """asyncio.AbstractEventLoop: The running loop, started on first use."""
+        with self._lock:
+            if self._loop is None or not self._thread.is_alive():
+                self._start()
+            return self._loop
+
+    def submit(self, coro):
+        """Schedule a coroutine on the background loop.
+
+        Args:
+            coro: Coroutine object to run.
+
+        Returns:
+            concurrent.futures.Future: Future resolved with the coroutine's result.
+        """
+        return asyncio.run_coroutine_threadsafe(coro, self.loop)
+
+    def client(self):
+        """Return the shared g4f ``AsyncClient``."""
+        if self._client is None:
+            self._client = g4f.client.AsyncClient()
+        return self._client
+
+    def shutdown(self, timeout=1.0):
+        """Cancel pending tasks and stop the loop thread."""
+        with self._lock:
+            loop, thread = self._loop, self._thread
+            self._loop = self._thread = self._client = None
+        if loop is None:
+            return
+
+        def cancel_all():
+            for task in asyncio.all_tasks(loop):
+                task.cancel()
+            loop.stop()
+
+        loop.call_soon_threadsafe(cancel_all)
+        thread.join(timeout=timeout)
+
+    # --- Internals ---
+    def _start(self):
+        loop = asyncio.new_event_loop()
+        ready = threading.Event()
+
+        def run():
+            asyncio.set_event_loop(loop)
+            loop.call_soon(ready.set)
+            try:
+                loop.run_forever()
+            finally:
+                loop.close()
+
+        self._thread = threading.Thread(target=run, name="G4F-Runtime", daemon=True)
+        self._thread.start()
+        ready.wait()
+        self._loop = loop
+        self._client = None
+
+
+runtime = AsyncRuntime()
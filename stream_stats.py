@@ -0,0 +1,163 @@
+import json
+import os
+import statistics
+import threading
+import time
+
+from .Settings import (
+    STREAM_STATS_DEFAULTS,
+    STREAM_STATS_PATH,
+    STREAM_STATS_WINDOW,
+)
+
+
+class StreamStats:
+    """Rolling per-model statistics of finished requests.
+
+    The last ``window`` requests of each model are kept in ``data/stream_stats.json``.
+    Expected values are medians, so a single stalled request does not skew them.
+    """
+
+    def __init__(self, path=STREAM_STATS_PATH, window=STREAM_STATS_WINDOW):
+        self.path = path
+        self.window = window
+        self._samples = None
+        self._lock = threading.Lock()
+
+    def record(self, model, ttfb, duration, chunks, chars, tokens, streamed):
+        """Add a finished request.
+
+        Args:
+            model (str): AI model name.
+            ttfb (float): Seconds until the first text arrived.
+            duration (float): Seconds until the response was complete.
+            chunks (int): Number of streamed chunks, 1 for non-streaming.
+            chars (int): Response length in characters.
+            tokens (int): Estimated response tokens.
+            streamed (bool): Whether the response was streamed.
+        """
+        sample = {
+            "ttfb": round(ttfb, 3),
+            "duration": round(duration, 3),
+            "chunks": chunks,
+            "chars": chars,
+            "tokens": tokens,
+            "tokens_per_sec": round(tokens / max(duration - ttfb, 1e-3), 2) if streamed else None,
+            "streamed": streamed,
+        }
+        with self._lock:
+            samples = self._load().setdefault(model, [])
+            samples.append(sample)
+            del samples[: -self.window]
+            self._save()
+
+    def expected(self, model):
+        """Return the expected shape of the next response of ``model``.
+
+        Returns:
+            dict: ``ttfb``, ``duration``, ``chars`` and ``chars_per_sec`` medians,
+            falling back to ``STREAM_STATS_DEFAULTS``, plus the ``samples`` count.
+        """
+        with self._lock:
+            samples = list(self._load().get(model, []))
+        expected = dict(STREAM_STATS_DEFAULTS, samples=len(samples))
+        if not samples:
+            return expected
+        expected["ttfb"] = statistics.median(s["ttfb"] for s in samples)
+        expected["duration"] = statistics.median(s["duration"] for s in samples)
+        expected["chars"] = statistics.median(s["chars"] for s in samples)
+        rates = [
+            s["chars"] / (s["duration"] - s["ttfb"])
+            for s in samples
+            if s["streamed"] and s["duration"] > s["ttfb"]
+        ]
+        if rates:
+            expected["chars_per_sec"] = statistics.median(rates)
+        return expected
+
+    def clear(self):
+        with self._lock:
+            self._samples = {}
+            self._save()
+
+    # --- Internals ---
+    def _load(self):
+        if self._samples is None:
+            self._samples = {}
+            if os.path.exists(self.path):
+                try:
+                    with open(self.path, "r") as f:
+                        self._samples = json.load(f)
+                except (OSError, json.JSONDecodeError):
+                    pass
+        return self._samples
+
+    def _save(self):
+        tmp_path = self.path + ".tmp"
+        try:
+            with open(tmp_path, "w") as f:
+                json.dump(self._samples, f)
+            os.replace(tmp_path, self.path)
+        except OSError:
+            pass
+
+
+class ProgressEstimator:
+    """Turn the expected shape of a response into a progress fraction and ETA.
+
+    Progress is based on time: elapsed time over elapsed plus estimated remaining
+    time. Before the first text the remaining time comes from the expected TTFB
+    and duration. While streaming it is the expected remaining characters over
+    the observed rate, blended with the historical one. Once a response runs
+    past its expected length the remaining part is assumed to be a tenth of what
+    arrived, so progress slows down instead of stopping at 100%.
+    """
+
+    def __init__(self, expected, streamed, clock=time.monotonic):
+        """Start estimating.
+
+        Args:
+            expected (dict): Result of :meth:`StreamStats.expected`.
+            streamed (bool): Whether the response is streamed.
+            clock (callable): Monotonic clock in seconds.
+        """
+        self.expected = expected
+        self.streamed = streamed
+        self.clock = clock
+        self.started = clock()
+        self.first_text_at = None
+        self.chars = 0
+        self.chunks = 0
+
+    def feed(self, text):
+        """Account for a streamed chunk."""
+        self.chunks += 1
+        if text:
+            if self.first_text_at is None:
+                self.first_text_at = self.clock()
+            self.chars += len(text)
+
+    def estimate(self):
+        """Return ``(fraction, eta)``: completion between 0 and 1 and seconds left."""
+        now = self.clock()
+        elapsed = now - self.started
+        expected = self.expected
+        if not self.streamed or self.first_text_at is None:
+            if self.streamed:
+                total = expected["ttfb"] + expected["chars"] / expected["chars_per_sec"]
+            else:
+                total = expected["duration"]
+            remaining = max(total - elapsed, 0.1 * total)
+        else:
+            streaming = now - self.first_text_at
+            rate = expected["chars_per_sec"]
+            if streaming > 1.0 and self.chars:
+                # Trust the observed rate more the longer the stream runs
+                weight = min(1.0, streaming / 10.0)
+                rate = weight * self.chars / streaming + (1 - weight) * rate
+            remaining_chars = max(expected["chars"] - self.chars, 0.1 * self.chars)
+            remaining = remaining_chars / max(rate, 1e-3)
+        return elapsed / (elapsed + remaining) if elapsed + remaining else 0.0, remaining
+
+
+stream_stats = StreamStats()
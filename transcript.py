@@ -0,0 +1,130 @@
+import asyncio
+import gzip
+import json
+import os
+import re
+import time
+
+from .Settings import TRANSCRIPT_DIR
+
+TRANSCRIPT_VERSION = 1
+
+
+class Transcript:
+    """A recorded provider stream.
+
+    Attributes:
+        model (str): Model the request was sent to.
+        messages (list): Formatted messages that were sent.
+        streamed (bool): Whether the provider streamed its answer.
+        chunks (list): ``(seconds, text)`` pairs, seconds since the request started.
+        error (str): Error that ended the stream, None if it completed.
+        duration (float): Seconds from the request to the end of the stream.
+    """
+
+    def __init__(self, model, messages, streamed=True, chunks=None, error=None, duration=None, created=None):
+        self.model = model
+        self.messages = messages
+        self.streamed = streamed
+        self.chunks = chunks if chunks is not None else []
+        self.error = error
+        self.duration = duration
+        self.created = created if created is not None else time.time()
+
+    @property
+    def text(self):
+        return "".join(chunk for _, chunk in self.chunks if chunk)
+
+    async def replay(self, speed=0.0):
+        """Yield the recorded chunks again.
+
+        Args:
+            speed (float): 1.0 replays with the recorded timing, 2.0 twice as
+                fast and so on. 0 yields every chunk as fast as it is consumed.
+
+        Raises:
+            RuntimeError: At the end, if the recorded stream ended with an error.
+        """
+        start = time.monotonic()
+        for offset, chunk in self.chunks:
+            if speed > 0:
+                delay = offset / speed - (time.monotonic() - start)
+                if delay > 0:
+                    await asyncio.sleep(delay)
+            else:
+                await asyncio.sleep(0)  # Let cancellation and other tasks in
+            yield chunk
+        if self.error is not None:
+            raise RuntimeError(f"Replayed error: {self.error}")
+
+    def save(self, path):
+        """Write the transcript as gzipped JSON lines: a header, then one
+        ``[milliseconds, text]`` line per chunk, then a footer."""
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        header = {
+            "version": TRANSCRIPT_VERSION,
+            "model": self.model,
+            "streamed": self.streamed,
+            "created": self.created,
+            "messages": self.messages,
+        }
+        tmp_path = path + ".tmp"
+        with gzip.open(tmp_path, "wt", encoding="utf-8") as f:
+            f.write(json.dumps(header) + "\n")
+            for offset, chunk in self.chunks:
+                f.write(json.dumps([round(offset * 1000, 1), chunk], ensure_ascii=False) + "\n")
+            f.write(json.dumps({"end": self.duration, "error": self.error}) + "\n")
+        os.replace(tmp_path, path)
+        return path
+
+
+def load_transcript(path):
+    """Read a transcript written by :meth:`Transcript.save`.
+
+    Raises:
+        ValueError: The file is not a transcript of a known version.
+    """
+    with gzip.open(path, "rt", encoding="utf-8") as f:
+        header = json.loads(f.readline())
+        if header.get("version") != TRANSCRIPT_VERSION:
+            raise ValueError(f"Unsupported transcript version in {path}")
+        transcript = Transcript(
+            header["model"], header["messages"], header.get("streamed", True), created=header.get("created")
+        )
+        for line in f:
+            entry = json.loads(line)
+            if isinstance(entry, dict):
+                transcript.duration = entry.get("end")
+                transcript.error = entry.get("error")
+                break
+            transcript.chunks.append((entry[0] / 1000.0, entry[1]))
+    return transcript
+
+
+class TranscriptRecorder:
+    """Capture a provider stream as it arrives.
+
+    Chunks are kept in memory with their arrival time and written out once by
+    :meth:`save`, so recording adds no file I/O to the streaming loop.
+    """
+
+    def __init__(self, model, messages, streamed=True, directory=TRANSCRIPT_DIR):
+        self.transcript = Transcript(model, messages, streamed)
+        self.directory = directory
+        self._start = time.monotonic()
+
+    def chunk(self, text):
+        self.transcript.chunks.append((time.monotonic() - self._start, text))
+
+    def save(self, error=None):
+        """Finish the transcript and write it to the transcript directory.
+
+        Returns:
+            str: Path of the written file.
+        """
+        self.transcript.duration = time.monotonic() - self._start
+        self.transcript.error = str(error) if error is not None else None
+        stamp = time.strftime("%Y%m%d-%H%M%S", time.localtime(self.transcript.created))
+        model = re.sub(r"[^\w.-]+", "_", self.transcript.model)
+        path = os.path.join(self.directory, f"{stamp}-{model}-{os.getpid()}-{id(self) % 10000:04d}.jsonl.gz")
+        return self.transcript.save(path)
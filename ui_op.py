@@ -1,5 +1,13 @@
+import traceback
 import bpy
-from .utils import split_area_to_text_editor
+from .Settings import HISTORY_PAGE_SIZE
+from .utils import split_area_to_text_editor, setup_logger
+from .response_cache import response_cache
+from .bytecode_cache import bytecode_cache
+from .exec_context import scene_override
+from .history_store import collect_garbage, get_content
+from .prompt_op import exec_globals
+from .metrics import format_summary, metrics
 
 class G4F_OT_ClearChat(bpy.types.Operator):
     bl_idname = "g4f.clear_whole_chat"
@@ -11,6 +19,7 @@ class G4F_OT_ClearChat(bpy.types.Operator):
         return False if len(context.scene.g4f_chat_history) ==0 else True
     def execute(self, context):
         context.scene.g4f_chat_history.clear()
+        collect_garbage()
         return {'FINISHED'}
 
 class G4T_Del_Message(bpy.types.Operator):
@@ -23,6 +32,7 @@ class G4T_Del_Message(bpy.types.Operator):
     def execute(self, context):
         context.scene.g4f_chat_history.remove(self.index)
         context.scene.g4f_chat_history.remove(self.index)
+        collect_garbage()
         return {'FINISHED'}
 
 class G4F_OT_ShowCode(bpy.types.Operator):
@@ -30,20 +40,20 @@ class G4F_OT_ShowCode(bpy.types.Operator):
     bl_label = "Show Code"
     bl_options = {'REGISTER', 'UNDO'}
 
-    code:bpy.props.StringProperty(
-        name="Code",
-        description="The generated code",
-        default="",
-    )
+    index : bpy.props.IntProperty(options={'HIDDEN'})
 
     def execute(self, context):
+        history = context.scene.g4f_chat_history
+        if not 0 <= self.index < len(history):
+            return {'CANCELLED'}
+
         code_name = "G4F_Code.py"
         code_text = bpy.data.texts.get(code_name)
         if code_text is None:
             code_text = bpy.data.texts.new(code_name)
 
         code_text.clear()
-        code_text.write(self.code)
+        code_text.write(get_content(history[self.index]))
 
         editor_area = split_area_to_text_editor(context)
 
@@ -52,3 +62,125 @@ class G4F_OT_ShowCode(bpy.types.Operator):
 
         return {'FINISHED'}
 
+class G4F_OT_ClearResponseCache(bpy.types.Operator):
+    bl_idname = "g4f.clear_response_cache"
+    bl_label = "Clear Response Cache"
+    bl_description = "Delete all cached model responses"
+    bl_options = {'REGISTER'}
+
+    def execute(self, context):
+        response_cache.clear()
+        self.report({'INFO'}, "Response cache cleared")
+        return {'FINISHED'}
+
+class G4F_OT_RerunCode(bpy.types.Operator):
+    bl_idname = "g4f.rerun_code"
+    bl_label = "Re-run Code"
+    bl_description = "Run the code of this answer again"
+    bl_options = {'REGISTER', 'UNDO'}
+
+    index : bpy.props.IntProperty(options={'HIDDEN'})
+
+    @classmethod
+    def poll(cls, context):
+        return not context.scene.g4f_button_pressed
+
+    def execute(self, context):
+        logger = setup_logger()
+        history = context.scene.g4f_chat_history
+        if not 0 <= self.index < len(history) or history[self.index].type != "assistant":
+            self.report({'ERROR'}, "No code to re-run")
+            return {'CANCELLED'}
+
+        preferences = context.preferences.addons[__package__].preferences
+        filename = f"<AI_rerun_{self.index}>"
+        try:
+            code = bytecode_cache.compile(
+                get_content(history[self.index]), filename, preferences.use_bytecode_disk_cache
+            )
+            with context.temp_override(**scene_override(context)):
+                exec(code, exec_globals(), {})
+        except Exception as e:
+            logger.error(f"Re-run of message {self.index} failed: {e}\n{traceback.format_exc()}")
+            self.report({'ERROR'}, f"Re-run failed: {e}")
+            return {'CANCELLED'}
+
+        logger.info(f"Re-ran message {self.index}, cache stats: {bytecode_cache.stats()}")
+        self.report({'INFO'}, "Code re-run successfully")
+        return {'FINISHED'}
+
+class G4F_OT_ClearBytecodeCache(bpy.types.Operator):
+    bl_idname = "g4f.clear_bytecode_cache"
+    bl_label = "Clear Bytecode Cache"
+    bl_description = "Delete all cached compiled scripts"
+    bl_options = {'REGISTER'}
+
+    def execute(self, context):
+        bytecode_cache.clear()
+        self.report({'INFO'}, "Bytecode cache cleared")
+        return {'FINISHED'}
+
+class G4F_OT_MetricsSummary(bpy.types.Operator):
+    bl_idname = "g4f.metrics_summary"
+    bl_label = "Print Metrics Summary"
+    bl_description = "Print p50/p95 request timings per model to the system console"
+    bl_options = {'REGISTER'}
+
+    def execute(self, context):
+        summary = metrics.summary()
+        if not summary:
+            self.report({'INFO'}, "No requests recorded yet")
+            return {'CANCELLED'}
+        print(format_summary(summary))
+        self.report({'INFO'}, f"Summary of {len(summary)} models printed to the console")
+        return {'FINISHED'}
+
+class G4F_OT_HistoryPage(bpy.types.Operator):
+    bl_idname = "g4f.history_page"
+    bl_label = "Change History Page"
+    bl_description = "Show older or newer messages"
+    bl_options = {'INTERNAL'}
+
+    step : bpy.props.IntProperty(options={'HIDDEN'})
+
+    def execute(self, context):
+        scene = context.scene
+        page_length = 2 * HISTORY_PAGE_SIZE
+        last_page = max(0, (len(scene.g4f_chat_history) - 1) // page_length)
+        scene.g4f_history_page = min(last_page, max(0, scene.g4f_history_page + self.step))
+        return {'FINISHED'}
+
+class G4F_OT_QueuePrompt(bpy.types.Operator):
+    bl_idname = "g4f.queue_prompt"
+    bl_label = "Queue Prompt"
+    bl_description = "Add the message to the prompt queue. Prompts can be queued while an answer is running"
+    bl_options = {'REGISTER', 'UNDO'}
+
+    @classmethod
+    def poll(cls, context):
+        return bool(context.scene.g4f_chat_input.strip())
+
+    def execute(self, context):
+        item = context.scene.g4f_prompt_queue.add()
+        item.content = context.scene.g4f_chat_input
+        item.type = "queued"
+        context.scene.g4f_chat_input = ""
+        return {'FINISHED'}
+
+class G4F_OT_RemoveQueued(bpy.types.Operator):
+    bl_idname = "g4f.remove_queued"
+    bl_label = "Remove Queued Prompt"
+    bl_description = "Remove the prompt from the queue"
+    bl_options = {'REGISTER', 'UNDO'}
+
+    index : bpy.props.IntProperty(options={'HIDDEN'})
+
+    def execute(self, context):
+        queue = context.scene.g4f_prompt_queue
+        # Prompts that already started belong to the running queue
+        if not 0 <= self.index < len(queue):
+            return {'CANCELLED'}
+        if context.scene.g4f_button_pressed and queue[self.index].type != "queued":
+            return {'CANCELLED'}
+        queue.remove(self.index)
+        return {'FINISHED'}
@@ -1,17 +1,14 @@
-import logging
-import os
+import asyncio
+import json
+import re
+import time
 import bpy
-from .get_models import get_models
+from .runtime import runtime
+from .logging_setup import configure_logging
+from .lazy import warm_up
+from .model_registry import model_registry
+from .Settings import IMPORT_WARMUP_DELAY
 
-no_dep = False
-try:
-    import g4f
-    import g4f.client
-    g4f.debug.version_check = False
-except ModuleNotFoundError:
-    no_dep = True
-
-import logging
 
 def wrap_prompt(prompt):
     wrapped = f"""{prompt} . Don't write code which uses bpy.context.active_object.Make sure to return all code in only one code blocks 
@@ -33,6 +30,24 @@ def split_area_to_text_editor(context):
     return new_area
 
 
+def extract_code_blocks(text):
+    """Extract the code blocks of a markdown response.
+
+    Args:
+        text (str): Full model response.
+
+    Returns:
+        list: Code of each fenced block, empty if the response has none.
+    """
+    code_blocks = re.findall(r"```(?:python)?\s*\n(.*?)\n```", text, re.DOTALL)
+    if not code_blocks:
+        code_blocks = re.findall(r"```(.*?)```", text, re.DOTALL)
+    return [
+        re.sub(r"^python", "", code.strip(), flags=re.MULTILINE)
+        for code in code_blocks
+    ]
+
+
 def append_error_as_comment(code_str, error):
     error_lines = str(error).splitlines()
     commented_error = "\n".join("# " + line for line in error_lines)
@@ -40,35 +55,118 @@ def append_error_as_comment(code_str, error):
     return updated_code
 
 
-def stream_response(message, model):
-    client = g4f.client.Client()
+async def stream_response(message, model, connect_timeout=None, first_byte_timeout=None):
+    """Stream the text of a chat completion.
+
+    Args:
+        message (list): Chat messages.
+        model (str): AI model name.
+        connect_timeout (float): Seconds until the provider has to send its first
+            chunk, text or not. None disables the deadline.
+        first_byte_timeout (float): Seconds until the first non-empty text.
+
+    Raises:
+        TimeoutError: A deadline passed. The request is closed first.
+    """
+    client = runtime.client()
     response = client.chat.completions.create(
         model=model,
         messages=message,
         stream=True,
     )
-    for message in response:
-        yield message.choices[0].delta.content
+    start = time.monotonic()
+    connected = False
+    has_text = False
+    try:
+        while True:
+            deadlines = [first_byte_timeout] if not has_text else []
+            if not connected:
+                deadlines.append(connect_timeout)
+            deadlines = [d for d in deadlines if d is not None]
+            try:
+                if deadlines:
+                    remaining = max(0.0, min(deadlines) - (time.monotonic() - start))
+                    chunk = await asyncio.wait_for(response.__anext__(), remaining)
+                else:
+                    chunk = await response.__anext__()
+            except StopAsyncIteration:
+                return
+            except asyncio.TimeoutError:
+                what = "nothing" if not connected else "no text"
+                raise TimeoutError(
+                    f"{model} sent {what} within {min(deadlines):g}s"
+                ) from None
+            connected = True
+            content = chunk.choices[0].delta.content
+            has_text = has_text or bool(content)
+            yield content
+    finally:
+        # Closing the generator aborts the HTTP request if it is still open
+        await response.aclose()
 
 
-def setup_logger():
-    log_path = os.path.join(os.path.dirname(__file__), "data", "g4f_callbacks.log")
-    logging.basicConfig(
-        level=logging.DEBUG,
-        format="%(asctime)s - %(levelname)s - %(message)s",
-        filename=log_path,
+async def complete_response(message, model):
+    client = runtime.client()
+    response = await client.chat.completions.create(
+        model=model,
+        messages=message,
     )
-    logging.getLogger("markdown_it").setLevel(
-        logging.WARNING
-    )  # Silence Markdown parsing logs
-    logging.getLogger("rich").setLevel(logging.WARNING)  # Silence rich internal logs
+    return str(response.choices[0].message.content)
+
 
-    return logging.getLogger("G4F_Callback")
+def parse_stream_chunk(chunk):
+    """Return the text content of a streamed chunk.
+
+    Chunks in SSE format (``data: {"content": "..."}``) are unwrapped; anything
+    that fails to parse is passed through as plain text.
+    """
+    if not isinstance(chunk, str):
+        return ""
+    if "data: " not in chunk:
+        return chunk
+    cleaned_chunk = chunk.replace("data: ", "").strip()
+    try:
+        chunk_data = json.loads(cleaned_chunk)
+    except json.JSONDecodeError:
+        return chunk
+    if not isinstance(chunk_data, dict):
+        return chunk
+    return chunk_data.get("content") or ""
+
+
+def setup_logger():
+    """Return the add-on logger, configuring it on first use."""
+    return configure_logging()
+
+
+def _model_items(self, context):
+    return model_registry.enum_items()
 
 
 def create_models():
+    """Register the model list. Its items come from the model registry, so it
+    follows model updates without being registered again."""
     bpy.types.Scene.ai_models = bpy.props.EnumProperty(
         name="AI Model",
         description="Select the AI model to use",
-        items=get_models(),
+        items=_model_items,
+        default=0,  # DEFAULT_MODEL, see ModelRegistry.enum_items
     )
+
+
+def _warm_up_tick():
+    warm_up()
+    return None
+
+
+def schedule_warm_up(delay=IMPORT_WARMUP_DELAY):
+    """Import g4f and rich on a background thread once Blender is up. The model
+    list grows to every g4f model once it is loaded. Whatever needs them earlier
+    imports them on first use."""
+    if not bpy.app.timers.is_registered(_warm_up_tick):
+        bpy.app.timers.register(_warm_up_tick, first_interval=delay)
+
+
+def cancel_warm_up():
+    if bpy.app.timers.is_registered(_warm_up_tick):
+        bpy.app.timers.unregister(_warm_up_tick)